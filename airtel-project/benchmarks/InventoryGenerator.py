@@ -0,0 +1,214 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# ----------------------------------------------------------------------------
+# Created By  : agent
+# Created Date: 10.2026
+# version ='1.0'
+# ---------------------------------------------------------------------------
+""" Module used to generate deterministic synthetic Velocity inventories, in the format returned by get_resources.
+Example: python3 benchmarks/InventoryGenerator.py --devices 100000 --seed 1 --output inventory_100k.json """
+# ---------------------------------------------------------------------------
+# Imports
+# ---------------------------------------------------------------------------
+import argparse
+import json
+import random
+import uuid
+
+'''Template IDs used by the synthetic inventory, the rack template ID is the one hard coded in compute_rack_power'''
+RACK_TEMPLATE_ID = "2ec509fe-a50c-4328-b3d9-76a98e2ee560"
+LAB_ROW_TEMPLATE_ID = "3b9d6a2e-4d7f-4d65-9f59-5f3b1b0f7a10"
+SERVICE_TEMPLATE_ID = "6f1d2e7b-8b5f-4b9d-8d2f-1c8e9a0d0000"
+SERVICE_NAMES = ["Service_OpenSearch", "Service_Netbox", "Service_Jira"]
+LAB_ROW_NAMES = "ABCDEFGHIJKLMNOPQRSTUVWXYZ"
+RACK_UNITS = 45
+'''Height of the generated devices, in rack units, and how often each height is picked'''
+DEVICE_HEIGHTS = [1, 1, 1, 1, 2, 2, 4]
+'''Values of the rack properties which create_rack_structure treats as not filled'''
+UNPLACED_VALUES = ["To be filled(A-I)", "To be filled(1-16)", "", "N/A"]
+
+
+class InventoryGenerator:
+    def __init__(self, device_count, seed=0, lab_rows=9, racks_per_row=None, rack_units=RACK_UNITS,
+                 conflict_ratio=0.02, unplaced_ratio=0.01, nested=True, property_pool_size=60,
+                 properties_per_device=8, template_count=20, max_power_range=(100, 800), pdu_ratio_range=(0.5, 0.9),
+                 max_installed_power=20000):
+        """
+        Generator of synthetic Velocity inventories. The same parameters and seed always produce the same inventory.
+        :param device_count: (number of devices placed in racks, lab rows, racks and services come on top)
+        :param seed: (seed of the random generator)
+        :param lab_rows: (number of lab rows, at most 26)
+        :param racks_per_row: (number of racks in each lab row, by default enough racks to fill them to ~90%)
+        :param rack_units: (height of the racks, in rack units)
+        :param conflict_ratio: (fraction of the devices placed over slots already used by another device)
+        :param unplaced_ratio: (fraction of the devices whose Lab Row and Rack Number properties are not filled)
+        :param nested: (True means the devices are already nested under their racks)
+        :param property_pool_size: (number of distinct optional property names in the inventory)
+        :param properties_per_device: (number of optional properties of each device)
+        :param template_count: (number of device templates)
+        :param max_power_range: (range of the Max Power Consumption of a device, in W)
+        :param pdu_ratio_range: (range of the PDU Reported Power to Max Power Consumption ratio)
+        :param max_installed_power: (Max Installed Power of each rack, in W)
+        """
+        self.device_count = device_count
+        self.seed = seed
+        self.lab_rows = min(lab_rows, len(LAB_ROW_NAMES))
+        average_height = sum(DEVICE_HEIGHTS) / len(DEVICE_HEIGHTS)
+        devices_per_rack = max(1, int(rack_units * 0.9 / average_height))
+        if racks_per_row is None:
+            racks_per_row = max(1, -(-device_count // (devices_per_rack * self.lab_rows)))
+        self.racks_per_row = racks_per_row
+        self.rack_units = rack_units
+        self.conflict_ratio = conflict_ratio
+        self.unplaced_ratio = unplaced_ratio
+        self.nested = nested
+        self.property_names = [f"Property {index:03d}" for index in range(property_pool_size)]
+        self.properties_per_device = min(properties_per_device, property_pool_size)
+        self.template_count = template_count
+        self.max_power_range = max_power_range
+        self.pdu_ratio_range = pdu_ratio_range
+        self.max_installed_power = max_installed_power
+        self.definition_ids = {property_name: self.__definition_id(property_name) for property_name in
+                               self.property_names + ["Lab Row", "Rack Number", "Rack Positioning", "No of Rack Units",
+                                                      "Rack Face", "Max Power Consumption", "PDU Reported Power",
+                                                      "Max Installed Power", "ipAddress", "username", "password"]}
+
+    @property
+    def rack_count(self):
+        return self.lab_rows * self.racks_per_row
+
+    def __uuid(self, rng):
+        return str(uuid.UUID(int=rng.getrandbits(128), version=4))
+
+    def __definition_id(self, property_name):
+        return str(uuid.uuid5(uuid.NAMESPACE_OID, f"{self.seed}:{property_name}"))
+
+    def __device(self, rng, name, template_id, host_id, properties):
+        return {"id": self.__uuid(rng), "name": name, "templateId": template_id, "hostId": host_id, "folderId": None,
+                "lastModified": 1700000000000 + rng.randrange(10 ** 9),
+                "properties": [{"name": property_name, "value": value,
+                                "definitionId": self.definition_ids[property_name], "type": "TEXT"}
+                               for property_name, value in properties]}
+
+    def iter_devices(self):
+        """
+        Method used to generate the inventory one device at a time: lab rows, then each rack followed by its devices,
+        then the service resources
+        :return: generator of device records
+        """
+        rng = random.Random(self.seed)
+        template_ids = [self.__uuid(rng) for _ in range(self.template_count)]
+
+        rows = []
+        for row_index in range(self.lab_rows):
+            row = self.__device(rng, f"Row_{LAB_ROW_NAMES[row_index]}", LAB_ROW_TEMPLATE_ID, None, [])
+            rows.append(row)
+            yield row
+
+        remaining = self.device_count
+        device_index = 0
+        for rack_index in range(self.rack_count):
+            row_name = LAB_ROW_NAMES[rack_index % self.lab_rows]
+            rack_number = "RACK-%02d" % (rack_index // self.lab_rows + 1)
+            rack = self.__device(rng, f"Row_{row_name}_{rack_number}", RACK_TEMPLATE_ID,
+                                 rows[rack_index % self.lab_rows]["id"],
+                                 [("Max Installed Power", str(self.max_installed_power)),
+                                  ("Max Power Consumption", "0"), ("PDU Reported Power", "0")])
+            yield rack
+
+            rack_device_count = -(-remaining // (self.rack_count - rack_index))
+            remaining -= rack_device_count
+            position = 1
+            placed = []
+            for _ in range(rack_device_count):
+                device_index += 1
+                height = rng.choice(DEVICE_HEIGHTS)
+                if placed and (rng.random() < self.conflict_ratio or position + height - 1 > self.rack_units):
+                    # Placed over the slots of a device already in the rack
+                    device_position = rng.choice(placed)
+                else:
+                    device_position = position
+                    position += height
+                placed.append(device_position)
+
+                max_power = rng.randint(*self.max_power_range)
+                lab_row, rack_number_value = row_name, rack_number
+                if rng.random() < self.unplaced_ratio:
+                    lab_row, rack_number_value = rng.choice(UNPLACED_VALUES), rng.choice(UNPLACED_VALUES)
+                properties = [("Lab Row", lab_row), ("Rack Number", rack_number_value),
+                              ("Rack Positioning", f"U{device_position}"), ("No of Rack Units", str(height)),
+                              ("Rack Face", rng.choice(["front", "front", "front", "back"])),
+                              ("Max Power Consumption", str(max_power)),
+                              ("PDU Reported Power", str(int(max_power * rng.uniform(*self.pdu_ratio_range))))]
+                properties += [(property_name, f"{property_name} value {rng.randrange(1000)}") for property_name in
+                               rng.sample(self.property_names, self.properties_per_device)]
+                yield self.__device(rng, f"DEVICE-{device_index:06d}", rng.choice(template_ids),
+                                    rack["id"] if self.nested else None, properties)
+
+        for service_name in SERVICE_NAMES:
+            yield self.__device(rng, service_name, SERVICE_TEMPLATE_ID, None,
+                                [("ipAddress", "127.0.0.1"), ("username", "benchmark"), ("password", "benchmark")])
+
+    def generate(self):
+        """
+        Method used to generate the whole inventory in memory
+        :return: dictionary in the get_resources format
+        """
+        devices = list(self.iter_devices())
+        return {"devices": devices, "total": len(devices), "count": len(devices)}
+
+    def write(self, file_path):
+        """
+        Method used to stream the inventory to a JSON file in the get_resources format, one device at a time
+        :param file_path: (path of the JSON file)
+        :return: number of written devices
+        """
+        count = 0
+        with open(file_path, "w") as file:
+            file.write('{"devices":[')
+            for device in self.iter_devices():
+                if count:
+                    file.write(",\n")
+                file.write(json.dumps(device, separators=(",", ":")))
+                count += 1
+            file.write(f'],"total":{count},"count":{count}}}\n')
+        return count
+
+
+def load_inventory(file_path):
+    """
+    Method used to read an inventory written by InventoryGenerator.write or saved from get_resources
+    :param file_path: (path of the JSON file)
+    :return: list of device records
+    """
+    with open(file_path) as file:
+        return json.load(file)["devices"]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Write a synthetic Velocity inventory to a JSON file")
+    parser.add_argument("--devices", type=int, required=True, help="number of devices placed in racks")
+    parser.add_argument("--seed", type=int, default=0, help="seed of the random generator")
+    parser.add_argument("--lab_rows", type=int, default=9, help="number of lab rows")
+    parser.add_argument("--racks_per_row", type=int, default=None, help="racks in each lab row")
+    parser.add_argument("--conflict_ratio", type=float, default=0.02,
+                        help="fraction of the devices placed over rack units used by another device")
+    parser.add_argument("--unplaced_ratio", type=float, default=0.01,
+                        help="fraction of the devices without Lab Row and Rack Number")
+    parser.add_argument("--property_pool_size", type=int, default=60, help="distinct optional property names")
+    parser.add_argument("--properties_per_device", type=int, default=8, help="optional properties of each device")
+    parser.add_argument("--not_nested", action="store_true", help="leave the devices outside their racks")
+    parser.add_argument("--output", required=True, help="JSON file receiving the inventory")
+    arguments = parser.parse_args()
+
+    generator = InventoryGenerator(arguments.devices, seed=arguments.seed, lab_rows=arguments.lab_rows,
+                                   racks_per_row=arguments.racks_per_row, conflict_ratio=arguments.conflict_ratio,
+                                   unplaced_ratio=arguments.unplaced_ratio, nested=not arguments.not_nested,
+                                   property_pool_size=arguments.property_pool_size,
+                                   properties_per_device=arguments.properties_per_device)
+    count = generator.write(arguments.output)
+    print(f"{count} resources ({generator.rack_count} racks) written to {arguments.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,268 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# ----------------------------------------------------------------------------
+# Created By  : agent
+# Created Date: 10.2026
+# version ='1.0'
+# ---------------------------------------------------------------------------
+""" Local HTTP stand-ins for Velocity, NetBox and Zephyr, serving synthetic data for the benchmarks """
+# ---------------------------------------------------------------------------
+# Imports
+# ---------------------------------------------------------------------------
+import json
+import threading
+import time
+import uuid
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+from benchmarks.InventoryGenerator import RACK_TEMPLATE_ID, LAB_ROW_TEMPLATE_ID
+
+
+class StubServer:
+    def __init__(self, name):
+        """
+        Threaded local HTTP server which dispatches every request to the handle method of the stand-in
+        :param name: (name of the stood-in service)
+        """
+        self.this_class_name = self.__class__.__name__
+        self.name = name
+        self.lock = threading.Lock()
+        self.request_counts = Counter()
+        self.server = None
+
+    @property
+    def base_url(self):
+        return f"http://127.0.0.1:{self.server.server_address[1]}/"
+
+    def start(self):
+        """
+        Method used to start serving on a free local port, from a daemon thread
+        :return: the stand-in
+        """
+        stub = self
+
+        class StubHandler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def handle_request(self):
+                parsed_url = urlparse(self.path)
+                body = None
+                content_length = int(self.headers.get("Content-Length") or 0)
+                if content_length:
+                    body = json.loads(self.rfile.read(content_length))
+                with stub.lock:
+                    stub.request_counts[self.command] += 1
+                    status, response = stub.handle(self.command, parsed_url.path, parse_qs(parsed_url.query), body)
+                payload = b"" if response is None else json.dumps(response).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            do_GET = do_POST = do_PUT = do_DELETE = handle_request
+
+            def log_message(self, format, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), StubHandler)
+        self.server.daemon_threads = True
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self):
+        if self.server is not None:
+            self.server.shutdown()
+            self.server.server_close()
+
+    def reset_counts(self):
+        with self.lock:
+            self.request_counts = Counter()
+
+    def handle(self, verb, path, query, body):
+        """
+        Method implemented by each stand-in
+        :return: tuple of HTTP status code and JSON serializable response (None for an empty body)
+        """
+        return 404, None
+
+
+def _compile_filter(flt):
+    negated = ":!:" in flt
+    field, _, values = flt.partition(":!:" if negated else "::")
+    # Both name::a|b and name::a|name::b are accepted by Velocity
+    values = {value[len(field) + 2:] if value.startswith(f"{field}::") else value for value in values.split("|")}
+    return field, values, negated
+
+
+def _apply_filters(records, filters):
+    for field, values, negated in [_compile_filter(flt) for flt in filters]:
+        records = [record for record in records if (str(record.get(field)) in values) != negated]
+    return records
+
+
+class VelocityStub(StubServer):
+    def __init__(self, devices, executions_per_poll=50):
+        """
+        Stand-in for the Velocity inventory and execution APIs
+        :param devices: (list of device records, for example built by InventoryGenerator)
+        :param executions_per_poll: (number of runlist executions which finish between two summary requests)
+        """
+        super().__init__("velocity")
+        self.devices = devices
+        self.devices_by_id = {device["id"]: device for device in devices}
+        self.templates = [{"id": RACK_TEMPLATE_ID, "name": "Rack"}, {"id": LAB_ROW_TEMPLATE_ID, "name": "Lab Row"}]
+        self.nested_templates = {}
+        self.inventory_version = 0
+        self.last_query_key = None
+        self.last_query_devices = []
+        self.executions_per_poll = executions_per_poll
+        self.runlists = {}
+
+    def add_runlist(self, test_paths):
+        """
+        Method used to create a runlist execution whose testcases finish progressively, executions_per_poll at a time
+        :param test_paths: (list of testcase paths of the runlist)
+        :return: ID of the runlist execution
+        """
+        runlist_guid = str(uuid.uuid4())
+        executions = [{"id": str(uuid.uuid4()), "runlistItemId": str(item_id), "testPath": test_path,
+                       "executionState": "QUEUED", "result": None} for item_id, test_path in enumerate(test_paths)]
+        self.runlists[runlist_guid] = {"executions": executions, "finished": 0}
+        return runlist_guid
+
+    def __runlist_summary(self, runlist_guid):
+        runlist = self.runlists[runlist_guid]
+        executions = runlist["executions"]
+        finished = min(len(executions), runlist["finished"] + self.executions_per_poll)
+        for index in range(runlist["finished"], finished):
+            executions[index]["executionState"] = "COMPLETED"
+            executions[index]["result"] = "PASSED" if index % 10 else "FAILED"
+        for index in range(finished, min(len(executions), finished + self.executions_per_poll)):
+            executions[index]["executionState"] = "IN_PROGRESS"
+        runlist["finished"] = finished
+        return {"guid": runlist_guid, "executions": [dict(execution) for execution in executions]}
+
+    def handle(self, verb, path, query, body):
+        if path.endswith("/inventory/v16/devices") and verb == "GET":
+            # The filtered list is kept between the pages of the same query, like a server side cursor
+            query_key = (tuple(query.get("filter", [])), len(self.devices), self.inventory_version)
+            if self.last_query_key != query_key:
+                self.last_query_key = query_key
+                self.last_query_devices = _apply_filters(self.devices, query.get("filter", []))
+            devices = self.last_query_devices
+            offset = int(query.get("offset", ["0"])[0])
+            limit = int(query.get("limit", ["200"])[0])
+            page = devices[offset:offset + limit]
+            if query.get("includeProperties", ["true"])[0] == "false":
+                page = [{key: value for key, value in device.items() if key != "properties"} for device in page]
+            return 200, {"devices": page, "total": len(devices), "count": len(page), "offset": offset}
+        if path.endswith("/inventory/v16/templates"):
+            templates = _apply_filters(self.templates, query.get("filter", []))
+            return 200, {"templates": templates, "total": len(templates)}
+        if path.endswith("/inventory/v16/device") and verb == "POST":
+            device = {"id": str(uuid.uuid4()), "name": body["name"], "templateId": body["templateId"],
+                      "hostId": None, "folderId": body.get("folderId"), "lastModified": int(time.time() * 1000),
+                      "properties": []}
+            self.devices.append(device)
+            self.devices_by_id[device["id"]] = device
+            return 200, device
+        if "/inventory/v15/device/" in path and path.endswith("/nested_resources"):
+            parent_id = path.split("/")[-2]
+            for device_id in body["ids"]:
+                if device_id in self.devices_by_id:
+                    self.devices_by_id[device_id]["hostId"] = parent_id
+            self.inventory_version += 1
+            return 200, {"ids": body["ids"]}
+        if "/inventory/v15/device/" in path and verb == "PUT":
+            device = self.devices_by_id.get(path.split("/")[-1])
+            if device is None:
+                return 404, {"message": "device not found"}
+            values = {device_property["definitionId"]: device_property["value"]
+                      for device_property in body.get("properties", [])}
+            for device_property in device["properties"]:
+                if device_property["definitionId"] in values:
+                    device_property["value"] = str(values[device_property["definitionId"]])
+            device["lastModified"] = int(time.time() * 1000)
+            self.inventory_version += 1
+            return 200, device
+        if path.endswith("/nested_templates") and verb == "GET":
+            nested_templates = self.nested_templates.get(path.split("/")[-2], [])
+            return 200, {"items": [{"templateId": template_id} for template_id in nested_templates],
+                         "total": len(nested_templates)}
+        if path.endswith("/nested_template") and verb == "POST":
+            self.nested_templates.setdefault(path.split("/")[-2], []).append(body.get("templateId"))
+            return 200, {}
+        if "/inventory/v15/" in path:
+            # Nested templates and un-nesting are accepted without changing the inventory
+            return 200, {}
+        if path.endswith("/executions/v1/runlists/summary") and verb == "POST":
+            return 200, [self.__runlist_summary(runlist_guid) for runlist_guid in body if runlist_guid in self.runlists]
+        return 404, {"message": f"{verb} {path} is not implemented by the stand-in"}
+
+
+class NetBoxStub(StubServer):
+    COLLECTIONS = {"api/dcim/racks": "racks", "api/dcim/devices": "devices", "api/dcim/device-types": "device-types",
+                   "api/extras/custom-fields": "custom-fields"}
+
+    def __init__(self):
+        """
+        Stand-in for the NetBox racks, devices, device types and custom fields APIs, keeping the objects in memory
+        """
+        super().__init__("netbox")
+        self.collections = {collection: {} for collection in self.COLLECTIONS.values()}
+        self.next_id = 1
+
+    def handle(self, verb, path, query, body):
+        collection = self.COLLECTIONS.get(path.strip("/"))
+        if collection is None:
+            return 404, {"detail": f"{verb} {path} is not implemented by the stand-in"}
+        objects = self.collections[collection]
+        if verb == "GET":
+            limit = int(query.get("limit", ["50"])[0])
+            results = list(objects.values())[:limit]
+            return 200, {"count": len(objects), "results": results}
+        if verb == "POST":
+            created = []
+            for new_object in body if isinstance(body, list) else [body]:
+                new_object = dict(new_object, id=self.next_id, url=f"{self.base_url}{path.strip('/')}/{self.next_id}/")
+                objects[self.next_id] = new_object
+                created.append(new_object)
+                self.next_id += 1
+            return 201, created if isinstance(body, list) else created[0]
+        if verb == "DELETE":
+            for deleted_object in body if isinstance(body, list) else [body]:
+                objects.pop(int(deleted_object["id"]), None)
+            return 204, None
+        return 405, {"detail": f"{verb} is not allowed"}
+
+
+class ZephyrStub(StubServer):
+    def __init__(self, execution_count, cycle_id=1):
+        """
+        Stand-in for the ZAPI execution APIs, serving a single test cycle
+        :param execution_count: (number of executions in the test cycle)
+        :param cycle_id: (ID of the test cycle)
+        """
+        super().__init__("zephyr")
+        self.cycle_id = cycle_id
+        self.executions = [{"id": 100000 + index, "issueKey": f"VELO-{index + 1}", "cycleId": cycle_id,
+                            "executionStatus": "-1"} for index in range(execution_count)]
+        self.executions_by_id = {str(execution["id"]): execution for execution in self.executions}
+
+    def handle(self, verb, path, query, body):
+        if path.endswith("/execution") and verb == "GET":
+            offset = int(query.get("offset", ["0"])[0])
+            limit = int(query.get("limit", ["1000"])[0])
+            executions = [execution for execution in self.executions
+                          if str(execution["cycleId"]) == query.get("cycleId", [str(self.cycle_id)])[0]]
+            return 200, {"executions": executions[offset:offset + limit], "totalCount": len(executions)}
+        if path.endswith("/execution/updateBulkStatus") and verb == "PUT":
+            for execution_id in body["executions"]:
+                if execution_id in self.executions_by_id:
+                    self.executions_by_id[execution_id]["executionStatus"] = body["status"]
+            return 200, {"jobProgressToken": str(uuid.uuid4())}
+        if "/cycle/" in path and path.endswith("/folders"):
+            return 200, []
+        return 404, {"message": f"{verb} {path} is not implemented by the stand-in"}
@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# ----------------------------------------------------------------------------
+# Created By  : agent
+# Created Date: 10.2026
+# version ='1.0'
+# ---------------------------------------------------------------------------
+""" Import time benchmark of the libraries and scripts. Each module is imported in a new interpreter, the import must
+not load the heavy optional packages nor set up the library loggers.
+Example: python3 benchmarks/import_time.py --output import_times.json --baseline old_import_times.json """
+# ---------------------------------------------------------------------------
+# Imports
+# ---------------------------------------------------------------------------
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+PROJECT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+MODULES = ["helpers.Logger", "helpers.RequestsWrapper", "libs.libs_velocity.Velocity", "libs.libs_netbox.NetBox",
+           "libs.libs_zephyr.ZephyrCore", "libs.libs_jira.JiraCore", "libs.libs_jira.DefectIndex",
+           "libs.libs_opensearch.OpenSearch", "libs.libs_html_reporting.HTMLReportCore",
+           "scripts.send_reservation_email", "scripts.create_rack_structures", "scripts.create_netbox_racks",
+           "scripts.compute_rack_power", "scripts.run_zephyr_automation_cycle"]
+'''Packages which are imported only by the methods using them'''
+HEAVY_PACKAGES = ["jira", "opensearchpy", "jinja2"]
+'''Modules whose loggers are created on first use, so their import does not touch the log share'''
+LAZY_LOGGER_PREFIXES = ("libs.", "helpers.")
+
+PROBE = """
+import json, logging, sys
+import {module}
+print(json.dumps({{"heavy": sorted(name for name in {heavy} if name in sys.modules),
+                  "loggers": sorted(name for name, logger in logging.root.manager.loggerDict.items()
+                                    if getattr(logger, "handlers", None))}}))
+"""
+
+
+def measure(module, repeat):
+    """
+    Method used to import a module in new interpreters and read its cumulative import time
+    :param module: (dotted module name)
+    :param repeat: (number of imports, the fastest is kept)
+    :return: dictionary with the import time in ms, the loaded heavy packages and the loggers having handlers, or the
+    import error
+    """
+    environment = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [PROJECT_DIR,
+                                                                             os.environ.get("PYTHONPATH")])))
+    best = None
+    probe = {}
+    for _ in range(repeat):
+        process = subprocess.run([sys.executable, "-X", "importtime", "-c",
+                                  PROBE.format(module=module, heavy=HEAVY_PACKAGES)],
+                                 cwd=PROJECT_DIR, env=environment, capture_output=True, text=True)
+        if process.returncode:
+            return {"module": module, "error": process.stderr.strip().splitlines()[-1]}
+        cumulative = None
+        for line in process.stderr.splitlines():
+            # import time: self [us] | cumulative | imported package
+            parts = line.split("|")
+            if line.startswith("import time:") and len(parts) == 3 and parts[2].strip() == module:
+                cumulative = int(parts[1])
+        if cumulative is not None and (best is None or cumulative < best):
+            best = cumulative
+        probe = json.loads(process.stdout.strip().splitlines()[-1])
+    return {"module": module, "import_ms": round(best / 1000, 1) if best is not None else None,
+            "heavy": probe.get("heavy", []),
+            "loggers": [name for name in probe.get("loggers", []) if name.startswith(LAZY_LOGGER_PREFIXES)]}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Import time benchmark of the libraries and scripts")
+    parser.add_argument("--modules", default=",".join(MODULES), help="comma separated modules to import")
+    parser.add_argument("--repeat", type=int, default=5, help="imports of each module, the fastest is kept")
+    parser.add_argument("--output", default=None, help="JSON file receiving the results")
+    parser.add_argument("--baseline", default=None, help="JSON results of a previous run to compare with")
+    parser.add_argument("--tolerance", type=float, default=0.5, help="accepted relative import time increase")
+    parser.add_argument("--budget_ms", type=float, default=None, help="maximum import time of any module")
+    arguments = parser.parse_args()
+
+    results = []
+    problems = []
+    for module in [module for module in arguments.modules.split(",") if module]:
+        result = measure(module, arguments.repeat)
+        results.append(result)
+        if "error" in result:
+            print(f"{module:<45} import failed: {result['error']}")
+            continue
+        print(f"{module:<45} {result['import_ms']:>9.1f} ms")
+        if result["heavy"]:
+            problems.append(f"{module} imports {', '.join(result['heavy'])}")
+        if result["loggers"]:
+            problems.append(f"{module} sets up the loggers {', '.join(result['loggers'])} at import")
+        if arguments.budget_ms is not None and result["import_ms"] > arguments.budget_ms:
+            problems.append(f"{module} import takes {result['import_ms']} ms, budget is {arguments.budget_ms} ms")
+
+    if arguments.baseline:
+        with open(arguments.baseline) as file:
+            baseline = {result["module"]: result for result in json.load(file)["results"]}
+        for result in results:
+            previous = baseline.get(result["module"])
+            if previous and previous.get("import_ms") and result.get("import_ms") and \
+                    result["import_ms"] > previous["import_ms"] * (1 + arguments.tolerance):
+                problems.append(f"{result['module']} import time {previous['import_ms']} ms -> "
+                                f"{result['import_ms']} ms")
+
+    if arguments.output:
+        with open(arguments.output, "w") as file:
+            json.dump({"python": sys.version, "results": results}, file, indent=2)
+
+    for problem in problems:
+        print(f"REGRESSION: {problem}")
+    return 1 if problems else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,341 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# ----------------------------------------------------------------------------
+# Created By  : agent
+# Created Date: 10.2026
+# version ='1.0'
+# ---------------------------------------------------------------------------
+""" Offline benchmarks of the inventory and runlist monitoring workloads, run against local stand-in servers.
+Example: python3 benchmarks/run_benchmarks.py --sizes 1000,10000,50000 --seed 1 --output results.json --baseline old.json """
+# ---------------------------------------------------------------------------
+# Imports
+# ---------------------------------------------------------------------------
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+from types import SimpleNamespace
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+import helpers.Tracing as Tracing
+from parameters.global_parameters import Api as APIPARAMS
+from parameters.global_parameters import Reporting as REPORTINGPARAMS
+from parameters.global_parameters import Velocity as VELOCITYPARAMS
+from benchmarks.InventoryGenerator import InventoryGenerator, load_inventory
+from benchmarks.StubServers import VelocityStub, NetBoxStub, ZephyrStub
+
+SCENARIOS = ["get_airtel_racks", "create_rack_structure", "process_velocity_racks", "compute_rack_power",
+             "runlist_monitor"]
+
+
+def configure(work_dir, log_level, rate_limits=False):
+    """
+    Method used to keep the logs, caches and metrics of the benchmarks in a work directory. It must be called before
+    the libraries are imported, as the default paths are read at import time.
+    :param work_dir: (directory for all the files written during the benchmarks)
+    :param log_level: (log level of the libraries)
+    :param rate_limits: (keep the client side rate limits, disabled by default so the timings measure the libraries)
+    """
+    REPORTINGPARAMS.update({"test_log_path": os.path.join(work_dir, "logs"),
+                            "session_log_path": os.path.join(work_dir, "logs"),
+                            "checkpoint_path": os.path.join(work_dir, "checkpoints"),
+                            "metrics_path": os.path.join(work_dir, "metrics"),
+                            "log_level_default": log_level})
+    VELOCITYPARAMS.update({"asset_cache_path": os.path.join(work_dir, "cache", "automation_assets.json"),
+                           "inventory_cache_path": os.path.join(work_dir, "cache", "velocity_inventory.sqlite")})
+    if not rate_limits:
+        APIPARAMS.update({"rate_limits": None})
+    # A token in the environment means no authentication request is sent to the stand-in
+    os.environ["VELOCITY_PARAM_VELOCITY_TOKEN"] = "benchmark"
+
+
+def velocity_session(velocity_stub):
+    import libs.libs_velocity.Velocity as Velocity
+
+    session = Velocity.API("127.0.0.1", "benchmark", "benchmark")
+    session.base_url = velocity_stub.base_url + "velocity/api/"
+    session.base_url_ito = velocity_stub.base_url + "ito/"
+    return session
+
+
+def netbox_session(netbox_stub):
+    import libs.libs_netbox.NetBox as NetBox
+
+    session = NetBox.API("127.0.0.1", "benchmark")
+    session.base_url = netbox_stub.base_url
+    return session
+
+
+def zephyr_session(zephyr_stub):
+    from libs.libs_zephyr.ZephyrCore import ZephyrCore
+
+    session = ZephyrCore("127.0.0.1", "benchmark", "benchmark")
+    session.login()
+    session.base_url = zephyr_stub.base_url + "rest/zapi/latest/"
+    return session
+
+
+class RecordingOpenSearch:
+    documents = []
+
+    def __init__(self, host, user, password):
+        RecordingOpenSearch.documents = []
+
+    def delete_index(self):
+        return True
+
+    def create_document(self, document):
+        RecordingOpenSearch.documents.append(document)
+        return True
+
+
+def bench_get_airtel_racks(stubs):
+    velocity_racks = velocity_session(stubs["velocity"]).get_airtel_racks(rack_template_name="Rack")
+    return bool(velocity_racks) and bool(velocity_racks[0]) and bool(velocity_racks[1]["devices"])
+
+
+def bench_create_rack_structure(stubs):
+    session = velocity_session(stubs["velocity"])
+    inventory_json = session.get_resources(["folderId:!:a6b78358-5e37-453e-9632-4bc6045ed116"],
+                                           properties=["Lab Row", "Rack Number"])
+    if not inventory_json:
+        return False
+    return session.create_rack_structure(inventory_json, lab_row_template_name="Lab Row", rack_template_name="Rack")
+
+
+def bench_process_velocity_racks(stubs, state):
+    return netbox_session(stubs["netbox"]).process_velocity_racks(state["racks"], state["devices"])
+
+
+def bench_compute_rack_power(stubs):
+    try:
+        import scripts.compute_rack_power as compute_rack_power
+    except ImportError as e:
+        raise SkipScenario(f"compute_rack_power can not be imported: {e}")
+
+    # The snapshot may hold the inventory of a previous size, the script syncs it again like after a change
+    velocity_session(stubs["velocity"]).invalidate_inventory_cache()
+    compute_rack_power.Velocity = SimpleNamespace(API=lambda *args: velocity_session(stubs["velocity"]))
+    compute_rack_power.OpenSearch = SimpleNamespace(API=RecordingOpenSearch)
+    compute_rack_power.main()
+    rack_count = len([device for device in stubs["velocity"].devices if device["name"].count("_") == 2])
+    return len(RecordingOpenSearch.documents) == rack_count
+
+
+def bench_runlist_monitor(stubs, max_polls=10000):
+    from libs.libs_velocity.RunlistMonitor import RunlistMonitor
+
+    zephyr = zephyr_session(stubs["zephyr"])
+    executions = []
+    while True:
+        response = zephyr.get_test_executions_by_zephyr_ids(cycle_id=stubs["zephyr"].cycle_id, limit=1000,
+                                                            offset=len(executions))
+        if not response:
+            return False
+        executions.extend(response["executions"])
+        if not response["executions"] or len(executions) >= response["totalCount"]:
+            break
+
+    key_to_id = {execution["issueKey"]: execution["id"] for execution in executions}
+    path_to_tag = {f"main/tests/{issue_key}.fftc": issue_key for issue_key in key_to_id}
+    runlist_guid = stubs["velocity"].add_runlist(list(path_to_tag))
+    monitor = RunlistMonitor(velocity_session(stubs["velocity"]), runlist_guid, list(path_to_tag), path_to_tag)
+
+    polls = 0
+    while not monitor.is_finished() and polls < max_polls:
+        finished = monitor.poll()
+        polls += 1
+        if finished is False:
+            return False
+        execution_ids_by_status = {}
+        for item in finished:
+            status = "pass" if item["execution"]["result"] == "PASSED" else "fail"
+            execution_ids_by_status.setdefault(status, []).append(key_to_id[item["tag"]])
+        for status, execution_ids in execution_ids_by_status.items():
+            if not zephyr.update_test_executions_status_bulk(execution_ids, status):
+                return False
+    return monitor.is_finished()
+
+
+class SkipScenario(Exception):
+    pass
+
+
+def run_scenario(name, function, stubs):
+    """
+    Method used to time one scenario and collect the requests it sent
+    :param name: (name of the scenario)
+    :param function: (callable running the scenario, returns True or False)
+    :param stubs: (dictionary of stand-in servers)
+    :return: dictionary with the scenario results
+    """
+    import helpers.Metrics as Metrics
+
+    Metrics.registry.reset()
+    for stub in stubs.values():
+        stub.reset_counts()
+
+    start = time.perf_counter()
+    try:
+        with Tracing.tracer.span(name, "benchmark"):
+            ok = bool(function())
+    except SkipScenario as e:
+        return {"scenario": name, "skipped": str(e)}
+    wall_time = time.perf_counter() - start
+
+    metrics = Metrics.registry.to_dict()
+    return {"scenario": name, "ok": ok, "wall_time": round(wall_time, 3),
+            "requests": {stub.name: sum(stub.request_counts.values()) for stub in stubs.values()},
+            "client_latency": {service: data["latency_total"] for service, data in metrics["services"].items()},
+            "errors": sum(data["errors"] for data in metrics["services"].values()),
+            "slowest_endpoints": metrics["endpoints"][:3]}
+
+
+def run_size(devices, device_count, execution_count, executions_per_poll, scenarios):
+    """
+    Method used to run the selected scenarios against stand-ins serving the given inventory
+    :param devices: (list of device records served by the Velocity stand-in)
+    :param device_count: (size of the inventory, reported in the results)
+    :param execution_count: (number of executions in the Zephyr cycle and in the runlist)
+    :param executions_per_poll: (number of runlist executions finishing between two summary requests)
+    :param scenarios: (list of scenario names)
+    :return: list of scenario results
+    """
+    stubs = {"velocity": VelocityStub(devices, executions_per_poll).start(),
+             "netbox": NetBoxStub().start(),
+             "zephyr": ZephyrStub(execution_count).start()}
+    state = {}
+    results = []
+    try:
+        if "process_velocity_racks" in scenarios:
+            velocity_racks = velocity_session(stubs["velocity"]).get_airtel_racks(rack_template_name="Rack")
+            if not velocity_racks:
+                raise RuntimeError("the Velocity stub did not return the rack and device structures")
+            state["racks"], state["devices"] = velocity_racks
+        scenario_functions = {"get_airtel_racks": lambda: bench_get_airtel_racks(stubs),
+                              "create_rack_structure": lambda: bench_create_rack_structure(stubs),
+                              "process_velocity_racks": lambda: bench_process_velocity_racks(stubs, state),
+                              "compute_rack_power": lambda: bench_compute_rack_power(stubs),
+                              "runlist_monitor": lambda: bench_runlist_monitor(stubs)}
+        for scenario in scenarios:
+            result = run_scenario(scenario, scenario_functions[scenario], stubs)
+            result["devices"] = device_count
+            results.append(result)
+            print(format_result(result), flush=True)
+    finally:
+        for stub in stubs.values():
+            stub.stop()
+    return results
+
+
+def format_result(result):
+    if "skipped" in result:
+        return f"{result['devices']:>7} {result['scenario']:<24} skipped: {result['skipped']}"
+    requests = " ".join(f"{service}={count}" for service, count in result["requests"].items() if count)
+    return (f"{result['devices']:>7} {result['scenario']:<24} {'ok' if result['ok'] else 'FAILED':<6} "
+            f"{result['wall_time']:>9.3f}s  {requests}")
+
+
+def compare_with_baseline(results, baseline_file, tolerance):
+    """
+    Method used to find the scenarios which became slower or send more requests than in a previous run
+    :param results: (list of scenario results)
+    :param baseline_file: (JSON file written by a previous run)
+    :param tolerance: (accepted relative increase of the wall time, 0.2 means 20%)
+    :return: list of regression descriptions
+    """
+    with open(baseline_file) as file:
+        baseline = {(result["devices"], result["scenario"]): result for result in json.load(file)["results"]}
+
+    regressions = []
+    for result in results:
+        previous = baseline.get((result["devices"], result["scenario"]))
+        if previous is None or "skipped" in result or "skipped" in previous:
+            continue
+        if result["wall_time"] > previous["wall_time"] * (1 + tolerance):
+            regressions.append(f"{result['scenario']} ({result['devices']} devices): wall time "
+                               f"{previous['wall_time']}s -> {result['wall_time']}s")
+        for service, count in result["requests"].items():
+            if count > previous["requests"].get(service, 0):
+                regressions.append(f"{result['scenario']} ({result['devices']} devices): {service} requests "
+                                   f"{previous['requests'].get(service, 0)} -> {count}")
+        if previous["ok"] and not result["ok"]:
+            regressions.append(f"{result['scenario']} ({result['devices']} devices): scenario failed")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline benchmarks using local Velocity, NetBox and Zephyr "
+                                                 "stand-ins")
+    parser.add_argument("--sizes", default="1000,10000,50000", help="comma separated inventory sizes, in devices")
+    parser.add_argument("--seed", type=int, default=0, help="seed of the synthetic inventories")
+    parser.add_argument("--lab_rows", type=int, default=9, help="lab rows of the synthetic inventories")
+    parser.add_argument("--racks_per_row", type=int, default=None,
+                        help="racks in each lab row, by default enough to hold the devices")
+    parser.add_argument("--conflict_ratio", type=float, default=0.02,
+                        help="fraction of the devices placed over rack units used by another device")
+    parser.add_argument("--unplaced_ratio", type=float, default=0.01,
+                        help="fraction of the devices without Lab Row and Rack Number")
+    parser.add_argument("--properties_per_device", type=int, default=8,
+                        help="optional properties of each device, on top of the rack and power properties")
+    parser.add_argument("--not_nested", action="store_true",
+                        help="leave the devices outside their racks, so create_rack_structure has to nest them")
+    parser.add_argument("--inventory_file", default=None,
+                        help="inventory written by InventoryGenerator.py to use instead of --sizes")
+    parser.add_argument("--executions", type=int, default=2000, help="executions in the Zephyr cycle and runlist")
+    parser.add_argument("--executions_per_poll", type=int, default=100,
+                        help="runlist executions finishing between two summary requests")
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS), help="comma separated scenarios to run")
+    parser.add_argument("--work_dir", default=None, help="directory for logs and caches, temporary by default")
+    parser.add_argument("--log_level", default="ERROR", help="log level of the libraries during the benchmarks")
+    parser.add_argument("--trace", action="store_true",
+                        help="write a Chrome trace of the benchmarks to benchmarks_trace.json in the work directory")
+    parser.add_argument("--rate_limits", action="store_true",
+                        help="apply the client side rate limits of the parameters to the requests")
+    parser.add_argument("--output", default=None, help="JSON file receiving the results")
+    parser.add_argument("--baseline", default=None, help="JSON results of a previous run to compare with")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="accepted relative wall time increase")
+    arguments = parser.parse_args()
+
+    scenarios = [scenario for scenario in arguments.scenarios.split(",") if scenario]
+    unknown_scenarios = [scenario for scenario in scenarios if scenario not in SCENARIOS]
+    if unknown_scenarios:
+        parser.error(f"unknown scenarios {unknown_scenarios}, use some of {SCENARIOS}")
+
+    work_dir = arguments.work_dir or tempfile.mkdtemp(prefix="airtel_benchmarks_")
+    configure(work_dir, arguments.log_level, arguments.rate_limits)
+    print(f"Benchmark files are written to {work_dir}")
+    if arguments.trace:
+        Tracing.tracer.dump_at_exit(os.path.join(work_dir, "benchmarks_trace.json"))
+
+    results = []
+    if arguments.inventory_file:
+        devices = load_inventory(arguments.inventory_file)
+        results += run_size(devices, len(devices), arguments.executions, arguments.executions_per_poll, scenarios)
+    else:
+        for device_count in [int(size) for size in arguments.sizes.split(",") if size]:
+            generator = InventoryGenerator(device_count, seed=arguments.seed, lab_rows=arguments.lab_rows,
+                                           racks_per_row=arguments.racks_per_row,
+                                           conflict_ratio=arguments.conflict_ratio,
+                                           unplaced_ratio=arguments.unplaced_ratio, nested=not arguments.not_nested,
+                                           properties_per_device=arguments.properties_per_device)
+            results += run_size(list(generator.iter_devices()), device_count, arguments.executions,
+                                arguments.executions_per_poll, scenarios)
+
+    if arguments.output:
+        with open(arguments.output, "w") as file:
+            json.dump({"timestamp": time.time(), "results": results}, file, indent=2)
+
+    if arguments.baseline:
+        regressions = compare_with_baseline(results, arguments.baseline, arguments.tolerance)
+        for regression in regressions:
+            print(f"REGRESSION: {regression}")
+        if regressions:
+            return 1
+    return 0 if all(result.get("ok", True) for result in results) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
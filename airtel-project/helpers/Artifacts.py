@@ -0,0 +1,88 @@
+from __future__ import annotations
+import gzip
+import hashlib
+import os
+import shutil
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+CHUNK_SIZE = 1024 * 1024
+COMPRESSION_EXTENSIONS = {"gzip": ".gz", "zstd": ".zst"}
+
+
+def compress_file(file_path: str, compression: str = "gzip", remove_source: bool = False,
+                  chunk_size: int = CHUNK_SIZE, destination_directory: str = None) -> str or None:
+    """
+    Compress a file chunk by chunk, without reading it whole in memory. zstd needs the optional zstandard package,
+    gzip is used when it is not installed. The output only depends on the content: the gzip header holds neither the
+    file name nor the modification time, so compressing the same content again gives the same digest.
+    :param file_path: path of the file to compress
+    :param compression: gzip or zstd
+    :param remove_source: True means the original file is deleted after compression
+    :param chunk_size: number of bytes read at once
+    :param destination_directory: directory of the compressed file, the directory of the source by default
+    :return: the path of the compressed file
+    """
+    if compression == "zstd" and zstandard is None:
+        print(f"zstandard package is not installed, compressing {file_path} with gzip")
+        compression = "gzip"
+    if compression not in COMPRESSION_EXTENSIONS:
+        print(f"Compression {compression} is not supported for file: {file_path}")
+        return None
+
+    compressed_file_path = file_path + COMPRESSION_EXTENSIONS[compression]
+    if destination_directory:
+        compressed_file_path = os.path.join(destination_directory, os.path.basename(compressed_file_path))
+    try:
+        with open(file_path, "rb") as source:
+            if compression == "zstd":
+                with open(compressed_file_path, "wb") as destination:
+                    zstandard.ZstdCompressor().copy_stream(source, destination, read_size=chunk_size,
+                                                           write_size=chunk_size)
+            else:
+                with open(compressed_file_path, "wb") as destination_file, \
+                        gzip.GzipFile(filename="", mode="wb", fileobj=destination_file, mtime=0) as destination:
+                    shutil.copyfileobj(source, destination, chunk_size)
+        if remove_source:
+            os.remove(file_path)
+    except Exception as detailed_exception:
+        print(f"Exception occurred while attempting to compress file: {file_path}\n<{detailed_exception}>")
+        return None
+    return compressed_file_path
+
+
+def file_digest(file_path: str, chunk_size: int = CHUNK_SIZE) -> str:
+    """
+    Compute the SHA-256 digest of a file, chunk by chunk.
+    :param file_path: path of the file
+    :param chunk_size: number of bytes read at once
+    :return: the hexadecimal digest
+    """
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as file:
+        for chunk in iter(lambda: file.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def content_addressed_name(file_path: str, digest: str, digest_length: int = 12) -> str:
+    """
+    Build a file name which includes the content digest, so an artifact already uploaded can be recognized by name.
+    report_v1.2.html.gz with digest 0123abcd... becomes report_v1.2.0123abcd....html.gz: the digest is inserted
+    before the file extension and the compression extension, the other dots are kept in the base name.
+    :param file_path: path of the file
+    :param digest: content digest of the file
+    :param digest_length: number of digest characters added to the name
+    :return: the file name, without directory
+    """
+    file_name = os.path.basename(file_path)
+    compression_extension = ""
+    for extension in COMPRESSION_EXTENSIONS.values():
+        if file_name.endswith(extension):
+            file_name, compression_extension = file_name[:-len(extension)], extension
+            break
+    base_name, extension = os.path.splitext(file_name)
+    return f"{base_name}.{digest[:digest_length]}{extension}{compression_extension}"
@@ -0,0 +1,161 @@
+from __future__ import annotations
+import collections
+import threading
+import time
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+'''Default settings of the breakers, used for the settings not given by the API sessions'''
+FAILURE_RATE_THRESHOLD = 0.5
+MINIMUM_CALLS = 5
+WINDOW_SIZE = 20
+OPEN_DURATION = 30.0
+
+
+class CircuitBreaker:
+    """
+    Circuit breaker of one backend host. While closed, the outcome of the last window_size calls is kept and the
+    circuit opens when at least minimum_calls were made and the failure rate reaches failure_rate_threshold. While
+    open, the calls fail fast without reaching the host. After open_duration seconds one probe call is let through
+    (half open): its success closes the circuit, its failure opens it again for another open_duration.
+    Each admitted call gets a ticket from allow_request() which is given back with its outcome. While the circuit is
+    not closed only the outcome of the probe ticket changes the state, and the outcomes of the calls admitted before
+    the last state change are ignored, so a slow call started before the circuit opened can not close it.
+    """
+
+    def __init__(self, host: str, failure_rate_threshold: float = FAILURE_RATE_THRESHOLD,
+                 minimum_calls: int = MINIMUM_CALLS, window_size: int = WINDOW_SIZE,
+                 open_duration: float = OPEN_DURATION):
+        self.host = host
+        self.failure_rate_threshold = failure_rate_threshold
+        self.minimum_calls = minimum_calls
+        self.open_duration = open_duration
+        self.lock = threading.Lock()
+        self.state = CLOSED
+        self.outcomes = collections.deque(maxlen=window_size)
+        self.opened_at = 0.0
+        self.next_ticket = 1
+        # First ticket admitted since the last state change, the outcomes of older tickets are ignored
+        self.window_start_ticket = 1
+        self.probe_ticket = None
+        self.probe_started = None
+
+    def allow_request(self) -> int or None:
+        """
+        :return: ticket of the call to give back to record_success() or record_failure(), None if it must fail fast
+        """
+        with self.lock:
+            ticket = self.next_ticket
+            if self.state == CLOSED:
+                self.next_ticket += 1
+                return ticket
+            now = time.monotonic()
+            if self.state == OPEN:
+                if now - self.opened_at < self.open_duration:
+                    return None
+                self.state = HALF_OPEN
+            # A probe which never reported its outcome does not keep the circuit half open forever
+            if self.probe_started is not None and now - self.probe_started < self.open_duration:
+                return None
+            self.next_ticket += 1
+            self.probe_ticket = ticket
+            self.probe_started = now
+            return ticket
+
+    def record_success(self, ticket: int) -> bool:
+        """
+        :param ticket: ticket returned by allow_request() for the call
+        :return: True if the call closed the circuit
+        """
+        with self.lock:
+            if self.state != CLOSED:
+                if ticket != self.probe_ticket:
+                    return False
+                self.__change_state(CLOSED)
+                return True
+            if ticket < self.window_start_ticket:
+                return False
+            self.outcomes.append(False)
+            return False
+
+    def record_failure(self, ticket: int) -> bool:
+        """
+        :param ticket: ticket returned by allow_request() for the call
+        :return: True if the call opened the circuit
+        """
+        with self.lock:
+            if self.state != CLOSED:
+                if ticket != self.probe_ticket:
+                    return False
+                self.__change_state(OPEN)
+                return True
+            if ticket < self.window_start_ticket:
+                return False
+            self.outcomes.append(True)
+            if len(self.outcomes) >= self.minimum_calls and \
+                    sum(self.outcomes) / len(self.outcomes) >= self.failure_rate_threshold:
+                self.__change_state(OPEN)
+                return True
+            return False
+
+    def __change_state(self, state: str) -> None:
+        self.state = state
+        self.outcomes.clear()
+        self.window_start_ticket = self.next_ticket
+        self.probe_ticket = None
+        self.probe_started = None
+        if state == OPEN:
+            self.opened_at = time.monotonic()
+
+    def retry_after(self) -> float:
+        """
+        :return: seconds before the next probe call is let through, 0 if the circuit is closed
+        """
+        with self.lock:
+            if self.state == CLOSED:
+                return 0.0
+            return max(0.0, self.opened_at + self.open_duration - time.monotonic())
+
+    def to_dict(self) -> dict:
+        with self.lock:
+            return {"host": self.host, "state": self.state, "calls": len(self.outcomes),
+                    "failures": sum(self.outcomes)}
+
+
+class CircuitBreakerRegistry:
+    """
+    Breakers of the process, one per host, so all the sessions calling the same backend share its state.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.breakers = {}
+
+    def get(self, host: str, settings: dict = None) -> CircuitBreaker:
+        """
+        :param host: host, with the port if any, of the called URL
+        :param settings: CircuitBreaker keyword arguments, used only when the breaker of the host is created
+        :return: the breaker of the host
+        """
+        breaker = self.breakers.get(host)
+        if breaker is None:
+            with self.lock:
+                breaker = self.breakers.get(host)
+                if breaker is None:
+                    breaker = self.breakers[host] = CircuitBreaker(host, **(settings or {}))
+        return breaker
+
+    def reset(self) -> None:
+        with self.lock:
+            self.breakers = {}
+
+    def to_dict(self) -> dict:
+        with self.lock:
+            breakers = list(self.breakers.values())
+        return {breaker.host: breaker.to_dict() for breaker in breakers}
+
+
+'''Registry shared by all the API sessions of the process'''
+breakers = CircuitBreakerRegistry()
@@ -0,0 +1,216 @@
+from __future__ import annotations
+import cProfile
+import io
+import os
+import pstats
+import sys
+import threading
+import time
+import tracemalloc
+from datetime import datetime
+
+import helpers.Tracing as Tracing
+
+'''Command line switches handled by the entry point, removed from sys.argv before the script main() parses it'''
+PROFILE_SWITCH = "--profile"
+PROFILE_MEM_SWITCH = "--profile-mem"
+TIMINGS_SWITCH = "--timings"
+PROFILE_TOP_FUNCTIONS = 40
+PROFILE_MEM_TOP_ALLOCATIONS = 25
+PROFILE_MEM_FRAMES = 10
+'''Interval, in seconds, between two checks of the traced memory, and the growth over the last snapshot which
+triggers a new one'''
+PROFILE_MEM_SAMPLE_INTERVAL = 0.5
+PROFILE_MEM_SNAPSHOT_GROWTH = 1.1
+'''Span categories which are not summarized per name by --timings: the HTTP attempts are already counted by the
+service spans wrapping them'''
+TIMINGS_IGNORED_CATEGORIES = ("http",)
+'''Switches given to the running script, set by run()'''
+active_switches = set()
+
+
+def pop_switches(argv: list) -> tuple:
+    """
+    Remove the entry point switches from the command line arguments.
+    :param argv: command line arguments, without the script name
+    :return: tuple of the set of found switches and the remaining arguments
+    """
+    switches = {PROFILE_SWITCH, PROFILE_MEM_SWITCH, TIMINGS_SWITCH}
+    found = {argument for argument in argv if argument in switches}
+    return found, [argument for argument in argv if argument not in switches]
+
+
+def timings_enabled() -> bool:
+    """
+    :return: True if the running script was started with --timings
+    """
+    return TIMINGS_SWITCH in active_switches
+
+
+def _report_file(output_dir: str, script_name: str, suffix: str) -> str:
+    return os.path.join(output_dir, f"{script_name}_{datetime.now().strftime('%d-%m-%Y_%Hh%Mm%Ss')}{suffix}")
+
+
+def _write_report(file_path: str, content: str) -> None:
+    print(content)
+    try:
+        os.makedirs(os.path.dirname(file_path) or ".", exist_ok=True)
+        with open(file_path, "w") as file:
+            file.write(content)
+        print(f"Report written to {file_path}")
+    except OSError as detailed_exception:
+        print(f"Exception occurred while attempting to write report file: {file_path}\n<{detailed_exception}>")
+
+
+def profile_report(profiler: cProfile.Profile, output_dir: str, script_name: str) -> None:
+    """
+    Dump the cProfile statistics, loadable with pstats or snakeviz, and print the functions with the highest
+    cumulative time.
+    :param profiler: stopped profiler
+    :param output_dir: directory receiving the .prof and summary files
+    :param script_name: name of the script, used as file name prefix
+    """
+    stats_file = _report_file(output_dir, script_name, ".prof")
+    try:
+        os.makedirs(output_dir, exist_ok=True)
+        profiler.dump_stats(stats_file)
+    except OSError as detailed_exception:
+        print(f"Exception occurred while attempting to write profile file: {stats_file}\n<{detailed_exception}>")
+    summary = io.StringIO()
+    pstats.Stats(profiler, stream=summary).sort_stats(pstats.SortKey.CUMULATIVE).print_stats(PROFILE_TOP_FUNCTIONS)
+    _write_report(stats_file[:-len(".prof")] + "_profile.txt", summary.getvalue())
+
+
+class PeakSnapshotter:
+    """
+    Daemon thread taking a tracemalloc snapshot each time the traced memory grows by PROFILE_MEM_SNAPSHOT_GROWTH over
+    the last snapshot, so the report shows the allocations alive close to the peak instead of only the ones left at
+    the end of the script.
+    """
+
+    def __init__(self, interval: float = PROFILE_MEM_SAMPLE_INTERVAL, growth: float = PROFILE_MEM_SNAPSHOT_GROWTH):
+        self.interval = interval
+        self.growth = growth
+        self.snapshot = None
+        self.snapshot_size = 0
+        self.stop_event = threading.Event()
+        self.thread = threading.Thread(target=self.__sample, name="PeakSnapshotter", daemon=True)
+
+    def __sample(self) -> None:
+        while not self.stop_event.wait(self.interval):
+            self.check()
+
+    def check(self) -> None:
+        current = tracemalloc.get_traced_memory()[0]
+        if current > self.snapshot_size * self.growth:
+            self.snapshot = tracemalloc.take_snapshot()
+            self.snapshot_size = current
+
+    def start(self) -> None:
+        self.thread.start()
+
+    def stop(self) -> tracemalloc.Snapshot:
+        """
+        :return: the snapshot taken closest to the peak, including a last check at the end of the script
+        """
+        self.stop_event.set()
+        self.thread.join()
+        self.check()
+        return self.snapshot
+
+
+def memory_report(snapshot: tracemalloc.Snapshot, peak: int, output_dir: str, script_name: str) -> None:
+    """
+    Print the source lines which allocated the most memory in the snapshot.
+    :param snapshot: tracemalloc snapshot taken close to the peak
+    :param peak: peak traced memory, in bytes
+    :param output_dir: directory receiving the summary file
+    :param script_name: name of the script, used as file name prefix
+    """
+    snapshot = snapshot.filter_traces((tracemalloc.Filter(False, tracemalloc.__file__),
+                                       tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+                                       tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>")))
+    statistics = snapshot.statistics("traceback")
+    lines = [f"Peak traced memory: {peak / 1024 / 1024:.1f} MiB",
+             f"Memory allocated at the snapshot: {sum(statistic.size for statistic in statistics) / 1024 / 1024:.1f} "
+             f"MiB",
+             f"Top {PROFILE_MEM_TOP_ALLOCATIONS} allocations:"]
+    for index, statistic in enumerate(statistics[:PROFILE_MEM_TOP_ALLOCATIONS], start=1):
+        lines.append(f"#{index}: {statistic.size / 1024:.1f} KiB in {statistic.count} blocks")
+        lines.extend(f"    {line}" for line in statistic.traceback.format(limit=3, most_recent_first=True))
+    _write_report(_report_file(output_dir, script_name, "_memory.txt"), "\n".join(lines) + "\n")
+
+
+def timings_report(tracer: Tracing.Tracer, wall_time: float, output_dir: str, script_name: str) -> None:
+    """
+    Print the wall time spent in each traced phase, library method and service.
+    :param tracer: tracer which recorded the spans of the script
+    :param wall_time: wall time of the whole script, in seconds
+    :param output_dir: directory receiving the summary file
+    :param script_name: name of the script, used as file name prefix
+    """
+    phases = {}
+    for event in tracer.to_chrome_trace()["traceEvents"]:
+        if event["ph"] != "X" or event["cat"] in TIMINGS_IGNORED_CATEGORIES:
+            continue
+        phase = phases.setdefault((event["cat"], event["name"]), [0, 0.0, 0.0])
+        phase[0] += 1
+        phase[1] += event["dur"] / 1e6
+        phase[2] = max(phase[2], event["dur"] / 1e6)
+    lines = [f"Wall time: {wall_time:.3f}s",
+             f"{'category':<12} {'name':<56} {'calls':>7} {'total s':>10} {'max s':>9} {'% wall':>7}"]
+    for (category, name), (calls, total, maximum) in sorted(phases.items(), key=lambda item: item[1][1],
+                                                            reverse=True):
+        lines.append(f"{category:<12} {name:<56} {calls:>7} {total:>10.3f} {maximum:>9.3f} "
+                     f"{100 * total / wall_time if wall_time else 0:>6.1f}%")
+    _write_report(_report_file(output_dir, script_name, "_timings.txt"), "\n".join(lines) + "\n")
+
+
+def run(main, output_dir: str, script_name: str = None):
+    """
+    Run the main() of a script, with optional diagnostics selected on the command line:
+    --profile: cProfile statistics sorted by cumulative time
+    --profile-mem: tracemalloc top allocations, from the snapshot taken closest to the memory peak
+    --timings: wall time summary of the traced phases
+    The switches are removed from sys.argv, so the argument parsing of the script is not affected. The reports are
+    written even if the script exits with sys.exit().
+    :param main: main procedure of the script
+    :param output_dir: directory receiving the reports
+    :param script_name: name used as report file prefix, the name of the script file by default
+    :return: the value returned by main()
+    """
+    switches, arguments = pop_switches(sys.argv[1:])
+    sys.argv[1:] = arguments
+    active_switches.update(switches)
+    script_name = script_name or os.path.splitext(os.path.basename(sys.argv[0]))[0]
+    if not switches:
+        return main()
+
+    if TIMINGS_SWITCH in switches:
+        Tracing.tracer.enable()
+    snapshotter = None
+    if PROFILE_MEM_SWITCH in switches:
+        tracemalloc.start(PROFILE_MEM_FRAMES)
+        snapshotter = PeakSnapshotter()
+        snapshotter.start()
+    profiler = cProfile.Profile() if PROFILE_SWITCH in switches else None
+
+    start = time.perf_counter()
+    if profiler is not None:
+        profiler.enable()
+    try:
+        with Tracing.tracer.span(script_name, "script"):
+            return main()
+    finally:
+        if profiler is not None:
+            profiler.disable()
+        wall_time = time.perf_counter() - start
+        if snapshotter is not None:
+            snapshot = snapshotter.stop()
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+            memory_report(snapshot, peak, output_dir, script_name)
+        if profiler is not None:
+            profile_report(profiler, output_dir, script_name)
+        if TIMINGS_SWITCH in switches:
+            timings_report(Tracing.tracer, wall_time, output_dir, script_name)
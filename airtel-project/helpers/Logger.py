@@ -1,10 +1,13 @@
 from __future__ import annotations
+import gzip
 import os
 import logging
+import shutil
+import threading
 from logging import handlers
 
 
-def create_logger(name: str, log_level: str, log_path: str, log_file: str, reset_log: bool = False, max_log_bytes=1000000, max_log_backups=10) -> logging.getLogger() or None:
+def create_logger(name: str, log_level: str, log_path: str, log_file: str, reset_log: bool = False, max_log_bytes=1000000, max_log_backups=10, compress_backups: bool = True) -> logging.getLogger() or None:
     """
     Create a logger object. Script logs will be sent to console (INFO level) and a log file. ApiSession logs will be
     sent to a separate file only.
@@ -13,6 +16,7 @@ def create_logger(name: str, log_level: str, log_path: str, log_file: str, reset
     :param log_path: path to the log file
     :param log_file: the log file name
     :param reset_log: True means open with w, False meanse open with a
+    :param compress_backups: True means rotated log files are stored gzip compressed, as <log_file>.<n>.gz
     :return: the logger object
     """
     log = None
@@ -41,6 +45,9 @@ def create_logger(name: str, log_level: str, log_path: str, log_file: str, reset
         #file_handler = logging.FileHandler(file, 'w')
         file_handler = handlers.RotatingFileHandler(filename=file, mode=file_mode, maxBytes=max_log_bytes, backupCount=max_log_backups)
         file_handler.setFormatter(logging.Formatter(format_str))
+        if compress_backups:
+            file_handler.namer = compressed_log_namer
+            file_handler.rotator = compressed_log_rotator
 
         log.addHandler(console_handler)
         log.addHandler(file_handler)
@@ -49,6 +56,47 @@ def create_logger(name: str, log_level: str, log_path: str, log_file: str, reset
     return log
 
 
+class LazyLogger:
+    """
+    Logger proxy which calls create_logger, and so creates the log folder and file, on first use instead of when the
+    module defining it is imported.
+    """
+
+    def __init__(self, *create_args, **create_kwargs):
+        self._create_args = create_args
+        self._create_kwargs = create_kwargs
+        self._logger = None
+        self._lock = threading.Lock()
+
+    def get_logger(self) -> logging.Logger:
+        if self._logger is None:
+            with self._lock:
+                if self._logger is None:
+                    self._logger = create_logger(*self._create_args, **self._create_kwargs)
+        return self._logger
+
+    def __getattr__(self, name: str):
+        value = getattr(self.get_logger(), name)
+        if callable(value):
+            # Later calls of the logging methods go directly to the logger
+            setattr(self, name, value)
+        return value
+
+
+def create_lazy_logger(name: str, log_level: str, log_path: str, log_file: str, **kwargs) -> LazyLogger:
+    """
+    Create a logger which is set up only when it logs for the first time, used by the libraries so importing them does
+    not touch the log share.
+    :param name: the name of the current module
+    :param log_level: the log level for this logger object
+    :param log_path: path to the log file
+    :param log_file: the log file name
+    :param kwargs: other create_logger arguments
+    :return: the logger proxy
+    """
+    return LazyLogger(name, log_level, log_path, log_file, **kwargs)
+
+
 def create_file(*args: str) -> str or None:
     """
     Creates a file if it doesn't already exist.
@@ -79,3 +127,29 @@ def create_folder(*args: str) -> str or None:
             print(f"Exception occurred while attempting to create folder: {folder}\n<{detailed_exception}>")
             return None
     return folder
+
+
+def compressed_log_namer(default_name: str) -> str:
+    """
+    Name rotated log files with the .gz extension.
+    :param default_name: the name chosen by the rotating handler
+    :return: the rotated log file name
+    """
+    return default_name + ".gz"
+
+
+def compressed_log_rotator(source: str, destination: str) -> None:
+    """
+    Compress the log file which is rotated and remove the uncompressed file. If the compression fails, the file is
+    moved uncompressed under the .gz name, so the handler still rotates and deletes it with the other backups.
+    :param source: the log file which is rotated
+    :param destination: the rotated log file name
+    """
+    try:
+        with open(source, "rb") as source_file, gzip.open(destination, "wb") as destination_file:
+            shutil.copyfileobj(source_file, destination_file)
+        os.remove(source)
+    except Exception as detailed_exception:
+        print(f"Exception occurred while attempting to compress rotated log file: {source}\n<{detailed_exception}>")
+        if os.path.exists(source):
+            os.replace(source, destination)
@@ -0,0 +1,280 @@
+from __future__ import annotations
+import atexit
+import json
+import os
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse
+
+'''Upper bounds, in seconds, of the latency histogram buckets. The last bucket (+Inf) is implicit.'''
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+PERCENTILES = (50, 95, 99)
+PROMETHEUS_PREFIX = "airtel_api"
+
+
+class LatencyHistogram:
+    """
+    Fixed bucket latency histogram. Memory does not grow with the number of requests; percentiles are estimated by
+    linear interpolation inside the bucket holding the requested rank.
+    """
+    __slots__ = ("bucket_counts", "count", "total", "maximum")
+
+    def __init__(self):
+        self.bucket_counts = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.maximum = 0.0
+
+    def observe(self, latency: float) -> None:
+        index = len(LATENCY_BUCKETS)
+        for bucket_index, upper_bound in enumerate(LATENCY_BUCKETS):
+            if latency <= upper_bound:
+                index = bucket_index
+                break
+        self.bucket_counts[index] += 1
+        self.count += 1
+        self.total += latency
+        self.maximum = max(self.maximum, latency)
+
+    def percentile(self, percent: float) -> float:
+        if not self.count:
+            return 0.0
+        rank = self.count * percent / 100
+        seen = 0
+        lower_bound = 0.0
+        for bucket_index, bucket_count in enumerate(self.bucket_counts):
+            upper_bound = LATENCY_BUCKETS[bucket_index] if bucket_index < len(LATENCY_BUCKETS) else self.maximum
+            if bucket_count and seen + bucket_count >= rank:
+                return min(lower_bound + (upper_bound - lower_bound) * (rank - seen) / bucket_count, self.maximum)
+            seen += bucket_count
+            lower_bound = upper_bound
+        return self.maximum
+
+
+class EndpointMetrics:
+    __slots__ = ("requests", "errors", "retries", "fast_failures", "bytes_in", "bytes_out", "rate_limit_wait",
+                 "latency")
+
+    def __init__(self):
+        self.requests = 0
+        self.errors = 0
+        self.retries = 0
+        self.fast_failures = 0
+        self.bytes_in = 0
+        self.bytes_out = 0
+        self.rate_limit_wait = 0.0
+        self.latency = LatencyHistogram()
+
+
+class MetricsRegistry:
+    """
+    In-process registry of the REST calls, keyed by (service, method_name, HTTP verb). Safe to use from several
+    threads.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.endpoints = {}
+        self.gauges = {}
+
+    def record(self, service: str, method_name: str, verb: str, latency: float, bytes_out: int = 0,
+               bytes_in: int = 0, error: bool = False, retry: bool = False, fast_fail: bool = False,
+               rate_limit_wait: float = 0.0) -> None:
+        """
+        Record one request attempt.
+        :param service: name of the called service, for example velocity
+        :param method_name: name of the library method which sent the request
+        :param verb: HTTP verb
+        :param latency: duration of the request in seconds
+        :param bytes_out: size of the request body
+        :param bytes_in: size of the response body
+        :param error: True if the request raised an exception or did not return a success status code
+        :param retry: True if the request is a retry of a failed attempt
+        :param fast_fail: True if the request was not sent because the circuit breaker of the host is open, only the
+        fast_failures counter is incremented
+        :param rate_limit_wait: time waited for the client side rate limiter before sending the request, in seconds
+        """
+        key = (service, method_name, verb.upper())
+        with self.lock:
+            endpoint = self.endpoints.get(key)
+            if endpoint is None:
+                endpoint = self.endpoints[key] = EndpointMetrics()
+            if fast_fail:
+                endpoint.fast_failures += 1
+                return
+            endpoint.requests += 1
+            endpoint.errors += int(error)
+            endpoint.retries += int(retry)
+            endpoint.bytes_in += bytes_in
+            endpoint.bytes_out += bytes_out
+            endpoint.rate_limit_wait += rate_limit_wait
+            endpoint.latency.observe(latency)
+
+    def register_gauge(self, name: str, description: str, function) -> None:
+        """
+        Register a gauge whose values are read when the metrics are exported. Registering the same name again replaces
+        the function.
+        :param name: name of the gauge, without the Prometheus prefix
+        :param description: description of the gauge
+        :param function: callable returning a dictionary {((label name, label value), ...): value}
+        """
+        with self.lock:
+            self.gauges[name] = (description, function)
+
+    def __read_gauges(self) -> dict:
+        with self.lock:
+            gauges = dict(self.gauges)
+        return {name: (description, function()) for name, (description, function) in sorted(gauges.items())}
+
+    def reset(self) -> None:
+        with self.lock:
+            self.endpoints = {}
+
+    def to_dict(self) -> dict:
+        """
+        :return: dictionary with one entry per endpoint, sorted by total latency, the slowest first
+        """
+        with self.lock:
+            endpoints = []
+            for (service, method_name, verb), endpoint in self.endpoints.items():
+                entry = {"service": service, "method_name": method_name, "verb": verb,
+                         "requests": endpoint.requests, "errors": endpoint.errors, "retries": endpoint.retries,
+                         "fast_failures": endpoint.fast_failures, "bytes_in": endpoint.bytes_in,
+                         "bytes_out": endpoint.bytes_out, "rate_limit_wait": round(endpoint.rate_limit_wait, 6),
+                         "latency_total": round(endpoint.latency.total, 6),
+                         "latency_max": round(endpoint.latency.maximum, 6)}
+                for percent in PERCENTILES:
+                    entry[f"latency_p{percent}"] = round(endpoint.latency.percentile(percent), 6)
+                endpoints.append(entry)
+        endpoints.sort(key=lambda entry: entry["latency_total"], reverse=True)
+        services = {}
+        for entry in endpoints:
+            service = services.setdefault(entry["service"], {"requests": 0, "errors": 0, "fast_failures": 0,
+                                                             "latency_total": 0.0})
+            service["requests"] += entry["requests"]
+            service["errors"] += entry["errors"]
+            service["fast_failures"] += entry["fast_failures"]
+            service["latency_total"] = round(service["latency_total"] + entry["latency_total"], 6)
+        gauges = {name: [dict(labels, value=value) for labels, value in values.items()]
+                  for name, (_, values) in self.__read_gauges().items()}
+        return {"services": services, "endpoints": endpoints, "gauges": gauges}
+
+    def to_prometheus(self) -> str:
+        """
+        :return: the metrics in the Prometheus text exposition format
+        """
+        lines = []
+        for name, (description, values) in self.__read_gauges().items():
+            lines.append(f"# HELP {PROMETHEUS_PREFIX}_{name} {description}")
+            lines.append(f"# TYPE {PROMETHEUS_PREFIX}_{name} gauge")
+            for labels, value in sorted(values.items()):
+                lines.append(f"{PROMETHEUS_PREFIX}_{name}{{{_gauge_labels(labels)}}} {value}")
+        counters = (("requests", "Number of requests"), ("errors", "Number of failed requests"),
+                    ("retries", "Number of retried requests"),
+                    ("fast_failures", "Number of requests failed fast by an open circuit breaker"),
+                    ("rate_limit_wait", "Seconds waited for the client side rate limiter"),
+                    ("bytes_in", "Bytes received in response bodies"), ("bytes_out", "Bytes sent in request bodies"))
+        with self.lock:
+            items = sorted(self.endpoints.items())
+            for counter, description in counters:
+                lines.append(f"# HELP {PROMETHEUS_PREFIX}_{counter}_total {description}")
+                lines.append(f"# TYPE {PROMETHEUS_PREFIX}_{counter}_total counter")
+                for key, endpoint in items:
+                    lines.append(f"{PROMETHEUS_PREFIX}_{counter}_total{{{_labels(key)}}} {getattr(endpoint, counter)}")
+            lines.append(f"# HELP {PROMETHEUS_PREFIX}_request_duration_seconds Request latency")
+            lines.append(f"# TYPE {PROMETHEUS_PREFIX}_request_duration_seconds histogram")
+            for key, endpoint in items:
+                labels = _labels(key)
+                cumulative = 0
+                for bucket_index, bucket_count in enumerate(endpoint.latency.bucket_counts):
+                    cumulative += bucket_count
+                    upper_bound = LATENCY_BUCKETS[bucket_index] if bucket_index < len(LATENCY_BUCKETS) else "+Inf"
+                    lines.append(f'{PROMETHEUS_PREFIX}_request_duration_seconds_bucket{{{labels},le="{upper_bound}"}} '
+                                 f'{cumulative}')
+                lines.append(f"{PROMETHEUS_PREFIX}_request_duration_seconds_sum{{{labels}}} {endpoint.latency.total}")
+                lines.append(f"{PROMETHEUS_PREFIX}_request_duration_seconds_count{{{labels}}} "
+                             f"{endpoint.latency.count}")
+        return "\n".join(lines) + "\n"
+
+    def dump_json(self, file_path: str) -> bool:
+        """
+        Write the metrics as JSON, replacing the file atomically.
+        :param file_path: path of the JSON file
+        :return: True or False
+        """
+        return _write_file(file_path, json.dumps(self.to_dict(), indent=2))
+
+    def dump_prometheus(self, file_path: str) -> bool:
+        """
+        Write the metrics in the Prometheus text format, for example in the node_exporter textfile collector directory.
+        :param file_path: path of the .prom file
+        :return: True or False
+        """
+        return _write_file(file_path, self.to_prometheus())
+
+    def dump_at_exit(self, file_path: str) -> None:
+        """
+        Write the metrics as JSON when the script ends.
+        :param file_path: path of the JSON file
+        """
+        atexit.register(self.dump_json, file_path)
+
+    def serve_prometheus(self, port: int, address: str = "") -> ThreadingHTTPServer or None:
+        """
+        Serve the metrics on http://<address>:<port>/metrics from a daemon thread, so they can be scraped while a
+        long script is running.
+        :param port: TCP port
+        :param address: address to bind, all the interfaces by default
+        :return: the HTTP server, call shutdown() on it to stop serving
+        """
+        registry = self
+
+        class MetricsHandler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if urlparse(self.path).path != "/metrics":
+                    self.send_error(404)
+                    return
+                body = registry.to_prometheus().encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        try:
+            server = ThreadingHTTPServer((address, port), MetricsHandler)
+        except OSError as detailed_exception:
+            print(f"Exception occurred while attempting to serve metrics on port {port}\n<{detailed_exception}>")
+            return None
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        return server
+
+
+def _labels(key: tuple) -> str:
+    service, method_name, verb = (str(value).replace("\\", "\\\\").replace('"', '\\"') for value in key)
+    return f'service="{service}",method_name="{method_name}",verb="{verb}"'
+
+
+def _gauge_labels(labels: tuple) -> str:
+    values = (str(value).replace("\\", "\\\\").replace('"', '\\"') for _, value in labels)
+    return ",".join(f'{name}="{value}"' for (name, _), value in zip(labels, values))
+
+
+def _write_file(file_path: str, content: str) -> bool:
+    temp_file = file_path + ".tmp"
+    try:
+        os.makedirs(os.path.dirname(file_path) or ".", exist_ok=True)
+        with open(temp_file, "w") as file:
+            file.write(content)
+        os.replace(temp_file, file_path)
+    except OSError as detailed_exception:
+        print(f"Exception occurred while attempting to write metrics file: {file_path}\n<{detailed_exception}>")
+        return False
+    return True
+
+
+'''Registry shared by all the API sessions of the process'''
+registry = MetricsRegistry()
@@ -0,0 +1,160 @@
+from __future__ import annotations
+import threading
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+
+'''HTTP verbs of the read endpoint class, all the other verbs are writes'''
+READ_VERBS = ("GET", "HEAD", "OPTIONS")
+
+
+def endpoint_class(verb: str) -> str:
+    """
+    :param verb: HTTP verb of the request
+    :return: read or write
+    """
+    return "read" if verb.upper() in READ_VERBS else "write"
+
+
+def retry_after_seconds(value: str or None, default: float) -> float:
+    """
+    Parse a Retry-After header, given either in seconds or as an HTTP date.
+    :param value: header value, None if the header is missing
+    :param default: delay returned when the header is missing or not valid
+    :return: delay in seconds
+    """
+    if not value:
+        return default
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, (parsedate_to_datetime(value) - datetime.now(timezone.utc)).total_seconds())
+    except (TypeError, ValueError):
+        return default
+
+
+class TokenBucket:
+    """
+    Token bucket refilled at rate tokens per second, up to burst tokens. Each request takes one token; when the bucket
+    is empty the request reserves the next token and waits for it, so the waiting requests are released in the order
+    they arrived at the configured rate. The reservation is done under a threading lock, so the bucket can be shared
+    by the threads of the process, and the wait is done by the caller.
+    """
+
+    def __init__(self, rate: float, burst: float = None):
+        self.rate = float(rate)
+        self.burst = float(max(burst or rate, 1))
+        self.lock = threading.Lock()
+        self.tokens = self.burst
+        # Time at which self.tokens is valid, in the future while the bucket is paused
+        self.updated = time.monotonic()
+
+    def __refill(self, now: float) -> None:
+        if now > self.updated:
+            self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+
+    def reserve(self) -> float:
+        """
+        Take one token.
+        :return: seconds to wait before sending the request
+        """
+        with self.lock:
+            now = time.monotonic()
+            self.__refill(now)
+            self.tokens -= 1
+            return (self.updated - now) + (-self.tokens / self.rate if self.tokens < 0 else 0.0)
+
+    def current_wait(self) -> float:
+        """
+        :return: seconds a request arriving now would wait, without taking a token
+        """
+        with self.lock:
+            now = time.monotonic()
+            tokens = min(self.burst, self.tokens + max(0.0, now - self.updated) * self.rate)
+            return max(0.0, self.updated - now) + (max(0.0, 1 - tokens) / self.rate)
+
+    def pause(self, seconds: float) -> None:
+        """
+        Stop releasing tokens for the given time, used when the server answers 429. No token is accumulated during
+        the pause and a single request is released when it ends.
+        :param seconds: duration of the pause
+        """
+        with self.lock:
+            now = time.monotonic()
+            self.__refill(now)
+            self.tokens = min(self.tokens, 1.0)
+            self.updated = max(self.updated, now + seconds)
+
+    def acquire(self) -> float:
+        """
+        Take one token, sleeping the calling thread until it is available.
+        :return: seconds waited
+        """
+        wait = self.reserve()
+        if wait > 0:
+            time.sleep(wait)
+        return max(wait, 0.0)
+
+
+class RateLimiterRegistry:
+    """
+    Buckets of the process, one per host and endpoint class, so all the sessions and threads calling the same backend
+    share its limits. The settings have the format:
+    {"read": {"rate": 20, "burst": 40}, "write": {"rate": 10, "burst": 20}, "hosts": {"<host>": {"read": {...}}}}
+    where the entries of "hosts" replace the default read and write limits for the given hosts. A missing endpoint
+    class is not limited.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.buckets = {}
+
+    def get(self, host: str, request_class: str, settings: dict = None) -> TokenBucket or None:
+        """
+        :param host: host, with the port if any, of the called URL
+        :param request_class: read or write, see endpoint_class()
+        :param settings: rate limit settings, used only when the bucket is created
+        :return: the bucket of the host and endpoint class, None if it is not limited
+        """
+        key = (host, request_class)
+        if key in self.buckets:
+            return self.buckets[key]
+        if not settings:
+            return None
+        with self.lock:
+            if key not in self.buckets:
+                limits = settings.get("hosts", {}).get(host, settings).get(request_class)
+                self.buckets[key] = TokenBucket(limits["rate"], limits.get("burst")) if limits else None
+            return self.buckets[key]
+
+    def pause(self, host: str, seconds: float) -> None:
+        """
+        Pause all the buckets of a host, after a 429 answer.
+        :param host: host, with the port if any
+        :param seconds: duration of the pause
+        """
+        with self.lock:
+            buckets = [bucket for (bucket_host, _), bucket in self.buckets.items()
+                       if bucket_host == host and bucket is not None]
+        for bucket in buckets:
+            bucket.pause(seconds)
+
+    def wait_times(self) -> dict:
+        """
+        :return: dictionary {(("host", <host>), ("endpoint_class", <class>)): current wait in seconds}
+        """
+        with self.lock:
+            buckets = [(key, bucket) for key, bucket in self.buckets.items() if bucket is not None]
+        return {(("host", host), ("endpoint_class", request_class)): round(bucket.current_wait(), 6)
+                for (host, request_class), bucket in buckets}
+
+    def reset(self) -> None:
+        with self.lock:
+            self.buckets = {}
+
+
+'''Registry shared by all the API sessions of the process'''
+limiters = RateLimiterRegistry()
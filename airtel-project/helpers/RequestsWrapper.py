@@ -1,18 +1,207 @@
 import requests
 import json
+import threading
+import time
+from urllib.parse import urlparse
+
+import helpers.CircuitBreaker as CircuitBreaker
+import helpers.Metrics as Metrics
+import helpers.RateLimiter as RateLimiter
+import helpers.Tracing as Tracing
 
 from requests.packages.urllib3.exceptions import InsecureRequestWarning
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 requests.packages.urllib3.disable_warnings(InsecureRequestWarning)
 
+'''Default timeouts, in seconds, to establish the connection and to wait for the response of each request'''
+CONNECT_TIMEOUT = 10
+READ_TIMEOUT = 300
+'''Replays of a request answered 429, not counted as attempts, and the delay used when the answer has no valid
+Retry-After header. A longer Retry-After than RETRY_AFTER_MAX, or a 429 answer after the last replay, fails the
+request without using the remaining attempts.'''
+MAX_RATE_LIMITED_REPLAYS = 3
+RETRY_AFTER_DEFAULT = 1.0
+RETRY_AFTER_MAX = 120
+
+
+def json_dumps(data):
+    '''
+    Serialize a request body, using orjson when it is installed and the stdlib json module otherwise.
+    :param data: (JSON serializable data)
+    :return: serialized data, bytes with orjson or str with json
+    '''
+    if orjson is not None:
+        try:
+            return orjson.dumps(data, option=orjson.OPT_NON_STR_KEYS)
+        except TypeError:
+            pass
+    return json.dumps(data)
+
+
+def json_loads(content):
+    '''
+    Parse a response body, using orjson when it is installed and the stdlib json module otherwise.
+    :param content: (bytes or str to parse)
+    :return: parsed data, raises ValueError if the content is not valid JSON
+    '''
+    if orjson is not None:
+        return orjson.loads(content)
+    return json.loads(content)
+
+
+def body_size(body):
+    '''
+    Size of a request or response body, used by the metrics.
+    :param body: (bytes, str or None)
+    :return: number of bytes
+    '''
+    if body is None:
+        return 0
+    if isinstance(body, str):
+        return len(body.encode("utf-8"))
+    try:
+        return len(body)
+    except TypeError:
+        return 0
+
+
+def instrument_session(session, service_name, metrics_registry=None):
+    '''
+    Record the metrics of the requests sent by a requests.Session which is not an APISession, for example the session
+    used by the jira library. The method name is taken from the last non numeric part of the URL path.
+    :param session: (requests.Session to instrument)
+    :param service_name: (name of the service, used as metrics label)
+    :param metrics_registry: (Metrics.MetricsRegistry, the process registry by default)
+    '''
+    metrics_registry = metrics_registry or Metrics.registry
+
+    def record_response(response, *args, **kwargs):
+        path_parts = [part for part in urlparse(response.url).path.split("/") if part and not part.isdigit()]
+        method_name = path_parts[-1] if path_parts else "/"
+        metrics_registry.record(service_name, method_name, response.request.method,
+                                response.elapsed.total_seconds(), bytes_out=body_size(response.request.body),
+                                bytes_in=body_size(response.content), error=response.status_code >= 400)
+        response_end = time.perf_counter()
+        Tracing.tracer.add_span(f"{service_name}.{method_name}", service_name,
+                                response_end - response.elapsed.total_seconds(), response_end,
+                                verb=response.request.method, path=urlparse(response.url).path,
+                                status_code=response.status_code)
+
+    session.hooks["response"].append(record_response)
+
+
+def rate_limit_session(session, rate_limits, metrics_registry=None):
+    '''
+    Apply the client side rate limits to the requests sent by a requests.Session which is not an APISession, for
+    example the session used by the jira library. A 429 answer pauses the buckets of the host for its Retry-After, the
+    replay of the request is left to the session.
+    :param session: (requests.Session to limit)
+    :param rate_limits: (rate limit settings, see RateLimiter.RateLimiterRegistry)
+    :param metrics_registry: (Metrics.MetricsRegistry exposing the current wait, the process registry by default)
+    '''
+    metrics_registry = metrics_registry or Metrics.registry
+    metrics_registry.register_gauge("rate_limit_wait_seconds", "Current wait of the client side rate limiter",
+                                    RateLimiter.limiters.wait_times)
+    send = session.request
+
+    def request(method, url, *args, **kwargs):
+        bucket = RateLimiter.limiters.get(urlparse(url).netloc, RateLimiter.endpoint_class(method), rate_limits)
+        if bucket is not None:
+            wait_start = time.perf_counter()
+            if bucket.acquire():
+                Tracing.tracer.add_span("rate_limit", "http", wait_start, time.perf_counter())
+        return send(method, url, *args, **kwargs)
+
+    def pause_host(response, *args, **kwargs):
+        if response.status_code == 429:
+            RateLimiter.limiters.pause(urlparse(response.url).netloc,
+                                       RateLimiter.retry_after_seconds(response.headers.get("Retry-After"),
+                                                                       RETRY_AFTER_DEFAULT))
+
+    session.request = request
+    session.hooks["response"].append(pause_host)
+
 
 class APISession(requests.Session):
-    def __init__(self, repeat_step=1):
+    def __init__(self, repeat_step=1, service_name="api", metrics_registry=None, auth_refresh=None, timeout=None,
+                 breaker_settings=None, rate_limits=None):
+        '''
+        :param repeat_step: (Number of attempts of each request)
+        :param service_name: (Name of the called service, used as metrics label)
+        :param metrics_registry: (Metrics.MetricsRegistry, the process registry by default)
+        :param auth_refresh: (Callable renewing the credentials when the service answers 401, returns the headers to
+        update or a false value when the credentials could not be renewed)
+        :param timeout: (Tuple of the connect and read timeouts in seconds, CONNECT_TIMEOUT and READ_TIMEOUT by default)
+        :param breaker_settings: (CircuitBreaker.CircuitBreaker keyword arguments, used when the breaker of a host is
+        created by the first session calling it)
+        :param rate_limits: (Client side rate limits per host and endpoint class, see RateLimiter.RateLimiterRegistry,
+        None to send the requests without limit)
+        '''
         self.this_class_name = self.__class__.__name__
         self.repeat_step = repeat_step
+        self.service_name = service_name
+        self.metrics_registry = metrics_registry or Metrics.registry
+        self.auth_refresh = auth_refresh
+        self.auth_lock = threading.RLock()
+        self.auth_generation = 0
+        self.auth_refreshing = False
+        self.timeout = timeout or (CONNECT_TIMEOUT, READ_TIMEOUT)
+        self.breaker_settings = breaker_settings
+        self.rate_limits = rate_limits
+        self.metrics_registry.register_gauge("rate_limit_wait_seconds", "Current wait of the client side rate limiter",
+                                             RateLimiter.limiters.wait_times)
         super().__init__()
 
-    def send_request(self, request_type, url, method_name, log_worker, json_data=None, request_description=""):
+    def refresh_auth(self, failed_generation):
+        '''
+        Method used to renew the credentials after a 401 answer. Only the first of the concurrent requests rejected with
+        the same credentials calls the auth_refresh hook, the others wait for it and are replayed with the new headers.
+        :param failed_generation: (auth_generation of the headers used by the rejected request)
+        :return: True if the request can be replayed, False otherwise
+        '''
+        if self.auth_refresh is None:
+            return False
+        with self.auth_lock:
+            if self.auth_refreshing:
+                # 401 answered to a request sent by the hook itself
+                return False
+            if self.auth_generation != failed_generation:
+                return True
+            self.auth_refreshing = True
+            try:
+                new_headers = self.auth_refresh()
+            except Exception:
+                new_headers = None
+            finally:
+                self.auth_refreshing = False
+            if not new_headers:
+                return False
+            # The header mapping is replaced, not modified, so the requests being prepared see the old or new headers
+            headers = self.headers.copy()
+            headers.update(new_headers)
+            self.headers = headers
+            self.auth_generation += 1
+            return True
+
+    def send_request(self, request_type, url, method_name, log_worker, json_data=None, request_description="",
+                     raw=False):
+        '''
+        Method used to send a request to the API Service inside a tracing span, see __send_request.
+        '''
+        with Tracing.tracer.span(f"{self.service_name}.{method_name}", self.service_name, verb=request_type.upper(),
+                                 path=urlparse(url).path) as span:
+            result = self.__send_request(request_type, url, method_name, log_worker, json_data=json_data,
+                                         request_description=request_description, raw=raw)
+            span.set(ok=result is not False)
+            return result
+
+    def __send_request(self, request_type, url, method_name, log_worker, json_data=None, request_description="",
+                       raw=False):
         ''''
         Method used to send and validate requests sent to the API Service.
         :param request_type: (Type of REST API request: GET, POST, PUT, DELETE)
@@ -21,39 +210,118 @@ class APISession(requests.Session):
         :param log_worker: (Logging session object)
         :param json_data: (JSON body to be sent as part of the request when using POST or PUT Request Types)
         :param request_description: (Informative data that is used in log details)
+        :param raw: (Return the response body as bytes, without parsing it)
         :return: False or Return information in JSON format
         '''
 
         # TODO ADD RETRY MECHANISM (argument - number of retries)
         current_try = 0
+        # Checked before taking a breaker ticket or a rate limit token, which would otherwise be lost
+        if request_type.lower() not in ["get", "post", "put", "delete"]:
+            log_worker.error(
+                f"{self.this_class_name} - {method_name} - {request_type.upper()} Request type is not supported.")
+            return False
+        request_arguments = {}
+        if json_data is not None:
+            request_arguments = {"data": json_dumps(json_data), "headers": {"Content-Type": "application/json"}}
+
+        bytes_out = body_size(request_arguments.get("data"))
+        request_arguments["timeout"] = self.timeout
+        # The breaker is shared by all the sessions calling the host, a dead backend fails fast instead of waiting
+        # for the timeouts of each request and of each retry
+        host = urlparse(url).netloc
+        breaker = CircuitBreaker.breakers.get(host, self.breaker_settings)
+        bucket = RateLimiter.limiters.get(host, RateLimiter.endpoint_class(request_type), self.rate_limits)
 
+        auth_refreshed = False
+        rate_limited_replays = 0
         while current_try < self.repeat_step:
             current_try = current_try + 1
 
+            breaker_ticket = breaker.allow_request()
+            if breaker_ticket is None:
+                self.metrics_registry.record(self.service_name, method_name, request_type, 0.0, fast_fail=True)
+                log_worker.error(
+                    f"{self.this_class_name} - {method_name} - {request_type.upper()} Request on {url} was not sent, the circuit breaker of {breaker.host} is open for {breaker.retry_after():.1f}s.")
+                return False
+            rate_limit_wait = 0.0
+            if bucket is not None:
+                wait_start = time.perf_counter()
+                rate_limit_wait = bucket.acquire()
+                if rate_limit_wait:
+                    Tracing.tracer.add_span("rate_limit", "http", wait_start, time.perf_counter())
+            auth_generation = self.auth_generation
+            request_start = time.perf_counter()
             try:
                 if request_type.lower() == "get":
-                    response = self.get(url)
+                    response = self.get(url, timeout=self.timeout)
                 elif request_type.lower() == "post":
-                    response = self.post(url, json=json_data)
+                    response = self.post(url, **request_arguments)
                 elif request_type.lower() == "put":
-                    response = self.put(url, json=json_data)
-                elif request_type.lower() == "delete":
-                    response = self.delete(url, json=json_data)
+                    response = self.put(url, **request_arguments)
                 else:
-                    log_worker.error(
-                        f"{self.this_class_name} - {method_name} - {request_type.upper()} Request type is not supported.")
-                    return False
+                    response = self.delete(url, **request_arguments)
                 log_worker.info(
                     f"{self.this_class_name} - {method_name} - {request_type.upper()} Request with data={json_data} on {url} completed.")
             except Exception as e:
+                request_end = time.perf_counter()
+                self.metrics_registry.record(self.service_name, method_name, request_type,
+                                             request_end - request_start, bytes_out=bytes_out, error=True,
+                                             retry=current_try > 1, rate_limit_wait=rate_limit_wait)
+                Tracing.tracer.add_span("http", "http", request_start, request_end, attempt=current_try,
+                                        error=type(e).__name__)
+                if breaker.record_failure(breaker_ticket):
+                    log_worker.error(
+                        f"{self.this_class_name} - {method_name} - Circuit breaker of {breaker.host} opened, the next requests fail fast for {breaker.open_duration}s.")
                 log_worker.error(
                     f"{self.this_class_name} - {method_name} - {request_type.upper()} Request  with data={json_data} on {url} failed, {e}")
                 continue
+            request_end = time.perf_counter()
+            self.metrics_registry.record(self.service_name, method_name, request_type,
+                                         request_end - request_start, bytes_out=bytes_out,
+                                         bytes_in=body_size(response.content),
+                                         error=response.status_code not in [200, 201, 204], retry=current_try > 1,
+                                         rate_limit_wait=rate_limit_wait)
+            Tracing.tracer.add_span("http", "http", request_start, request_end, attempt=current_try,
+                                    status_code=response.status_code, bytes_in=body_size(response.content))
+            if response.status_code >= 500:
+                if breaker.record_failure(breaker_ticket):
+                    log_worker.error(
+                        f"{self.this_class_name} - {method_name} - Circuit breaker of {breaker.host} opened, the next requests fail fast for {breaker.open_duration}s.")
+            elif breaker.record_success(breaker_ticket):
+                log_worker.info(
+                    f"{self.this_class_name} - {method_name} - Circuit breaker of {breaker.host} closed.")
+            if response.status_code == 401 and not auth_refreshed and self.refresh_auth(auth_generation):
+                # The replay with the renewed credentials is not counted as one of the repeat_step attempts
+                log_worker.warning(
+                    f"{self.this_class_name} - {method_name} - {request_type.upper()} Request on {request_description} was rejected with status code 401, replaying it with renewed credentials.")
+                auth_refreshed = True
+                current_try = current_try - 1
+                continue
+            if response.status_code == 429:
+                retry_after = RateLimiter.retry_after_seconds(response.headers.get("Retry-After"), RETRY_AFTER_DEFAULT)
+                if retry_after > RETRY_AFTER_MAX or rate_limited_replays >= MAX_RATE_LIMITED_REPLAYS:
+                    # Retrying at once would hammer a server which asked for a back-off
+                    log_worker.error(
+                        f"{self.this_class_name} - {method_name} - {request_type.upper()} Request on {request_description} was rejected with status code 429, Retry-After {retry_after:.1f}s, after {rate_limited_replays} replays, giving up.")
+                    return False
+                # The pause applies to all the requests sent to the host, not only to the replay
+                log_worker.warning(
+                    f"{self.this_class_name} - {method_name} - {request_type.upper()} Request on {request_description} was rejected with status code 429, replaying it in {retry_after:.1f}s.")
+                rate_limited_replays += 1
+                if bucket is not None:
+                    RateLimiter.limiters.pause(host, retry_after)
+                else:
+                    time.sleep(retry_after)
+                current_try = current_try - 1
+                continue
             if response.status_code in [200, 201, 204]:
                 log_worker.info(
                     f"{self.this_class_name} - {method_name} - {request_type.upper()} Request on {request_description} was successful. Status Code: {response.status_code}.")
+                if raw:
+                    return response.content
                 try:
-                    return response.json()
+                    return json_loads(response.content)
                 except ValueError:
                     if response.text == '':
                         return True
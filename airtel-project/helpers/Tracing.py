@@ -0,0 +1,214 @@
+from __future__ import annotations
+import atexit
+import contextvars
+import functools
+import itertools
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+'''Number of spans kept in memory, the spans finished after the limit is reached are only counted'''
+MAX_SPANS = 200000
+
+
+class Span:
+    __slots__ = ("name", "category", "span_id", "parent_id", "thread_id", "start", "end", "args")
+
+    def __init__(self, name: str, category: str, span_id: int, parent_id: int or None, start: float, args: dict):
+        self.name = name
+        self.category = category
+        self.span_id = span_id
+        self.parent_id = parent_id
+        self.thread_id = threading.get_ident()
+        self.start = start
+        self.end = None
+        self.args = args
+
+    def set(self, **args) -> None:
+        """
+        Attach values to the span, they are shown as arguments of the event in the trace viewer.
+        """
+        self.args.update(args)
+
+
+class _DisabledSpan:
+    """
+    Span returned while tracing is disabled, so the traced code does not have to check whether tracing is enabled.
+    """
+    __slots__ = ()
+    span_id = None
+
+    def set(self, **args) -> None:
+        pass
+
+
+DISABLED_SPAN = _DisabledSpan()
+
+
+class Tracer:
+    """
+    In-process tracer: nested spans with parent/child IDs, exported in the Chrome trace event format, which can be
+    opened in chrome://tracing, https://ui.perfetto.dev or speedscope. The current span is kept in a context variable,
+    so spans opened in other threads or asyncio tasks do not become children of unrelated spans.
+    Tracing is disabled until enable() or dump_at_exit() is called.
+    """
+
+    def __init__(self, max_spans: int = MAX_SPANS):
+        self.lock = threading.Lock()
+        self.max_spans = max_spans
+        self.enabled = False
+        self.spans = []
+        self.dropped = 0
+        self.span_ids = itertools.count(1)
+        self.origin = time.perf_counter()
+        self.current_span = contextvars.ContextVar("tracing_current_span", default=None)
+        self.thread_names = {}
+
+    def enable(self) -> None:
+        self.enabled = True
+
+    def disable(self) -> None:
+        self.enabled = False
+
+    def reset(self) -> None:
+        with self.lock:
+            self.spans = []
+            self.dropped = 0
+            self.thread_names = {}
+
+    def __finish(self, span: Span) -> None:
+        with self.lock:
+            if len(self.spans) >= self.max_spans:
+                self.dropped += 1
+                return
+            self.spans.append(span)
+            if span.thread_id not in self.thread_names:
+                self.thread_names[span.thread_id] = threading.current_thread().name
+
+    @contextmanager
+    def span(self, name: str, category: str = "phase", **args):
+        """
+        Context manager timing the enclosed block as a child of the current span.
+        :param name: name of the span, for example the name of a script phase
+        :param category: category of the span, for example phase or the name of the called service
+        :param args: values attached to the span
+        :return: the Span, use span.set() to attach values known only at the end of the block
+        """
+        if not self.enabled:
+            yield DISABLED_SPAN
+            return
+        parent = self.current_span.get()
+        span = Span(name, category, next(self.span_ids), parent.span_id if parent else None, time.perf_counter(),
+                    args)
+        token = self.current_span.set(span)
+        try:
+            yield span
+        except BaseException as detailed_exception:
+            span.args["error"] = type(detailed_exception).__name__
+            raise
+        finally:
+            span.end = time.perf_counter()
+            self.current_span.reset(token)
+            self.__finish(span)
+
+    def add_span(self, name: str, category: str, start: float, end: float, **args) -> None:
+        """
+        Record an already finished span as a child of the current span, used where the start and end times are
+        measured by other code.
+        :param name: name of the span
+        :param category: category of the span
+        :param start: time.perf_counter() value at the start
+        :param end: time.perf_counter() value at the end
+        :param args: values attached to the span
+        """
+        if not self.enabled:
+            return
+        parent = self.current_span.get()
+        span = Span(name, category, next(self.span_ids), parent.span_id if parent else None, start, args)
+        span.end = end
+        self.__finish(span)
+
+    def traced(self, name: str = None, category: str = "phase"):
+        """
+        Decorator opening a span around each call of the function.
+        :param name: name of the span, the function name by default
+        :param category: category of the span
+        """
+        def decorator(function):
+            span_name = name or function.__name__.strip("_")
+
+            @functools.wraps(function)
+            def wrapper(*args, **kwargs):
+                with self.span(span_name, category):
+                    return function(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    def propagate(self, function):
+        """
+        Wrap a function submitted to a thread pool, so the spans it opens become children of the span current at the
+        time of the wrapping instead of roots of the worker thread.
+        :param function: callable run in the worker threads
+        :return: the wrapped callable
+        """
+        context = contextvars.copy_context()
+
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            return context.copy().run(function, *args, **kwargs)
+        return wrapper
+
+    def to_chrome_trace(self) -> dict:
+        """
+        :return: the finished spans as complete ("X") events of the Chrome trace event format, timestamps in
+        microseconds since the tracer was created
+        """
+        process_id = os.getpid()
+        with self.lock:
+            spans = list(self.spans)
+            thread_names = dict(self.thread_names)
+            dropped = self.dropped
+        events = [{"name": "thread_name", "ph": "M", "pid": process_id, "tid": thread_id,
+                   "args": {"name": thread_name}} for thread_id, thread_name in thread_names.items()]
+        for span in sorted(spans, key=lambda finished_span: finished_span.start):
+            events.append({"name": span.name, "cat": span.category, "ph": "X", "pid": process_id,
+                           "tid": span.thread_id, "ts": round((span.start - self.origin) * 1e6, 3),
+                           "dur": round((span.end - span.start) * 1e6, 3),
+                           "args": dict(span.args, span_id=span.span_id, parent_id=span.parent_id)})
+        return {"traceEvents": events, "displayTimeUnit": "ms", "otherData": {"dropped_spans": dropped}}
+
+    def dump_json(self, file_path: str) -> bool:
+        """
+        Write the trace as JSON, replacing the file atomically.
+        :param file_path: path of the JSON trace file
+        :return: True or False
+        """
+        temp_file = file_path + ".tmp"
+        try:
+            os.makedirs(os.path.dirname(file_path) or ".", exist_ok=True)
+            with open(temp_file, "w") as file:
+                json.dump(self.to_chrome_trace(), file, separators=(",", ":"))
+            os.replace(temp_file, file_path)
+        except (OSError, TypeError, ValueError) as detailed_exception:
+            # TypeError and ValueError come from span values which can not be serialized
+            print(f"Exception occurred while attempting to write trace file: {file_path}\n<{detailed_exception}>")
+            try:
+                os.remove(temp_file)
+            except OSError:
+                pass
+            return False
+        return True
+
+    def dump_at_exit(self, file_path: str) -> None:
+        """
+        Enable tracing and write the trace when the script ends.
+        :param file_path: path of the JSON trace file
+        """
+        self.enable()
+        atexit.register(self.dump_json, file_path)
+
+
+'''Tracer shared by the scripts and the API sessions of the process'''
+tracer = Tracer()
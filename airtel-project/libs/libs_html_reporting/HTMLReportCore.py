@@ -9,42 +9,110 @@
 # ---------------------------------------------------------------------------
 # Imports
 # ---------------------------------------------------------------------------
-import jinja2
+import json
 import os
 import sys
-from jinja2 import Environment, select_autoescape
+import threading
+import zipfile
 import helpers.Logger as Local_logger
 from parameters.global_parameters import Reporting as REPORTINGPARAMS
 
-log_worker = Local_logger.create_logger(__name__, REPORTINGPARAMS["log_level_default"],
-                                        REPORTINGPARAMS["session_log_path"], "html_reporting_core_log.txt")
+log_worker = Local_logger.create_lazy_logger(__name__, REPORTINGPARAMS["log_level_default"],
+                                             REPORTINGPARAMS["session_log_path"], "html_reporting_core_log.txt")
 
-env = Environment(
-    loader=jinja2.FileSystemLoader('%s/templates/' % os.path.dirname(__file__)),
-    autoescape=select_autoescape(['html', 'xml'])
-)
+WRITE_BUFFER_SIZE = 1024 * 1024
+
+
+def create_environment(bytecode_cache_path=REPORTINGPARAMS["template_cache_path"]):
+    """ Function used to create the Jinja environment. When bytecode_cache_path is set, compiled templates are stored
+    on disk, so only the first report generation of a pipeline pays the template parsing cost
+     :param bytecode_cache_path: Directory of the Jinja bytecode cache, None disables the cache
+     :return: Jinja Environment
+    """
+    import jinja2
+
+    bytecode_cache = None
+    if bytecode_cache_path:
+        try:
+            os.makedirs(bytecode_cache_path, exist_ok=True)
+            bytecode_cache = jinja2.FileSystemBytecodeCache(bytecode_cache_path)
+        except OSError as e:
+            log_worker.warning(f"Failed to use template bytecode cache {bytecode_cache_path}, templates will be "
+                               f"compiled on load\n<{e}>")
+
+    return jinja2.Environment(
+        loader=jinja2.FileSystemLoader('%s/templates/' % os.path.dirname(__file__)),
+        autoescape=jinja2.select_autoescape(['html', 'xml']),
+        bytecode_cache=bytecode_cache
+    )
+
+
+env = None
+env_lock = threading.Lock()
+
+
+def get_environment():
+    """ Function used to get the Jinja environment shared by the report generators, created by the first one so
+    importing this module does not import jinja2 nor touch the template cache directory
+     :return: Jinja Environment
+    """
+    global env
+    if env is None:
+        with env_lock:
+            if env is None:
+                env = create_environment()
+    return env
+
+
+def shard_directory_name(output_file):
+    """ Function used to get the name of the directory holding the result shards of a paged report
+     :param output_file: File Path of the summary HTML Report
+     :return: directory name, relative to the directory of the report
+    """
+    return f"{os.path.splitext(os.path.basename(output_file))[0]}_shards"
+
+
+def archive_paged_report(output_file, archive_file):
+    """ Function used to pack a paged report together with its result shards in a zip archive, so the report can be
+    attached or copied as a single file and still load its results once extracted
+     :param output_file: File Path of the summary HTML Report written by airtel_paged_report_generator
+     :param archive_file: File Path of the zip archive
+     :return: archive_file or False
+    """
+    shard_directory = os.path.join(os.path.split(output_file)[0], shard_directory_name(output_file))
+    try:
+        with zipfile.ZipFile(archive_file, "w", compression=zipfile.ZIP_DEFLATED) as archive:
+            archive.write(output_file, os.path.basename(output_file))
+            for shard_file in sorted(os.listdir(shard_directory)):
+                archive.write(os.path.join(shard_directory, shard_file),
+                              f"{shard_directory_name(output_file)}/{shard_file}")
+    except (OSError, zipfile.BadZipFile) as e:
+        log_worker.error(f"Failed to archive the paged report {output_file} in {archive_file}\n<{e}>")
+        return False
+    return archive_file
 
 
 class HTMLGenerator:
     def __init__(self, template_name):
         self.this_class_name = self.__class__.__name__
         this_method_name = sys._getframe().f_code.co_name
-        self.template = env.get_template(template_name)
+        self.template = get_environment().get_template(template_name)
         log_worker.info(f"{self.this_class_name} - {this_method_name} - Loaded template {template_name}")
 
     def airtel_report_generator(self, output_file, test_cycle, build, runlist_link, time_date, pass_fail_summary,
-                                results_data, not_run_list):
+                                results_data, not_run_list, stream=False):
         """ Method used to create the directory location and render the HTML report based on the provided arguments
          :param output_file: File Path for the output HTML Report
          :param test_cycle: Test Cycle name
          :param build: Build information for the build used at the execution time
-         :param runlist_link: Link to the Velocity RunList
+         :param runlist_link: Link to the Velocity RunList or list of links when several runlists were executed
          :param time_date: Information on TimeDate associated to the execution
          :param pass_fail_summary: JSON containing number of tests associated with the results (as keys) pass, fail,
                 total, indeterminate, not_run
          :param results_data: JSON containing test execution information, where Test Jira Key is the first Key. Each
                 execution information is composed of test_name, result, execution_link, failure_reason
          :param not_run_list: List of not executed Test Jira Keys
+         :param stream: Write the report chunk by chunk, as it is generated, instead of rendering it in memory first
          :return: item_raw data
         """
 
@@ -63,12 +131,17 @@ class HTMLGenerator:
                 return False
         if len(results_data):
             try:
-                html_data = self.template.render(test_cycle=test_cycle, build=build, runlist_link=runlist_link,
-                                                 time_date=time_date, pass_fail_summary=pass_fail_summary,
-                                                 results_data=results_data, not_run_list=not_run_list)
-                f = open(output_file, "w")
-                f.write(html_data)
-                f.close()
+                template_data = {"test_cycle": test_cycle, "build": build, "runlist_link": runlist_link,
+                                 "time_date": time_date, "pass_fail_summary": pass_fail_summary,
+                                 "results_data": results_data, "not_run_list": not_run_list}
+                if stream:
+                    with open(output_file, "w", buffering=WRITE_BUFFER_SIZE) as f:
+                        f.writelines(self.template.generate(**template_data))
+                else:
+                    html_data = self.template.render(**template_data)
+                    f = open(output_file, "w")
+                    f.write(html_data)
+                    f.close()
                 log_worker.info(f"{self.this_class_name} - {this_method_name} - Created HTML report {output_file}")
                 return True
             except Exception as e:
@@ -81,3 +154,75 @@ class HTMLGenerator:
                 f"{self.this_class_name} - {this_method_name} - Cannot create HTML automation report as provided "
                 f"results_data is empty")
             return False
+
+    def __write_result_shards(self, output_file, results_data, page_size):
+        shard_directory = os.path.join(os.path.split(output_file)[0], shard_directory_name(output_file))
+        os.makedirs(shard_directory, exist_ok=True)
+
+        rows_by_status = {}
+        for test_key in results_data:
+            row = {"test_key": test_key, "test_name": results_data[test_key]["test_name"],
+                   "result": results_data[test_key]["result"],
+                   "execution_link": results_data[test_key]["execution_link"],
+                   "failure_reason": results_data[test_key]["failure_reason"]}
+            rows_by_status.setdefault(str(row["result"]), []).append(row)
+
+        shards = []
+        for status in sorted(rows_by_status):
+            rows = rows_by_status[status]
+            for page in range(0, (len(rows) + page_size - 1) // page_size):
+                shard_file = f"{shard_directory_name(output_file)}/{status}_{page + 1}.js"
+                with open(os.path.join(shard_directory, f"{status}_{page + 1}.js"), "w",
+                          buffering=WRITE_BUFFER_SIZE) as f:
+                    f.write(f"loadResultShard({json.dumps(shard_file)}, ")
+                    json.dump(rows[page * page_size:(page + 1) * page_size], f, separators=(",", ":"))
+                    f.write(");\n")
+                shards.append({"status": status, "page": page + 1, "file": shard_file,
+                               "count": len(rows[page * page_size:(page + 1) * page_size])})
+
+        return shards
+
+    def airtel_paged_report_generator(self, output_file, test_cycle, build, runlist_link, time_date,
+                                      pass_fail_summary, results_data, not_run_list, page_size=500):
+        """ Method used to render a summary HTML report, with the test results stored in separate shard files which
+        are loaded by the page on demand. The shards are grouped by result and hold at most page_size rows each, so
+        the report opens quickly regardless of the number of tests. Must be used with the
+        airtel_automation_report_paged.html template
+         :param output_file: File Path for the output HTML Report, shards are written in the <name>_shards directory
+         :param test_cycle: Test Cycle name
+         :param build: Build information for the build used at the execution time
+         :param runlist_link: Link to the Velocity RunList or list of links when several runlists were executed
+         :param time_date: Information on TimeDate associated to the execution
+         :param pass_fail_summary: JSON containing number of tests associated with the results (as keys) pass, fail,
+                total, indeterminate, not_run
+         :param results_data: JSON containing test execution information, where Test Jira Key is the first Key. Each
+                execution information is composed of test_name, result, execution_link, failure_reason
+         :param not_run_list: List of not executed Test Jira Keys
+         :param page_size: Maximum number of results in a shard file
+         :return: True or False
+        """
+
+        this_method_name = sys._getframe().f_code.co_name
+        not_run_list = str(not_run_list)[1:-1]
+        if not len(results_data):
+            log_worker.error(
+                f"{self.this_class_name} - {this_method_name} - Cannot create HTML automation report as provided "
+                f"results_data is empty")
+            return False
+
+        try:
+            os.makedirs(os.path.split(output_file)[0], exist_ok=True)
+            shards = self.__write_result_shards(output_file, results_data, page_size)
+            with open(output_file, "w", buffering=WRITE_BUFFER_SIZE) as f:
+                f.writelines(self.template.generate(test_cycle=test_cycle, build=build, runlist_link=runlist_link,
+                                                    time_date=time_date, pass_fail_summary=pass_fail_summary,
+                                                    not_run_list=not_run_list, shards=shards, page_size=page_size,
+                                                    statuses=sorted(set([shard["status"] for shard in shards]))))
+            log_worker.info(f"{self.this_class_name} - {this_method_name} - Created HTML report {output_file} with "
+                            f"{len(shards)} result shards")
+            return True
+        except Exception as e:
+            log_worker.error(
+                f"{self.this_class_name} - {this_method_name} - Exception occurred while creating HTML report: "
+                f"{output_file}\n<{e}>")
+            return False
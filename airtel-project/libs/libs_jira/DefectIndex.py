@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# ----------------------------------------------------------------------------
+# Created By  : agent
+# Created Date: 10.2026
+# version ='1.0'
+# ---------------------------------------------------------------------------
+""" Module used to index the open Jira defects reported by automation, to avoid filing duplicates """
+# ---------------------------------------------------------------------------
+# Imports
+# ---------------------------------------------------------------------------
+import hashlib
+import re
+import sys
+import helpers.Logger as Local_logger
+from parameters.global_parameters import Reporting as REPORTINGPARAMS
+from libs.libs_jira.JiraCore import JiraCore
+
+log_worker = Local_logger.create_lazy_logger(__name__, REPORTINGPARAMS["log_level_default"],
+                                             REPORTINGPARAMS["session_log_path"], "defect_index_log.txt")
+
+AUTOMATION_LABEL = "reported_by_automation"
+FINGERPRINT_LABEL_PREFIX = "failure_fp_"
+DEFECT_SUMMARY_SUFFIX = " has failed."
+
+'''Parts of a failure reason which change from one run to another: UUIDs, hexadecimal IDs, IPs, timestamps, numbers'''
+VOLATILE_PATTERNS = [re.compile(r"[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}"),
+                     re.compile(r"0x[0-9a-f]+"),
+                     re.compile(r"\b[0-9a-f]{16,}\b"),
+                     re.compile(r"\d+")]
+
+
+class DefectIndex:
+    def __init__(self, jira_session: JiraCore, project_key, label=AUTOMATION_LABEL):
+        """
+        Index of the open defects reported by automation, keyed by test name and failure reason fingerprint. The
+        defects opened before the fingerprint labels were introduced are indexed by test name only, and get the labels
+        of the first failure matched to them.
+        :param jira_session: (JiraCore session)
+        :param project_key: (Jira project key, for example VELO)
+        :param label: (label set on all the defects reported by automation)
+        """
+        self.this_class_name = self.__class__.__name__
+        self.jira_session = jira_session
+        self.project_key = project_key
+        self.label = label
+        self.defects = {}
+        self.unlabeled_defects = {}
+
+    @staticmethod
+    def fingerprint(failure_reason):
+        """
+        Method used to compute a fingerprint of a failure reason which does not depend on IDs, numbers or spacing
+        :param failure_reason: (failure reason of the execution)
+        :return: fingerprint string
+        """
+        normalized_reason = str(failure_reason or "").lower()
+        for pattern in VOLATILE_PATTERNS:
+            normalized_reason = pattern.sub("#", normalized_reason)
+        normalized_reason = " ".join(normalized_reason.split())
+        return hashlib.sha1(normalized_reason.encode("utf-8")).hexdigest()[:12]
+
+    def labels(self, failure_reason):
+        """
+        Method used to get the labels which must be set on a new defect, so it can be found by the index later
+        :param failure_reason: (failure reason of the execution)
+        :return: list of labels
+        """
+        return [self.label, FINGERPRINT_LABEL_PREFIX + self.fingerprint(failure_reason)]
+
+    def build(self):
+        """
+        Method used to load the open automation defects of the project using a single JQL search. The defects without
+        automation label are searched by their "<test> has failed." summary
+        :return: True or False
+        """
+        this_method_name = sys._getframe().f_code.co_name
+
+        jql = f"project = {self.project_key} AND statusCategory != Done AND " \
+              f"(labels = {self.label} OR summary ~ \"\\\"{DEFECT_SUMMARY_SUFFIX.strip(' .')}\\\"\")"
+        defects = self.jira_session.search_items(jql=jql, fields=["summary", "labels"])
+        if defects is False:
+            log_worker.error(f"{self.this_class_name} - {this_method_name} - Failed to get the open defects of "
+                             f"project {self.project_key}")
+            return False
+
+        self.defects = {}
+        self.unlabeled_defects = {}
+        for defect_key, defect in sorted(defects.items()):
+            summary = defect["fields"]["summary"]
+            if not summary.endswith(DEFECT_SUMMARY_SUFFIX):
+                continue
+            test_name = summary[:-len(DEFECT_SUMMARY_SUFFIX)]
+            fingerprint_labels = [label for label in defect["fields"]["labels"] or []
+                                  if label.startswith(FINGERPRINT_LABEL_PREFIX)]
+            for label in fingerprint_labels:
+                self.defects[(test_name, label[len(FINGERPRINT_LABEL_PREFIX):])] = defect_key
+            if not fingerprint_labels:
+                self.unlabeled_defects.setdefault(test_name, defect_key)
+
+        log_worker.info(f"{self.this_class_name} - {this_method_name} - Indexed {len(self.defects)} open defects and "
+                        f"{len(self.unlabeled_defects)} defects without fingerprint of project {self.project_key}")
+        return True
+
+    def find(self, test_name, failure_reason):
+        """
+        Method used to find an open defect reported for the same test and failure reason. When only a defect without
+        fingerprint exists for the test, it is used and labeled with the fingerprint of this failure
+        :param test_name: (name of the failed test)
+        :param failure_reason: (failure reason of the execution)
+        :return: defect key or None
+        """
+        this_method_name = sys._getframe().f_code.co_name
+
+        defect_key = self.defects.get((test_name, self.fingerprint(failure_reason)))
+        if defect_key is not None or test_name not in self.unlabeled_defects:
+            return defect_key
+
+        defect_key = self.unlabeled_defects.pop(test_name)
+        log_worker.info(f"{self.this_class_name} - {this_method_name} - Using defect {defect_key} without "
+                        f"fingerprint for {test_name}, adding the labels {self.labels(failure_reason)}")
+        if not self.jira_session.add_labels(defect_key, self.labels(failure_reason)):
+            log_worker.warning(f"{self.this_class_name} - {this_method_name} - Failed to label defect {defect_key}, "
+                               f"it is matched by test name again in the next runs")
+        self.add(test_name, failure_reason, defect_key)
+        return defect_key
+
+    def discard_closed(self, defect_keys):
+        """
+        Method used to check with a single search that the given indexed defects are still open, the defects closed
+        or deleted since the index was built are removed from it
+        :param defect_keys: (keys of the indexed defects to check)
+        :return: set of the closed defect keys, empty if the check failed
+        """
+        this_method_name = sys._getframe().f_code.co_name
+
+        defect_keys = set(defect_keys)
+        if not defect_keys:
+            return set()
+        defects = self.jira_session.get_items_details(sorted(defect_keys), fields=["status"])
+        if defects is False:
+            log_worker.warning(f"{self.this_class_name} - {this_method_name} - Failed to check the status of defects "
+                               f"{sorted(defect_keys)}, they are considered open")
+            return set()
+
+        closed_keys = {defect_key for defect_key in defect_keys if defect_key not in defects or
+                       defects[defect_key]["fields"]["status"]["statusCategory"]["key"] == "done"}
+        if closed_keys:
+            self.defects = {failure: defect_key for failure, defect_key in self.defects.items()
+                            if defect_key not in closed_keys}
+            log_worker.info(f"{self.this_class_name} - {this_method_name} - Defects {sorted(closed_keys)} were closed "
+                            f"since the index was built")
+        return closed_keys
+
+    def add(self, test_name, failure_reason, defect_key):
+        """
+        Method used to add a newly opened defect to the index
+        :param test_name: (name of the failed test)
+        :param failure_reason: (failure reason of the execution)
+        :param defect_key: (key of the opened defect)
+        """
+        self.defects[(test_name, self.fingerprint(failure_reason))] = defect_key
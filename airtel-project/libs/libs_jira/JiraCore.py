@@ -9,13 +9,24 @@
 # ---------------------------------------------------------------------------
 # Imports
 # ---------------------------------------------------------------------------
-from jira import JIRA
+import helpers.Artifacts as Artifacts
 import helpers.Logger as Local_logger
+import helpers.Tracing as Tracing
+from helpers.RequestsWrapper import instrument_session, rate_limit_session
+from parameters.global_parameters import Api as APIPARAMS
 from parameters.global_parameters import Reporting as REPORTINGPARAMS
+from concurrent.futures import ThreadPoolExecutor
+import shutil
 import sys
+import tempfile
 
-log_worker = Local_logger.create_logger(__name__, REPORTINGPARAMS["log_level_default"],
-                                        REPORTINGPARAMS["session_log_path"], "jira_core_log.txt")
+log_worker = Local_logger.create_lazy_logger(__name__, REPORTINGPARAMS["log_level_default"],
+                                             REPORTINGPARAMS["session_log_path"], "jira_core_log.txt")
+
+BULK_CREATE_LIMIT = 50
+JQL_KEYS_LIMIT = 100
+'''Fields returned by get_items_details when no fields are given, the full items are much larger'''
+ITEM_DETAILS_FIELDS = ["summary", "status", "labels", "issuetype", "project"]
 
 
 class JiraCore(object):
@@ -24,7 +35,12 @@ class JiraCore(object):
         this_method_name = sys._getframe().f_code.co_name
         server = "https://" + server.lower().replace("https://", "")
 
+        # Imported on first use, the jira package takes a noticeable part of the script start-up time
+        from jira import JIRA
+
         self.jira = JIRA(basic_auth=(username, password), options={"server": server})
+        instrument_session(self.jira._session, "jira")
+        rate_limit_session(self.jira._session, APIPARAMS["rate_limits"])
         log_worker.info(f"{self.this_class_name} - {this_method_name} - Opened session to server {server}")
 
     def get_item_details(self, item_key):
@@ -44,6 +60,46 @@ class JiraCore(object):
                              f"{item_key} item details\nException: {e}")
             return False
 
+    def search_items(self, jql, fields=None):
+        """ Method used to get all the Jira Items matching a JQL query
+        :param jql: JQL query
+        :param fields: List of fields to return, None returns all fields
+        :return: False or dictionary mapping each item key to its raw data
+        """
+        this_method_name = sys._getframe().f_code.co_name
+
+        try:
+            issues = self.jira.search_issues(jql, maxResults=False, fields=",".join(fields) if fields else None)
+        except Exception as e:
+            log_worker.error(f"{self.this_class_name} - {this_method_name} - Exception occurred during search using "
+                             f"JQL {jql}\nException: {e}")
+            return False
+
+        log_worker.info(f"{self.this_class_name} - {this_method_name} - Found {len(issues)} items using JQL {jql}")
+        return {issue.key: issue.raw for issue in issues}
+
+    def get_items_details(self, item_keys, fields=None):
+        """ Method used to extract the details of several Jira Items using JQL searches on key in (...)
+        :param item_keys: List of Jira Item Keys
+        :param fields: List of fields to return, ITEM_DETAILS_FIELDS if not given
+        :return: False or dictionary mapping each found item key to its raw data
+        """
+        this_method_name = sys._getframe().f_code.co_name
+
+        item_keys = list(item_keys)
+        items_details = {}
+        for i in range(0, len(item_keys), JQL_KEYS_LIMIT):
+            batch_keys = item_keys[i:i + JQL_KEYS_LIMIT]
+            batch_details = self.search_items(jql=f"key in ({', '.join(batch_keys)})",
+                                              fields=fields or ITEM_DETAILS_FIELDS)
+            if batch_details is False:
+                return False
+            items_details.update(batch_details)
+
+        log_worker.info(f"{self.this_class_name} - {this_method_name} - Extracted item details for "
+                        f"{len(items_details)} of {len(item_keys)} items")
+        return items_details
+
     def add_comment(self, item_key, content):
         """ Method used to add comment to a Jira item
         :param item_key: Jira Item Key
@@ -62,6 +118,26 @@ class JiraCore(object):
 
         return comment
 
+    def add_labels(self, item_key, labels_list):
+        """ Method used to add labels to a Jira item, the labels already set on the item are kept
+        :param item_key: Jira Item Key
+        :param labels_list: List of String labels
+        :return: True or False
+        """
+        this_method_name = sys._getframe().f_code.co_name
+
+        try:
+            issue = self.jira.issue(item_key, fields="labels")
+            issue.update(update={"labels": [{"add": label} for label in labels_list]})
+            log_worker.info(f"{self.this_class_name} - {this_method_name} - Added labels {labels_list} to {item_key} "
+                            f"item")
+        except Exception as e:
+            log_worker.error(f"{self.this_class_name} - {this_method_name} - Exception occurred during adding labels "
+                             f"to {item_key} item\nException: {e}")
+            return False
+
+        return True
+
     def change_state(self, item_key, new_state=False):
         """Method used to change Jira item status
         IDs for changing status
@@ -98,11 +174,14 @@ class JiraCore(object):
 
         return True
 
-    def attach_file(self, item_key, file_path):
-        """ Method used to attach file to Jira item
+    def attach_file(self, item_key, file_path, compression=None, skip_duplicates=True):
+        """ Method used to attach file to Jira item. The file is streamed from disk, optionally compressed first, and
+        uploaded under a name containing its content hash, so a file already attached to the item is not uploaded again
         :param item_key: Jira Item Key
         :param file_path: Path to the file to be uploaded
-        :return: True or False
+        :param compression: None, gzip or zstd
+        :param skip_duplicates: Do not upload the file if an attachment with the same content hash exists
+        :return: Name of the attachment or False
         """
         this_method_name = sys._getframe().f_code.co_name
 
@@ -112,11 +191,32 @@ class JiraCore(object):
             log_worker.error(
                 f"{self.this_class_name} - {this_method_name} - Exception occurred while trying to get issue with key "
                 f"{item_key}\nException: {e}")
+            return False
+
+        # The compressed copy is written in a temporary directory, removed after the upload
+        compression_directory = None
+        if compression:
+            compression_directory = tempfile.mkdtemp(prefix="airtel_attachment_")
+            compressed_file_path = Artifacts.compress_file(file_path, compression=compression,
+                                                           destination_directory=compression_directory)
+            if compressed_file_path is None:
+                log_worker.warning(f"{self.this_class_name} - {this_method_name} - Failed to compress {file_path}, "
+                                   f"uploading it uncompressed")
+            else:
+                file_path = compressed_file_path
 
         try:
+            attachment_name = Artifacts.content_addressed_name(file_path, Artifacts.file_digest(file_path))
+            if skip_duplicates:
+                attachment_names = [attachment.filename for attachment in (issue.fields.attachment or [])]
+                if attachment_name in attachment_names:
+                    log_worker.info(f"{self.this_class_name} - {this_method_name} - File {file_path} is already "
+                                    f"attached to {item_key} as {attachment_name}, skipping upload")
+                    return attachment_name
+
             with open(file_path, 'rb') as upload_file:
                 try:
-                    self.jira.add_attachment(issue=issue, attachment=upload_file)
+                    self.jira.add_attachment(issue=issue, attachment=upload_file, filename=attachment_name)
                 except Exception as e:
                     log_worker.error(
                         f"{self.this_class_name} - {this_method_name} - Exception occurred while uploading attachment "
@@ -126,8 +226,11 @@ class JiraCore(object):
             log_worker.error(f"{self.this_class_name} - {this_method_name} - Exception occurred while opening file "
                              f"{file_path}\nException: {e}")
             return False
+        finally:
+            if compression_directory:
+                shutil.rmtree(compression_directory, ignore_errors=True)
 
-        return True
+        return attachment_name
 
     def open_defect(self, project_key, summary, description, priority_id=3, labels_list=["reported_by_automation"]):
         """ Method used to open Jira defect
@@ -139,14 +242,8 @@ class JiraCore(object):
         :return: True or False
         """
         this_method_name = sys._getframe().f_code.co_name
-        issue_dict = {
-            'project': {'key': project_key},
-            'summary': summary,
-            'description': description,
-            'issuetype': {'name': 'Bug'},
-            'priority': {'id': str(priority_id)},
-            'labels': labels_list
-        }
+        issue_dict = self.defect_fields(project_key=project_key, summary=summary, description=description,
+                                        priority_id=priority_id, labels_list=labels_list)
 
         log_worker.debug(f"Creation Jira issue using the following dictionary: {issue_dict}")
         try:
@@ -158,6 +255,67 @@ class JiraCore(object):
             return False
         return new_issue
 
+    @staticmethod
+    def defect_fields(project_key, summary, description, priority_id=3, labels_list=["reported_by_automation"]):
+        """ Method used to build the fields of a Jira defect, as used by open_defect and create_issues_bulk
+        :param project_key: Jira project Key (example: VELO)
+        :param summary: Defect summary string
+        :param description: Defect description data
+        :param priority_id: 1 to 5
+        :param labels_list: List of String labels
+        :return: dictionary of issue fields
+        """
+        return {
+            'project': {'key': project_key},
+            'summary': summary,
+            'description': description,
+            'issuetype': {'name': 'Bug'},
+            'priority': {'id': str(priority_id)},
+            'labels': list(labels_list)
+        }
+
+    @Tracing.tracer.traced("JiraCore.create_issues_bulk", "library")
+    def create_issues_bulk(self, issues_fields):
+        """ Method used to create several Jira issues using the /issue/bulk endpoint, in batches of 50 issues
+        :param issues_fields: List of issue fields dictionaries, for example built with defect_fields
+        :return: False or list with the created issue key, or None if the creation failed, for each issue
+        """
+        this_method_name = sys._getframe().f_code.co_name
+
+        issue_keys = []
+        for i in range(0, len(issues_fields), BULK_CREATE_LIMIT):
+            batch_fields = issues_fields[i:i + BULK_CREATE_LIMIT]
+            try:
+                created_issues = self.jira.create_issues(field_list=batch_fields)
+            except Exception as e:
+                log_worker.error(f"{self.this_class_name} - {this_method_name} - Exception occurred during bulk "
+                                 f"creation of Jira tickets\nException: {e}")
+                return False
+            for created_issue in created_issues:
+                if created_issue["status"] == "Success":
+                    issue_keys.append(created_issue["issue"].key)
+                else:
+                    log_worker.error(f"{self.this_class_name} - {this_method_name} - Failed to create Jira ticket "
+                                     f"{created_issue['input_fields'].get('summary')}: {created_issue['error']}")
+                    issue_keys.append(None)
+
+        log_worker.info(f"{self.this_class_name} - {this_method_name} - Opened "
+                        f"{len([key for key in issue_keys if key])} of {len(issues_fields)} Jira items")
+        return issue_keys
+
+    def link_items(self, links, link_type, max_workers=4):
+        """ Method used to create several links between Jira items concurrently
+        :param links: List of (item_key, to_link_item_key) pairs
+        :param link_type: One of Cloners, Duplicate, Relates
+        :param max_workers: Maximum number of links created in parallel
+        :return: List of True or False, for each link
+        """
+        if not links:
+            return []
+        with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(links)))) as executor:
+            return list(executor.map(Tracing.tracer.propagate(lambda link: self.link_item(link[0], link[1], link_type)),
+                                     links))
+
     def link_item(self, item_key, to_link_item_key, link_type):
         """ Method used to link Jira items to one another using specific relationships
         :param item_key: (Issue to add link to)
@@ -15,29 +15,62 @@ from collections import defaultdict
 from requests.packages.urllib3.exceptions import InsecureRequestWarning
 
 requests.packages.urllib3.disable_warnings(InsecureRequestWarning)
+from parameters.global_parameters import Api as APIPARAMS
 from parameters.global_parameters import Reporting as REPORTINGPARAMS
 import helpers.Logger as Local_logger
+import helpers.Tracing as Tracing
 import json
 import urllib3
 from helpers.RequestsWrapper import APISession
+from libs.libs_velocity.Device import Device
 
 urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
 
-log_worker = Local_logger.create_logger(__name__, REPORTINGPARAMS["log_level_default"],
-                                        REPORTINGPARAMS["session_log_path"], "netbox_core_log.txt")
+log_worker = Local_logger.create_lazy_logger(__name__, REPORTINGPARAMS["log_level_default"],
+                                             REPORTINGPARAMS["session_log_path"], "netbox_core_log.txt")
 
 
 class API:
-    def __init__(self, netbox_ip, api_token):
+    def __init__(self, netbox_ip, api_token, token_provider=None):
+        """
+        :param netbox_ip: (NetBox host)
+        :param api_token: (NetBox API token)
+        :param token_provider: (optional callable returning the current API token, called once when NetBox rejects
+        the token with 401 before the rejected request is replayed)
+        """
         self.base_url = "https://" + netbox_ip + "/"
         self.api_token = api_token
         self.this_class_name = self.__class__.__name__
-        self.api_session = APISession()
+        self.token_provider = token_provider
+        self.api_session = APISession(service_name="netbox",
+                                      auth_refresh=self.refresh_token if token_provider else None,
+                                      timeout=(APIPARAMS["connect_timeout"], APIPARAMS["read_timeout"]),
+                                      breaker_settings=APIPARAMS["circuit_breaker"],
+                                      rate_limits=APIPARAMS["rate_limits"])
         self.api_session.headers = {'accept': 'application/json',
                                     "Authorization": f"Token {api_token}",
                                     "content-type": "application/json"}
         self.api_session.verify = False
 
+    def refresh_token(self):
+        """
+        Method called by the API session when NetBox rejects the token with 401.
+        :return: headers carrying the token returned by the token provider, or None
+        """
+        this_method_name = sys._getframe().f_code.co_name
+        log_worker.warning(f"{self.this_class_name} - {this_method_name} - Token rejected by {self.base_url}, "
+                           f"getting the current one.")
+        try:
+            api_token = self.token_provider()
+        except Exception as e:
+            log_worker.error(f"{self.this_class_name} - {this_method_name} - Failed to get a NetBox token, error: {e}")
+            return None
+        if not api_token or api_token == self.api_token:
+            log_worker.error(f"{self.this_class_name} - {this_method_name} - No new NetBox token is available.")
+            return None
+        self.api_token = api_token
+        return {"Authorization": f"Token {api_token}"}
+
     def create_token(self, username, password):
 
         this_method_name = sys._getframe().f_code.co_name
@@ -595,6 +628,7 @@ class API:
 
         return True
 
+    @Tracing.tracer.traced("NetBox.process_velocity_racks", "library")
     def process_velocity_racks(self, racks, devices):
         """
         Method used to create racks processed from a Velocity JSON generated response.
@@ -631,26 +665,16 @@ class API:
         if self.api_token:
             for i in range(0, total_racks):
                 rack_name = racks['devices'][i]['name']
-                properties_count = len(racks['devices'][i]['properties'])
-                max_installed_power = "N/A"
-                max_power_consumption = "N/A"
-                pdu_reported_power = "N/A"
-                for j in range(0, properties_count):
-                    if racks['devices'][i]['properties'][j]['name'] == "Max Installed Power":
-                        max_installed_power = racks['devices'][i]['properties'][j]['value']
-                        log_worker.debug(f"{self.this_class_name} - {this_method_name} - Rack Max Installed Power: "
-                                         f"{max_installed_power}")
-                    if racks['devices'][i]['properties'][j]['name'] == "Max Power Consumption":
-                        max_power_consumption = racks['devices'][i]['properties'][j]['value']
-                        log_worker.debug(
-                            f"{self.this_class_name} - {this_method_name} - Rack Max Power Consumption: "
-                            f"{max_power_consumption}")
-                    if racks['devices'][i]['properties'][j]['name'] == "PDU Reported Power":
-                        pdu_reported_power = racks['devices'][i]['properties'][j]['value']
-                        log_worker.debug(f"{self.this_class_name} - {this_method_name} - Rack PDU reported power: "
-                                         f"{pdu_reported_power}")
-                    if max_installed_power != "N/A" and max_power_consumption != "N/A" and pdu_reported_power != "N/A":
-                        break
+                rack = Device.from_record(racks['devices'][i])
+                max_installed_power = rack.property_value("Max Installed Power", "N/A")
+                log_worker.debug(f"{self.this_class_name} - {this_method_name} - Rack Max Installed Power: "
+                                 f"{max_installed_power}")
+                max_power_consumption = rack.property_value("Max Power Consumption", "N/A")
+                log_worker.debug(f"{self.this_class_name} - {this_method_name} - Rack Max Power Consumption: "
+                                 f"{max_power_consumption}")
+                pdu_reported_power = rack.property_value("PDU Reported Power", "N/A")
+                log_worker.debug(f"{self.this_class_name} - {this_method_name} - Rack PDU reported power: "
+                                 f"{pdu_reported_power}")
 
                 rack_temp_row = rack_name[4]
                 rack_temp_rack = rack_name[-2:]
@@ -724,27 +748,19 @@ class API:
                                  f"{device_host_id}")
                 device_host_name = ''
                 device_host_netbox_id = ''
-                device_positioning = ''
-                rack_units_number = ''
+                device = Device.from_record(devices['devices'][i])
+                device_positioning = device.property_value("Rack Positioning", '')
+                log_worker.debug(f"{self.this_class_name} - {this_method_name} - Device positioning: "
+                                 f"{device_positioning}")
+                rack_units_number = device.property_value("No of Rack Units", '')
+                log_worker.debug(f"{self.this_class_name} - {this_method_name} - No of Rack Units: "
+                                 f"{rack_units_number}")
                 face = ''
-
-                properties_count = len(devices['devices'][i]['properties'])
-                for j in range(0, properties_count):
-                    if devices['devices'][i]['properties'][j]['name'] == "Rack Positioning":
-                        device_positioning = devices['devices'][i]['properties'][j]['value']
-                        log_worker.debug(f"{self.this_class_name} - {this_method_name} - Device positioning: "
-                                         f"{device_positioning}")
-                    if devices['devices'][i]['properties'][j]['name'] == "No of Rack Units":
-                        rack_units_number = devices['devices'][i]['properties'][j]['value']
-                        log_worker.debug(f"{self.this_class_name} - {this_method_name} - No of Rack Units: "
-                                         f"{rack_units_number}")
-                    if devices['devices'][i]['properties'][j]['name'] == "Rack Face":
-                        face = devices['devices'][i]['properties'][j]['value'].lower()
-                        if face == '':
-                            face = 'front'
-                        log_worker.debug(f"{self.this_class_name} - {this_method_name} - Rack face: {face}")
-                    if device_positioning and rack_units_number and face:
-                        break
+                if device.has_property("Rack Face"):
+                    face = device.property_value("Rack Face").lower()
+                    if face == '':
+                        face = 'front'
+                    log_worker.debug(f"{self.this_class_name} - {this_method_name} - Rack face: {face}")
                 if not device_positioning:
                     log_worker.warning(f"{self.this_class_name} - {this_method_name} - 'Rack Positioning' property "
                                        f"was not found for {devices['devices'][i]['name']} or the property's value is "
@@ -842,7 +858,7 @@ class API:
                               f'"slug":"automation-generated-{unit_number}", "is_full_depth":"false",' \
                               f' "u_height" : {unit_number}}}'
                 device_type_create = device_type_create + temp_create + ','
-            device_type_create = device_type_create[:-1] + ']'
+            device_type_create = device_type_create.rstrip(',') + ']'
             log_worker.debug(f"{self.this_class_name} - {this_method_name} - Creating the following device types: "
                              f"{device_type_create}.")
             device_types = self.create_device_types(device_type_create)
@@ -1042,6 +1058,7 @@ class API:
             log_worker.error(f"{self.this_class_name} - {this_method_name} - No session to execute the action")
             return False
 
+    @Tracing.tracer.traced("NetBox.integrate_custom_fields", "library")
     def integrate_custom_fields(self, custom_fields, device_sets, velocity_devices):
         """
         Custom procedure to add new custom fields in existing device sets used for NetBox device creation
@@ -1052,22 +1069,25 @@ class API:
         """
 
         this_method_name = sys._getframe().f_code.co_name
+        velocity_devices_by_name = {}
+        for velocity_device in reversed(velocity_devices['devices']):
+            velocity_devices_by_name[velocity_device['name']] = velocity_device
+        custom_field_names_by_label = {}
+        for netbox_custom_field in reversed(list(custom_fields.keys())):
+            custom_field_names_by_label[custom_fields[netbox_custom_field]['label']] = \
+                custom_fields[netbox_custom_field]["name"]
+
         for device_set_ind in range(len(device_sets)):
             for device_ind in range(len(device_sets[device_set_ind])):
                 device_name = device_sets[device_set_ind][device_ind]['name']
-                vel_index = [i for i in range(len(velocity_devices['devices'])) if
-                             velocity_devices['devices'][i]['name'] == device_name][0]
+                velocity_device = Device.from_record(velocity_devices_by_name[device_name])
                 device_sets[device_set_ind][device_ind]['custom_fields'] = {}
-                for property_ind in range(len(velocity_devices['devices'][vel_index]['properties'])):
-                    vel_prop_name = velocity_devices['devices'][vel_index]['properties'][property_ind]['name']
-                    vel_prop_value = str(velocity_devices['devices'][vel_index]['properties'][property_ind]['value'])
+                for vel_prop_name, (vel_prop_value, _) in velocity_device.property_map.items():
                     if vel_prop_name.lower() != 'password':
-                        try:
-                            netbox_custom_field = [i for i in custom_fields.keys() if custom_fields[i]['label'] ==
-                                                   vel_prop_name][0]
+                        if vel_prop_name in custom_field_names_by_label:
                             device_sets[device_set_ind][device_ind]['custom_fields'][
-                                custom_fields[netbox_custom_field]["name"]] = vel_prop_value
-                        except:
+                                custom_field_names_by_label[vel_prop_name]] = str(vel_prop_value)
+                        else:
                             log_worker.error( f"{self.this_class_name} - {this_method_name} - Velocity property "
                                               f"{vel_prop_name} was not found in the list of custom fields: "
                                               f"{custom_fields.keys()}")
@@ -9,14 +9,13 @@
 # ---------------------------------------------------------------------------
 # Imports
 # ---------------------------------------------------------------------------
-from opensearchpy import OpenSearch
 from parameters.global_parameters import Reporting as REPORTINGPARAMS
 from parameters.global_parameters import OpenSearch as OPENSEARCHPARAMS
 import helpers.Logger as Local_logger
 import sys
 
-log_worker = Local_logger.create_logger(__name__, REPORTINGPARAMS["log_level_default"],
-                                        REPORTINGPARAMS["session_log_path"], f"OpenSearch_session_log.txt")
+log_worker = Local_logger.create_lazy_logger(__name__, REPORTINGPARAMS["log_level_default"],
+                                             REPORTINGPARAMS["session_log_path"], f"OpenSearch_session_log.txt")
 
 
 class API:
@@ -31,6 +30,9 @@ class API:
         log_worker.debug(
             f"{self.this_class_name} - {this_method_name} - initiating instance for {host}")
 
+        # Imported on first use, the scripts importing this module do not all write to OpenSearch
+        from opensearchpy import OpenSearch
+
         self.client = OpenSearch(
             hosts=[{'host': host, 'port': port}],
             http_compress=True,  # enables gzip compression for request bodies
@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# ----------------------------------------------------------------------------
+# Created By  : agent
+# Created Date: 10.2026
+# version ='1.0'
+# ---------------------------------------------------------------------------
+""" Module used to access the fields and properties of Velocity device records """
+# ---------------------------------------------------------------------------
+# Imports
+# ---------------------------------------------------------------------------
+
+'''Position of each field inside the property tuples kept by Device'''
+PROPERTY_NAME, PROPERTY_VALUE, PROPERTY_DEFINITION_ID, PROPERTY_TYPE = range(4)
+
+
+class Device:
+    __slots__ = ("id", "name", "hostId", "templateId", "properties", "_property_map")
+
+    def __init__(self, device_id, name, host_id=None, template_id=None, properties=()):
+        """
+        Compact representation of a Velocity device, with the properties indexed by name on first lookup
+        :param device_id: (ID of the device)
+        :param name: (name of the device)
+        :param host_id: (ID of the parent device, for example the rack)
+        :param template_id: (ID of the device template)
+        :param properties: (tuple of (name, value, definitionId, type) tuples)
+        """
+        self.id = device_id
+        self.name = name
+        self.hostId = host_id
+        self.templateId = template_id
+        self.properties = properties
+        self._property_map = None
+
+    @classmethod
+    def from_record(cls, device_record):
+        """
+        Method used to build a device from the JSON record returned by the Velocity inventory API
+        :param device_record: (dictionary with the device details)
+        :return: Device
+        """
+        properties = tuple((device_property.get("name"), device_property.get("value"),
+                            device_property.get("definitionId"), device_property.get("type"))
+                           for device_property in device_record.get("properties") or ())
+        return cls(device_record.get("id"), device_record.get("name"), device_record.get("hostId"),
+                   device_record.get("templateId"), properties)
+
+    @classmethod
+    def from_resources(cls, resources):
+        """
+        Method used to build the devices of a get_resources response
+        :param resources: (dictionary with the devices list returned by get_resources)
+        :return: list of Device
+        """
+        return [cls.from_record(device_record) for device_record in resources["devices"]]
+
+    @property
+    def property_map(self):
+        """
+        Dictionary of property name -> (value, definitionId), built on first use
+        """
+        if self._property_map is None:
+            self._property_map = {device_property[PROPERTY_NAME]: (device_property[PROPERTY_VALUE],
+                                                                   device_property[PROPERTY_DEFINITION_ID])
+                                  for device_property in self.properties}
+        return self._property_map
+
+    def has_property(self, property_name):
+        """
+        Method used to check if the device has a property
+        :param property_name: (name of the property)
+        :return: True or False
+        """
+        return property_name in self.property_map
+
+    def property_value(self, property_name, default=None):
+        """
+        Method used to get the value of a property
+        :param property_name: (name of the property)
+        :param default: (value returned when the device does not have the property)
+        :return: value of the property or default
+        """
+        device_property = self.property_map.get(property_name)
+        return default if device_property is None else device_property[0]
+
+    def property_definition_id(self, property_name, default=None):
+        """
+        Method used to get the definition ID of a property, needed to update the property value
+        :param property_name: (name of the property)
+        :param default: (value returned when the device does not have the property)
+        :return: definition ID of the property or default
+        """
+        device_property = self.property_map.get(property_name)
+        return default if device_property is None else device_property[1]
+
+    def property_values(self, property_names):
+        """
+        Method used to get the values of a list of properties, the properties not found are skipped
+        :param property_names: (list of property names)
+        :return: dictionary with property name and value pairs
+        """
+        return {property_name: self.property_map[property_name][0] for property_name in property_names
+                if property_name in self.property_map}
@@ -0,0 +1,223 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# ----------------------------------------------------------------------------
+# Created By  : agent
+# Created Date: 10.2026
+# version ='1.0'
+# ---------------------------------------------------------------------------
+""" Module used to keep a local snapshot of the Velocity inventory, shared by the inventory scripts """
+# ---------------------------------------------------------------------------
+# Imports
+# ---------------------------------------------------------------------------
+import json
+import os
+import sqlite3
+import sys
+import time
+import helpers.Logger as Local_logger
+import helpers.Tracing as Tracing
+from parameters.global_parameters import Reporting as REPORTINGPARAMS
+from parameters.global_parameters import Velocity as VELOCITYPARAMS
+
+log_worker = Local_logger.create_lazy_logger(__name__, REPORTINGPARAMS["log_level_default"],
+                                             REPORTINGPARAMS["session_log_path"], "velocity_inventory_cache_log.txt")
+
+'''Device fields stored in their own columns, which can be used in the filters answered from the snapshot'''
+INDEXED_FIELDS = ["id", "name", "hostId", "templateId", "folderId"]
+'''Number of device IDs requested at once when the modified devices are downloaded'''
+ID_FILTER_BATCH_SIZE = 50
+
+
+class InventoryCache:
+    def __init__(self, velocity_session, cache_file=VELOCITYPARAMS["inventory_cache_path"],
+                 refresh_interval=VELOCITYPARAMS["inventory_cache_refresh_interval"]):
+        """
+        SQLite snapshot of the Velocity inventory. Each sync lists the devices without their properties and downloads
+        again only the devices added or modified since the previous sync, by lastModified or by a change of the indexed
+        fields, which are not always reflected in lastModified (e.g. nesting).
+        :param velocity_session: (Velocity API session used to download the devices)
+        :param cache_file: (path of the SQLite snapshot file, on a local disk since SQLite locking is not reliable on
+        network shares)
+        :param refresh_interval: (number of seconds after a sync during which the snapshot is used without any check)
+        """
+        self.this_class_name = self.__class__.__name__
+        self.velocity_session = velocity_session
+        self.cache_file = os.path.expanduser(cache_file)
+        self.refresh_interval = refresh_interval
+
+    def __connect(self):
+        os.makedirs(os.path.dirname(self.cache_file) or ".", mode=0o700, exist_ok=True)
+        # The snapshot is created readable only by its owner, an existing file keeps its permissions
+        try:
+            os.close(os.open(self.cache_file, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600))
+        except FileExistsError:
+            pass
+        connection = sqlite3.connect(self.cache_file, timeout=60)
+        connection.execute("CREATE TABLE IF NOT EXISTS devices (id TEXT PRIMARY KEY, name TEXT, hostId TEXT, "
+                           "templateId TEXT, folderId TEXT, lastModified TEXT, record TEXT)")
+        connection.execute("CREATE INDEX IF NOT EXISTS devices_host ON devices (hostId)")
+        connection.execute("CREATE INDEX IF NOT EXISTS devices_template ON devices (templateId)")
+        connection.execute("CREATE TABLE IF NOT EXISTS sync (key TEXT PRIMARY KEY, value TEXT)")
+        return connection
+
+    @staticmethod
+    def __device_row(device):
+        # Property values of type password are never written to disk
+        device = dict(device)
+        device["properties"] = [device_property for device_property in device.get("properties") or []
+                                if str(device_property.get("name", "")).lower() != "password"
+                                and str(device_property.get("type", "")).upper() != "PASSWORD"]
+        return ([device.get(field) for field in INDEXED_FIELDS] +
+                [str(device.get("lastModified")), json.dumps(device, separators=(",", ":"))])
+
+    def __download_devices(self, device_ids):
+        devices = []
+        for batch_start in range(0, len(device_ids), ID_FILTER_BATCH_SIZE):
+            batch = device_ids[batch_start:batch_start + ID_FILTER_BATCH_SIZE]
+            response = self.velocity_session.get_resources([f"id::{'|'.join(batch)}"], use_cache=False)
+            if not response:
+                return False
+            devices.extend(response["devices"])
+        return devices
+
+    @Tracing.tracer.traced("InventoryCache.sync", "library")
+    def sync(self, force=False):
+        """
+        Method used to bring the snapshot up to date with Velocity
+        :param force: (set to True to check Velocity even if the refresh interval did not pass)
+        :return: True or False
+        """
+        this_method_name = sys._getframe().f_code.co_name
+
+        try:
+            connection = self.__connect()
+        except (OSError, sqlite3.Error) as e:
+            log_worker.error(f"{self.this_class_name} - {this_method_name} - Failed to open the inventory snapshot "
+                             f"{self.cache_file}: {e}")
+            return False
+
+        try:
+            with connection:
+                last_sync = connection.execute("SELECT value FROM sync WHERE key = 'last_sync'").fetchone()
+                if last_sync and not force and time.time() - float(last_sync[0]) < self.refresh_interval:
+                    log_worker.debug(f"{self.this_class_name} - {this_method_name} - Inventory snapshot was synced "
+                                     f"{int(time.time() - float(last_sync[0]))} seconds ago, no refresh needed.")
+                    return True
+
+                sync_time = time.time()
+                listing = self.velocity_session.get_resources(properties=[], use_cache=False)
+                if not listing:
+                    log_worker.error(f"{self.this_class_name} - {this_method_name} - Failed to list the Velocity "
+                                     f"inventory.")
+                    return False
+
+                # The listing without properties also returns the indexed fields, a nesting change updates the
+                # hostId of the device without always changing its lastModified
+                cached = {row[0]: tuple(str(column) for column in row[1:]) for row in connection.execute(
+                    f"SELECT {', '.join(INDEXED_FIELDS)}, lastModified FROM devices").fetchall()}
+                listed = {device["id"]: tuple(str(device.get(field)) for field in INDEXED_FIELDS[1:] + ["lastModified"])
+                          for device in listing["devices"]}
+                modified_ids = [device_id for device_id, columns in listed.items()
+                                if columns[-1] == "None" or cached.get(device_id) != columns]
+                removed_ids = [device_id for device_id in cached if device_id not in listed]
+
+                if len(modified_ids) > len(listed) // 2:
+                    # Most of the inventory changed, a full paged download needs fewer requests than the ID filters
+                    response = self.velocity_session.get_resources(use_cache=False)
+                    modified_devices = response["devices"] if response else False
+                    removed_ids = list(cached)
+                else:
+                    modified_devices = self.__download_devices(modified_ids)
+                if modified_devices is False:
+                    log_worker.error(f"{self.this_class_name} - {this_method_name} - Failed to download the "
+                                     f"modified devices.")
+                    return False
+
+                connection.executemany("DELETE FROM devices WHERE id = ?", [(device_id,) for device_id in removed_ids])
+                connection.executemany("INSERT OR REPLACE INTO devices VALUES (?, ?, ?, ?, ?, ?, ?)",
+                                       [self.__device_row(device) for device in modified_devices])
+                connection.execute("INSERT OR REPLACE INTO sync VALUES ('last_sync', ?)", (str(sync_time),))
+        except (sqlite3.Error, KeyError, TypeError, ValueError) as e:
+            log_worker.error(f"{self.this_class_name} - {this_method_name} - Failed to sync the inventory snapshot "
+                             f"{self.cache_file}: {e}")
+            return False
+        finally:
+            connection.close()
+
+        log_worker.info(f"{self.this_class_name} - {this_method_name} - Inventory snapshot synced: "
+                        f"{len(modified_devices)} devices downloaded, {len(removed_ids)} removed, "
+                        f"{len(listed)} in total.")
+        return True
+
+    def invalidate(self):
+        """
+        Method used to make the next sync check Velocity even if the refresh interval did not pass, called after the
+        inventory was modified
+        :return: True or False
+        """
+        this_method_name = sys._getframe().f_code.co_name
+
+        try:
+            connection = self.__connect()
+            try:
+                with connection:
+                    connection.execute("DELETE FROM sync WHERE key = 'last_sync'")
+            finally:
+                connection.close()
+        except (OSError, sqlite3.Error) as e:
+            log_worker.error(f"{self.this_class_name} - {this_method_name} - Failed to invalidate the inventory "
+                             f"snapshot {self.cache_file}: {e}")
+            return False
+        return True
+
+    def get_resources(self, filters=None, properties=None):
+        """
+        Method used to answer a get_resources query from the snapshot. Only the name::a|b and name:!:a filters on the
+        indexed fields (id, name, hostId, templateId, folderId) can be answered.
+        :param filters: (list of filters, same format as Velocity get_resources)
+        :param properties: (list of property names to keep for each resource, None keeps all of them)
+        :return: Json with the resources, or None if the query can not be answered from the snapshot
+        """
+        this_method_name = sys._getframe().f_code.co_name
+
+        conditions = []
+        parameters = []
+        for flt in filters or []:
+            negated = ":!:" in flt
+            field, _, values = flt.partition(":!:" if negated else "::")
+            if field not in INDEXED_FIELDS or not values:
+                log_worker.debug(f"{self.this_class_name} - {this_method_name} - Filter {flt} can not be answered "
+                                 f"from the inventory snapshot.")
+                return None
+            # Both name::a|b and name::a|name::b are accepted by Velocity
+            values = [value[len(field) + 2:] if value.startswith(f"{field}::") else value
+                      for value in values.split("|")]
+            placeholders = ", ".join("?" * len(values))
+            conditions.append(f"({field} IS NULL OR {field} NOT IN ({placeholders}))" if negated
+                              else f"{field} IN ({placeholders})")
+            parameters.extend(values)
+
+        query = "SELECT record FROM devices"
+        if conditions:
+            query = f"{query} WHERE {' AND '.join(conditions)}"
+
+        try:
+            connection = self.__connect()
+            try:
+                records = connection.execute(query, parameters).fetchall()
+            finally:
+                connection.close()
+        except (OSError, sqlite3.Error) as e:
+            log_worker.error(f"{self.this_class_name} - {this_method_name} - Failed to read the inventory snapshot "
+                             f"{self.cache_file}: {e}")
+            return None
+
+        property_whitelist = set(properties) if properties is not None else None
+        devices = []
+        for (record,) in records:
+            device = json.loads(record)
+            if property_whitelist is not None:
+                device["properties"] = [device_property for device_property in device.get("properties", [])
+                                        if device_property["name"] in property_whitelist]
+            devices.append(device)
+        return {"devices": devices}
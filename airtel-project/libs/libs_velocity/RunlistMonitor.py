@@ -0,0 +1,447 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# ----------------------------------------------------------------------------
+# Created By  : agent
+# Created Date: 10.2026
+# version ='1.0'
+# ---------------------------------------------------------------------------
+""" Module used to monitor Velocity runlist executions using incremental status polling """
+# ---------------------------------------------------------------------------
+# Imports
+# ---------------------------------------------------------------------------
+import heapq
+import json
+import os
+import sys
+import time
+from collections import Counter, deque
+from parameters.global_parameters import Reporting as REPORTINGPARAMS
+import helpers.Logger as Local_logger
+import helpers.Tracing as Tracing
+
+log_worker = Local_logger.create_lazy_logger(__name__, REPORTINGPARAMS["log_level_default"],
+                                             REPORTINGPARAMS["session_log_path"], "runlist_monitor_log.txt")
+
+FINISHED_STATES = ["COMPLETED", "START_FAILED", "ABORTED", "AGENT_NOT_RESPONDING"]
+
+
+class RunlistMonitor:
+    def __init__(self, velocity_session, runlist_guid=None, testcase_paths=None, path_to_tag=None):
+        """
+        Monitor engine for one or more runlist executions. Every poll fetches the summary of all the monitored
+        runlists in a single request, indexes the executions by testPath and by runlistItemId and only reports the
+        items which changed state since the previous poll.
+        :param velocity_session: (Velocity.API session used to query the runlist summary)
+        :param runlist_guid: (ID of the runlist execution returned by post_runlist_execution, more runlists can be
+        added later using add_runlist)
+        :param testcase_paths: (list of testcase paths which are expected to finish, duplicates are allowed)
+        :param path_to_tag: (dictionary mapping each testcase path to its Jira key tag)
+        """
+        self.this_class_name = self.__class__.__name__
+
+        self.velocity_session = velocity_session
+        self.path_to_tag = {}
+        self.pending = {}
+        self.item_states = {}
+        self.first_seen = {}
+        self.processed_items = set()
+        self.executions_by_path = {}
+        self.executions_by_item_id = {}
+        self.summaries = {}
+
+        if runlist_guid:
+            self.add_runlist(runlist_guid, testcase_paths, path_to_tag)
+
+    def add_runlist(self, runlist_guid, testcase_paths, path_to_tag=None):
+        """
+        Method used to add a runlist execution to the set of monitored runlists
+        :param runlist_guid: (ID of the runlist execution returned by post_runlist_execution)
+        :param testcase_paths: (list of testcase paths which are expected to finish, duplicates are allowed)
+        :param path_to_tag: (dictionary mapping each testcase path to its Jira key tag)
+        """
+        this_method_name = sys._getframe().f_code.co_name
+
+        self.pending[runlist_guid] = Counter(testcase_paths)
+        if path_to_tag:
+            self.path_to_tag.update(path_to_tag)
+
+        log_worker.debug(f"{self.this_class_name} - {this_method_name} - Monitoring runlist {runlist_guid} for "
+                         f"{sum(self.pending[runlist_guid].values())} testcases.")
+
+    def runlist_guids(self):
+        """
+        Method used to get the IDs of the monitored runlist executions
+        :return: list of runlist execution IDs
+        """
+        return list(self.pending.keys())
+
+    def is_finished(self):
+        """
+        Method used to check if all the monitored testcases reached a final execution state
+        :return: True or False
+        """
+        return sum([sum(pending.values()) for pending in self.pending.values()]) == 0
+
+    def not_processed(self):
+        """
+        Method used to get the testcase paths which did not reach a final execution state yet
+        :return: list of testcase paths
+        """
+        return [path for pending in self.pending.values() for path in pending.elements()]
+
+    def in_flight_count(self):
+        """
+        Method used to get the number of runlist items which were started but did not reach a final state yet
+        :return: number of executions in progress
+        """
+        return len([state for state in self.item_states.values() if state not in FINISHED_STATES])
+
+    def get_execution(self, testcase_path, runlist_guid=None):
+        """
+        Method used to get the latest known execution of a testcase, as seen in the last poll
+        :param testcase_path: (path of the testcase)
+        :param runlist_guid: (ID of the runlist execution, can be omitted when a single runlist is monitored)
+        :return: execution JSON or None if the testcase was not started yet
+        """
+        if runlist_guid is None:
+            runlist_guid = self.runlist_guids()[0]
+        executions = self.executions_by_path.get((runlist_guid, testcase_path))
+        if not executions:
+            return None
+        return executions[-1]
+
+    def get_state(self):
+        """
+        Method used to export the monitoring state, in a format which can be serialized as JSON
+        :return: dictionary with the monitoring state
+        """
+        return {"pending": {runlist_guid: dict(pending) for runlist_guid, pending in self.pending.items()},
+                "path_to_tag": self.path_to_tag, "item_states": self.item_states, "first_seen": self.first_seen,
+                "processed_items": sorted(self.processed_items)}
+
+    def load_state(self, state):
+        """
+        Method used to restore a monitoring state exported by get_state
+        :param state: (dictionary with the monitoring state)
+        """
+        this_method_name = sys._getframe().f_code.co_name
+
+        self.pending = {runlist_guid: Counter(pending) for runlist_guid, pending in state["pending"].items()}
+        self.path_to_tag = state["path_to_tag"]
+        self.item_states = state["item_states"]
+        self.first_seen = state["first_seen"]
+        self.processed_items = set(state["processed_items"])
+
+        log_worker.debug(f"{self.this_class_name} - {this_method_name} - Restored monitoring state for runlists "
+                         f"{self.runlist_guids()}, {len(self.not_processed())} executions still pending.")
+
+    def __index_executions(self, summaries):
+        self.executions_by_path = {}
+        self.executions_by_item_id = {}
+        for summary in summaries:
+            self.summaries[summary["guid"]] = summary
+            for execution in summary["executions"]:
+                self.executions_by_path.setdefault((summary["guid"], execution["testPath"]), []).append(execution)
+                self.executions_by_item_id[(summary["guid"], execution["runlistItemId"])] = execution
+
+    @Tracing.tracer.traced("RunlistMonitor.poll", "library")
+    def poll(self):
+        """
+        Method used to query the runlist summaries once and identify the executions which reached a final state since
+        the previous poll
+        :return: False if the summaries could not be obtained, otherwise a list of dictionaries with runlist_guid,
+        item_id, path, tag, execution and the observed duration (None if the item was never seen running) for each
+        newly finished testcase
+        """
+        this_method_name = sys._getframe().f_code.co_name
+
+        response = self.velocity_session.get_runlist_execution(self.runlist_guids())
+        if not response:
+            log_worker.warning(f"{self.this_class_name} - {this_method_name} - Failed to get the summary of runlists "
+                               f"{self.runlist_guids()}.")
+            return False
+
+        self.__index_executions(response)
+
+        finished = []
+        poll_time = time.time()
+        for (runlist_guid, item_id), execution in self.executions_by_item_id.items():
+            item_key = f"{runlist_guid}:{item_id}"
+            state = execution["executionState"]
+            if item_key not in self.first_seen and state not in FINISHED_STATES:
+                self.first_seen[item_key] = poll_time
+            if self.item_states.get(item_key) != state:
+                log_worker.debug(f"{self.this_class_name} - {this_method_name} - Runlist item {item_key} "
+                                 f"({execution['testPath']}) changed state from {self.item_states.get(item_key)} "
+                                 f"to {state}.")
+                self.item_states[item_key] = state
+
+            if state not in FINISHED_STATES or item_key in self.processed_items:
+                continue
+
+            path = execution["testPath"]
+            self.processed_items.add(item_key)
+            pending = self.pending.get(runlist_guid, Counter())
+            if pending[path] <= 0:
+                log_worker.debug(f"{self.this_class_name} - {this_method_name} - Runlist item {item_key} ({path}) "
+                                 f"is not monitored and will be ignored.")
+                continue
+
+            pending[path] -= 1
+            duration = None
+            if item_key in self.first_seen:
+                duration = poll_time - self.first_seen[item_key]
+            finished.append({"runlist_guid": runlist_guid, "item_id": item_id, "path": path,
+                             "tag": self.path_to_tag.get(path), "execution": execution, "duration": duration})
+
+        log_worker.debug(f"{self.this_class_name} - {this_method_name} - {len(finished)} executions finished, "
+                         f"{len(self.not_processed())} executions still pending.")
+        return finished
+
+
+class PollScheduler:
+    def __init__(self, default_interval=20, min_interval=5, max_interval=120, poll_fraction=0.25,
+                 recheck_delay=10, max_rechecks=10, max_calls_per_minute=30):
+        """
+        Scheduler used to decide when the runlist summary should be polled again and when deferred INDETERMINATE
+        re-checks are due. The poll interval follows the average observed execution duration divided by the number
+        of executions in flight, and every Velocity API call is counted against a per-minute budget.
+        :param default_interval: (seconds between polls until the first execution duration is observed)
+        :param min_interval: (lower bound of the poll interval, in seconds)
+        :param max_interval: (upper bound of the poll interval, in seconds)
+        :param poll_fraction: (fraction of the expected time until the next completion used as poll interval)
+        :param recheck_delay: (seconds between two re-checks of the same INDETERMINATE execution)
+        :param max_rechecks: (number of re-checks done before an INDETERMINATE result is accepted)
+        :param max_calls_per_minute: (maximum number of Velocity API calls issued by the monitor in any 60 seconds
+        window)
+        """
+        self.this_class_name = self.__class__.__name__
+        self.default_interval = default_interval
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.poll_fraction = poll_fraction
+        self.recheck_delay = recheck_delay
+        self.max_rechecks = max_rechecks
+        self.max_calls_per_minute = max_calls_per_minute
+
+        self.average_duration = None
+        self.smoothing = 0.3
+        self.next_poll_time = 0
+        self.rechecks = []
+        self.recheck_sequence = 0
+        self.call_times = deque()
+
+    def record_durations(self, durations):
+        """
+        Method used to update the exponentially weighted average of the observed execution durations
+        :param durations: (list of durations in seconds, None values are ignored)
+        """
+        for duration in durations:
+            if duration is None:
+                continue
+            if self.average_duration is None:
+                self.average_duration = duration
+            else:
+                self.average_duration = self.smoothing * duration + (1 - self.smoothing) * self.average_duration
+
+    def schedule_next_poll(self, in_flight_count, finished_count):
+        """
+        Method used to compute the moment of the next runlist summary poll
+        :param in_flight_count: (number of executions which are currently running)
+        :param finished_count: (number of executions which finished in the latest poll)
+        :return: the poll interval, in seconds
+        """
+        this_method_name = sys._getframe().f_code.co_name
+
+        if finished_count > 0:
+            interval = self.min_interval
+        elif self.average_duration is None:
+            interval = self.default_interval
+        else:
+            interval = self.poll_fraction * self.average_duration / max(1, in_flight_count)
+        interval = max(self.min_interval, min(self.max_interval, interval))
+
+        self.next_poll_time = time.time() + interval
+        log_worker.debug(f"{self.this_class_name} - {this_method_name} - Next poll in {round(interval, 2)} seconds "
+                         f"(average duration: {self.average_duration}, in flight: {in_flight_count}).")
+        return interval
+
+    def poll_due(self):
+        """
+        Method used to check if the runlist summary should be polled now
+        :return: True or False
+        """
+        return time.time() >= self.next_poll_time
+
+    def schedule_recheck(self, key, payload, attempt=1):
+        """
+        Method used to schedule a deferred re-check of an execution, without blocking the monitoring of other tests
+        :param key: (identifier of the monitored item, for example the Jira key tag)
+        :param payload: (data needed to perform the re-check, returned unchanged when the re-check is due)
+        :param attempt: (number of the re-check attempt)
+        :return: False if the maximum number of re-checks was reached, True otherwise
+        """
+        if attempt > self.max_rechecks:
+            return False
+        self.recheck_sequence += 1
+        heapq.heappush(self.rechecks, (time.time() + self.recheck_delay, self.recheck_sequence, key, attempt, payload))
+        return True
+
+    def has_pending_rechecks(self):
+        """
+        Method used to check if there are re-checks which were not performed yet
+        :return: True or False
+        """
+        return len(self.rechecks) > 0
+
+    def due_rechecks(self):
+        """
+        Method used to extract the re-checks which are due
+        :return: list of (key, attempt, payload) tuples
+        """
+        due = []
+        now = time.time()
+        while self.rechecks and self.rechecks[0][0] <= now:
+            due_time, sequence, key, attempt, payload = heapq.heappop(self.rechecks)
+            due.append((key, attempt, payload))
+        return due
+
+    def get_rechecks(self):
+        """
+        Method used to export the re-checks which were not performed yet
+        :return: list of [key, attempt, payload] lists
+        """
+        return [[key, attempt, payload] for due_time, sequence, key, attempt, payload in sorted(self.rechecks)]
+
+    def __expire_calls(self, now):
+        while self.call_times and self.call_times[0] <= now - 60:
+            self.call_times.popleft()
+
+    def record_call(self, count=1):
+        """
+        Method used to count Velocity API calls which are issued regardless of the per-minute budget, they delay the
+        next polls and re-checks. The calls sent to other services must not be counted.
+        :param count: (number of Velocity API calls)
+        """
+        now = time.time()
+        for i in range(count):
+            self.call_times.append(now)
+
+    def acquire_call(self):
+        """
+        Method used to reserve an API call from the per-minute budget
+        :return: True if the call can be issued now, False if the budget is exhausted
+        """
+        now = time.time()
+        self.__expire_calls(now)
+        if len(self.call_times) >= self.max_calls_per_minute:
+            return False
+        self.call_times.append(now)
+        return True
+
+    def seconds_until_next_event(self, include_poll=True):
+        """
+        Method used to compute how long the monitor can sleep before the next poll or re-check is due
+        :param include_poll: (set to False once all executions finished and only re-checks are left)
+        :return: number of seconds, 0 if an event is already due
+        """
+        now = time.time()
+        events = []
+        if include_poll:
+            events.append(self.next_poll_time)
+        if self.rechecks:
+            events.append(self.rechecks[0][0])
+        self.__expire_calls(now)
+        if len(self.call_times) >= self.max_calls_per_minute:
+            events = [max(event, self.call_times[0] + 60) for event in events]
+        if not events:
+            return 0
+        return max(0, min(events) - now)
+
+
+class RunlistCheckpoint:
+    def __init__(self, runlist_guid, checkpoint_path=REPORTINGPARAMS["checkpoint_path"]):
+        """
+        Local checkpoint of a runlist monitoring session, used to resume the monitoring after the process is stopped.
+        The checkpoint is written as compact JSON and replaced atomically, so a crash during the write never leaves
+        a truncated file behind.
+        :param runlist_guid: (ID of the runlist execution, the first one when several runlists are monitored)
+        :param checkpoint_path: (directory where the checkpoint files are stored)
+        """
+        self.this_class_name = self.__class__.__name__
+        self.runlist_guid = runlist_guid
+        self.checkpoint_path = checkpoint_path
+        self.checkpoint_file = os.path.join(checkpoint_path, f"runlist_{runlist_guid}.json")
+        self.context = {}
+
+    def save(self, monitor: RunlistMonitor, scheduler: PollScheduler, progress):
+        """
+        Method used to persist the monitoring state
+        :param monitor: (RunlistMonitor which is checkpointed)
+        :param scheduler: (PollScheduler holding the pending INDETERMINATE re-checks)
+        :param progress: (dictionary with the results which were already reported, must be JSON serializable)
+        :return: True or False
+        """
+        this_method_name = sys._getframe().f_code.co_name
+
+        state = {"runlist_guids": monitor.runlist_guids(), "context": self.context, "monitor": monitor.get_state(),
+                 "rechecks": scheduler.get_rechecks(), "progress": progress}
+        temp_file = self.checkpoint_file + ".tmp"
+        try:
+            os.makedirs(self.checkpoint_path, exist_ok=True)
+            with open(temp_file, "w") as checkpoint_file:
+                json.dump(state, checkpoint_file, separators=(",", ":"))
+            os.replace(temp_file, self.checkpoint_file)
+        except (OSError, TypeError, ValueError) as e:
+            log_worker.error(f"{self.this_class_name} - {this_method_name} - Failed to write checkpoint "
+                             f"{self.checkpoint_file}: {e}")
+            if os.path.isfile(temp_file):
+                os.remove(temp_file)
+            return False
+
+        log_worker.debug(f"{self.this_class_name} - {this_method_name} - Checkpoint {self.checkpoint_file} updated.")
+        return True
+
+    def load(self):
+        """
+        Method used to read the persisted monitoring state. If no checkpoint is named after the runlist execution ID,
+        the checkpoints of multi-runlist sessions which include it are searched.
+        :return: dictionary with the monitoring state or False if no checkpoint was found
+        """
+        this_method_name = sys._getframe().f_code.co_name
+
+        checkpoint_files = [self.checkpoint_file]
+        if not os.path.isfile(self.checkpoint_file) and os.path.isdir(self.checkpoint_path):
+            checkpoint_files = [os.path.join(self.checkpoint_path, file_name)
+                                for file_name in sorted(os.listdir(self.checkpoint_path))
+                                if file_name.startswith("runlist_") and file_name.endswith(".json")]
+
+        for checkpoint_file in checkpoint_files:
+            try:
+                with open(checkpoint_file) as file:
+                    state = json.load(file)
+            except (OSError, ValueError) as e:
+                log_worker.debug(f"{self.this_class_name} - {this_method_name} - Failed to read checkpoint "
+                                 f"{checkpoint_file}: {e}")
+                continue
+            if self.runlist_guid in state["runlist_guids"]:
+                self.checkpoint_file = checkpoint_file
+                self.context = state["context"]
+                log_worker.info(f"{self.this_class_name} - {this_method_name} - Loaded checkpoint {checkpoint_file} "
+                                f"for runlist {self.runlist_guid}.")
+                return state
+
+        log_worker.error(f"{self.this_class_name} - {this_method_name} - No checkpoint was found for runlist "
+                         f"{self.runlist_guid}.")
+        return False
+
+    def remove(self):
+        """
+        Method used to delete the checkpoint once the monitoring session is finished and reported
+        """
+        this_method_name = sys._getframe().f_code.co_name
+
+        if os.path.isfile(self.checkpoint_file):
+            os.remove(self.checkpoint_file)
+            log_worker.debug(f"{self.this_class_name} - {this_method_name} - Checkpoint {self.checkpoint_file} "
+                             f"removed.")
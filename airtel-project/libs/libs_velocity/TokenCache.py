@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# ----------------------------------------------------------------------------
+# Created By  : agent
+# Created Date: 10.2026
+# version ='1.0'
+# ---------------------------------------------------------------------------
+""" Module used to keep the Velocity authentication tokens in a local file, shared by the pipeline steps """
+# ---------------------------------------------------------------------------
+# Imports
+# ---------------------------------------------------------------------------
+import hashlib
+import json
+import os
+import stat
+import sys
+import threading
+import time
+import helpers.Logger as Local_logger
+from parameters.global_parameters import Reporting as REPORTINGPARAMS
+from parameters.global_parameters import Velocity as VELOCITYPARAMS
+
+log_worker = Local_logger.create_lazy_logger(__name__, REPORTINGPARAMS["log_level_default"],
+                                             REPORTINGPARAMS["session_log_path"], "velocity_token_cache_log.txt")
+
+'''Seconds before the expiry at which a cached token is not used anymore'''
+EXPIRY_MARGIN = 60
+
+
+class TokenCache:
+    def __init__(self, cache_file=VELOCITYPARAMS["token_cache_path"],
+                 default_lifetime=VELOCITYPARAMS["token_default_lifetime"]):
+        """
+        Local file holding one token per Velocity host and user, with its expiry. The file is readable only by its
+        owner and is ignored if its permissions were widened.
+        :param cache_file: (path of the JSON token file, on a local disk)
+        :param default_lifetime: (lifetime in seconds of the tokens whose expiry is not returned by Velocity)
+        """
+        self.this_class_name = self.__class__.__name__
+        self.cache_file = os.path.expanduser(cache_file)
+        self.default_lifetime = default_lifetime
+        self.lock = threading.Lock()
+
+    @staticmethod
+    def key(host, username):
+        # The user names are not written in clear next to their tokens
+        return hashlib.sha256(f"{host}\n{username}".encode("utf-8")).hexdigest()
+
+    def __read(self):
+        this_method_name = sys._getframe().f_code.co_name
+
+        try:
+            file_stat = os.stat(self.cache_file)
+        except FileNotFoundError:
+            return {}
+        except OSError as e:
+            log_worker.warning(f"{self.this_class_name} - {this_method_name} - Failed to read the token cache "
+                               f"{self.cache_file}: {e}")
+            return {}
+        if file_stat.st_mode & (stat.S_IRWXG | stat.S_IRWXO) or file_stat.st_uid != os.getuid():
+            log_worker.warning(f"{self.this_class_name} - {this_method_name} - Token cache {self.cache_file} is "
+                               f"accessible to other users, it is ignored.")
+            return {}
+        try:
+            with open(self.cache_file) as file:
+                return json.load(file)
+        except (OSError, ValueError) as e:
+            log_worker.warning(f"{self.this_class_name} - {this_method_name} - Failed to read the token cache "
+                               f"{self.cache_file}: {e}")
+            return {}
+
+    def __write(self, tokens):
+        this_method_name = sys._getframe().f_code.co_name
+
+        temp_file = f"{self.cache_file}.{os.getpid()}.tmp"
+        try:
+            os.makedirs(os.path.dirname(self.cache_file) or ".", mode=0o700, exist_ok=True)
+            file_descriptor = os.open(temp_file, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+            with os.fdopen(file_descriptor, "w") as file:
+                json.dump(tokens, file)
+            os.replace(temp_file, self.cache_file)
+        except OSError as e:
+            log_worker.warning(f"{self.this_class_name} - {this_method_name} - Failed to write the token cache "
+                               f"{self.cache_file}: {e}")
+            return False
+        return True
+
+    def get(self, host, username):
+        """
+        Method used to get a cached token which is not about to expire
+        :param host: (Velocity host)
+        :param username: (Velocity user)
+        :return: token or None
+        """
+        with self.lock:
+            entry = self.__read().get(self.key(host, username))
+        if not entry or entry.get("expires", 0) - EXPIRY_MARGIN <= time.time():
+            return None
+        return entry.get("token")
+
+    def store(self, host, username, token, expires=None):
+        """
+        Method used to save a new token, the expired tokens of the other users are dropped at the same time
+        :param host: (Velocity host)
+        :param username: (Velocity user)
+        :param token: (authentication token)
+        :param expires: (expiry returned by Velocity, epoch in seconds or milliseconds, None uses the default lifetime)
+        :return: True or False
+        """
+        now = time.time()
+        try:
+            expires = float(expires)
+            if expires > 1e11:
+                expires = expires / 1000
+        except (TypeError, ValueError):
+            expires = now + self.default_lifetime
+        with self.lock:
+            tokens = {key: entry for key, entry in self.__read().items() if entry.get("expires", 0) > now}
+            tokens[self.key(host, username)] = {"token": token, "expires": expires}
+            return self.__write(tokens)
+
+    def discard(self, host, username):
+        """
+        Method used to remove a token rejected by Velocity
+        :param host: (Velocity host)
+        :param username: (Velocity user)
+        :return: True or False
+        """
+        with self.lock:
+            tokens = self.__read()
+            if tokens.pop(self.key(host, username), None) is None:
+                return True
+            return self.__write(tokens)
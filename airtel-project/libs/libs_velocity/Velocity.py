@@ -14,15 +14,31 @@ from requests.packages.urllib3.exceptions import InsecureRequestWarning
 from urllib3.exceptions import InsecureRequestWarning
 
 requests.packages.urllib3.disable_warnings(InsecureRequestWarning)
+from parameters.global_parameters import Api as APIPARAMS
 from parameters.global_parameters import Reporting as REPORTINGPARAMS
+from parameters.global_parameters import Velocity as VELOCITYPARAMS
 import helpers.Logger as Local_logger
+import helpers.Tracing as Tracing
+import functools
 import json
 import sys
 import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from helpers.RequestsWrapper import APISession
+from libs.libs_velocity.Device import Device
+from libs.libs_velocity.InventoryCache import InventoryCache
+from libs.libs_velocity.TokenCache import TokenCache
 
-log_worker = Local_logger.create_logger(__name__, REPORTINGPARAMS["log_level_default"],
-                                        REPORTINGPARAMS["session_log_path"], f"velocity_session_log.txt")
+log_worker = Local_logger.create_lazy_logger(__name__, REPORTINGPARAMS["log_level_default"],
+                                             REPORTINGPARAMS["session_log_path"], f"velocity_session_log.txt")
+
+AUTOMATION_ASSET_INDEX_FIELDS = ["id", "name", "fullPath", "tags"]
+
+'''Authenticated sessions shared by the API instances of the process, keyed by (velocity_ip, username)'''
+session_registry = {}
+session_registry_lock = threading.Lock()
 
 
 class API:
@@ -31,29 +47,56 @@ class API:
         self.this_class_name = self.__class__.__name__
         self.base_url = "https://" + velocity_ip + "/velocity/api/"
         self.base_url_ito = "https://" + velocity_ip + "/ito/"
-        # self.api_session = requests.Session()
-        self.api_session = APISession()
-        log_worker.debug(f"Velocity.py - Opened Velocity class instance for {velocity_ip}.")
-        self.api_session.verify = False
-        self.create_token(username, password)
-        self.api_session.headers = {'Content-Type': "application/json", "X-Auth-Token": f"{self.api_token}"}
+        self.velocity_ip = velocity_ip
+        self.token_cache = TokenCache()
+        # The instances created for the same host and user reuse the authenticated session and its open connections
+        with session_registry_lock:
+            shared_session = session_registry.get((velocity_ip, username))
+            if shared_session is None:
+                self.api_session = APISession(service_name="velocity",
+                                              timeout=(APIPARAMS["connect_timeout"], APIPARAMS["read_timeout"]),
+                                              breaker_settings=APIPARAMS["circuit_breaker"],
+                                              rate_limits=APIPARAMS["rate_limits"])
+                log_worker.debug(f"Velocity.py - Opened Velocity class instance for {velocity_ip}.")
+                self.api_session.verify = False
+                self.create_token(username, password)
+                self.api_session.headers = {'Content-Type': "application/json", "X-Auth-Token": f"{self.api_token}"}
+                # A token expired or revoked during a long run is replaced once and the rejected request replayed
+                self.api_session.auth_refresh = functools.partial(self.refresh_token, username, password)
+                session_registry[(velocity_ip, username)] = self.api_session
+            else:
+                log_worker.debug(f"Velocity.py - Reusing the authenticated session for {username} on {velocity_ip}.")
+                self.api_session = shared_session
+                self.api_token = shared_session.headers["X-Auth-Token"]
         self.repeat_step = repeat_step
+        self.automation_asset_index = None
+        self.inventory_cache = None
 
-    def create_token(self, username, password):
+    def create_token(self, username, password, force=False):
         """'
         Method used to get an authentication token for a certain user.
         :param username: (name of the user for which the token is being generated)
         :param password: (password of the user)
+        :param force: (True to request a new token even if one is set in the environment or in the token cache)
         :return: True or False
         """
         this_method_name = sys._getframe().f_code.co_name
-        log_worker.debug(
-            f"{self.this_class_name} - {this_method_name} - Trying to get the token from environment variables.")
-        try:
-            self.api_token = os.environ['VELOCITY_PARAM_VELOCITY_TOKEN']
-        except KeyError as e:
+        if not force:
             log_worker.debug(
-                f"{self.this_class_name} - {this_method_name} - Environment variables do not contain an execution token.")
+                f"{self.this_class_name} - {this_method_name} - Trying to get the token from environment variables.")
+            try:
+                self.api_token = os.environ['VELOCITY_PARAM_VELOCITY_TOKEN']
+                return True
+            except KeyError:
+                log_worker.debug(
+                    f"{self.this_class_name} - {this_method_name} - Environment variables do not contain an execution token.")
+            cached_token = self.token_cache.get(self.velocity_ip, username)
+            if cached_token:
+                log_worker.debug(f"{self.this_class_name} - {this_method_name} - Using the cached token for "
+                                 f"{self.base_url}.")
+                self.api_token = cached_token
+                return True
+        try:
             log_worker.debug(f"{self.this_class_name} - {this_method_name} - Creating token for {self.base_url}.")
             url = self.base_url + "auth/v2/token"
             self.api_session.auth = (username, password)
@@ -62,29 +105,88 @@ class API:
                                                      request_description="Getting a new Velocity token.")
             log_worker.debug(f"{self.this_class_name} - {this_method_name} - Response: {response}.")
             self.api_token = response["token"]
+            self.token_cache.store(self.velocity_ip, username, self.api_token, response.get("expires"))
         except Exception as e:
             log_worker.error(
                 f"{self.this_class_name} - {this_method_name} - Failed to get an execution token, error: {e}")
             return False
         return True
 
-    def get_resources(self, filters=None):
+    def refresh_token(self, username, password):
+        """
+        Method called by the API session when Velocity rejects the token with 401: the rejected token is removed from
+        the token cache and a new one is requested.
+        :param username: (name of the user for which the token is being generated)
+        :param password: (password of the user)
+        :return: headers carrying the new token, or None
+        """
+        this_method_name = sys._getframe().f_code.co_name
+        log_worker.warning(f"{self.this_class_name} - {this_method_name} - Token rejected by {self.base_url}, "
+                           f"requesting a new one.")
+        self.token_cache.discard(self.velocity_ip, username)
+        if not self.create_token(username, password, force=True):
+            return None
+        return {"X-Auth-Token": f"{self.api_token}"}
+
+    def use_inventory_cache(self, cache_file=VELOCITYPARAMS["inventory_cache_path"],
+                            refresh_interval=VELOCITYPARAMS["inventory_cache_refresh_interval"]):
+        """
+        Method used to sync the local inventory snapshot and answer the next get_resources calls from it
+        :param cache_file: (path of the SQLite snapshot file on a local disk, shared by the inventory scripts of the
+        host)
+        :param refresh_interval: (number of seconds after a sync during which the snapshot is used without any check)
+        :return: True or False
+        """
+        this_method_name = sys._getframe().f_code.co_name
+
+        inventory_cache = InventoryCache(self, cache_file, refresh_interval)
+        if not inventory_cache.sync():
+            log_worker.warning(f"{self.this_class_name} - {this_method_name} - Inventory snapshot could not be "
+                               f"synced, the resources will be requested from Velocity.")
+            self.inventory_cache = None
+            return False
+        self.inventory_cache = inventory_cache
+        return True
+
+    def invalidate_inventory_cache(self, cache_file=VELOCITYPARAMS["inventory_cache_path"]):
+        """
+        Method used to force the next inventory snapshot sync, after a script modified the Velocity inventory
+        :param cache_file: (path of the SQLite snapshot file)
+        :return: True or False
+        """
+        inventory_cache = self.inventory_cache or InventoryCache(self, cache_file)
+        return inventory_cache.invalidate()
+
+    def get_resources(self, filters=None, properties=None, use_cache=True):
         """'
         Method used to get a complete list of all resources based on the given filter.
         :param filters: (list of filters which will be added to the url, example: ["folderId::123","hostId:!:456"])
+        :param properties: (list of property names to keep for each resource; None keeps all the properties and an
+        empty list asks Velocity for the resources without properties)
+        :param use_cache: (set to False to always ask Velocity, even if the inventory snapshot is enabled)
         :return: Json with all resources and properties if successful, False if requests failed.
         """
         if filters is None:
             filters = []
 
         this_method_name = sys._getframe().f_code.co_name
+        if use_cache and self.inventory_cache is not None:
+            resources = self.inventory_cache.get_resources(filters, properties)
+            if resources is not None:
+                log_worker.debug(f"{self.this_class_name} - {this_method_name} - Got {len(resources['devices'])} "
+                                 f"resources from the inventory snapshot using filters {filters}.")
+                return resources
         log_worker.debug(f"{self.this_class_name} - {this_method_name} - Getting all resources from {self.base_url}.")
-        url = self.base_url + "inventory/v16/devices?includeProperties=true&limit=200&"
+        include_properties = "false" if properties is not None and not properties else "true"
+        url = self.base_url + f"inventory/v16/devices?includeProperties={include_properties}&limit=200&"
 
         if filters:
             for flt in filters:
                 url = f"{url}filter={flt}&"
 
+        # The inventory API can only include or exclude all the properties, the others are dropped page by page
+        property_whitelist = set(properties) if properties else None
+
         total = 1
         offset = 0
         all_resources = {"devices": []}
@@ -96,6 +198,10 @@ class API:
                                                      log_worker=log_worker,
                                                      request_description=f"Getting all resources using url {url}.")
             if response:
+                if property_whitelist is not None:
+                    for device in response["devices"]:
+                        device["properties"] = [device_property for device_property in device.get("properties", [])
+                                                if device_property["name"] in property_whitelist]
                 all_resources["devices"].extend(response["devices"])
             else:
                 return False
@@ -113,20 +219,15 @@ class API:
         :return: False or dictionary with property name and value pairs
         """
         this_method_name = sys._getframe().f_code.co_name
-        property_values_dict = dict()
         log_worker.debug(
             f"{self.this_class_name} - {this_method_name} - Get resource properties values for {resource_name}")
 
         filter_list = ["name::" + resource_name]
-        resource = self.get_resources(filter_list)
+        resource = self.get_resources(filter_list, properties=property_name_list, use_cache=False)
         if not resource:
             return False
 
-        resource = resource['devices']
-        for resource_property in resource[0]['properties']:
-            property_name = resource_property['name']
-            if property_name in property_name_list:
-                property_values_dict[property_name] = resource_property['value']
+        property_values_dict = Device.from_record(resource['devices'][0]).property_values(property_name_list)
 
         log_worker.debug(
             f"{self.this_class_name} - {this_method_name} - Obtained property values: {property_values_dict}")
@@ -377,6 +478,7 @@ class API:
                                              method_name=this_method_name,
                                              request_description=f"list of nested templates under {parent_template_id}")
 
+    @Tracing.tracer.traced("Velocity.create_rack_structure", "library")
     def create_rack_structure(self, inventory_json, lab_row_template_name, rack_template_name):
         """
         Method used to create the rack structures for the airtel environment
@@ -398,31 +500,31 @@ class API:
 
         ignore_list = [None, "To be filled(A-I)", "To be filled(1-16)", "", "None", "N/A"]
         total_number = len(inventory_json['devices'])
+        device_ids_by_name = {}
+        template_ids_by_device_id = {}
+        for device_iter in reversed(inventory_json["devices"]):
+            device_ids_by_name[device_iter["name"]] = device_iter["id"]
+            template_ids_by_device_id[device_iter["id"]] = device_iter.get("templateId")
         for i in range(0, total_number):
             log_worker.debug(f"{self.this_class_name} - {this_method_name} - Processing resource {i}/{total_number} "
                              f"with ID: {inventory_json['devices'][i]['id']}.")
             try:
-                lab_row = rack_number = ''
-                for j in range(0, len(inventory_json["devices"][i]["properties"])):
-                    if inventory_json["devices"][i]["properties"][j]["name"] == "Lab Row" and \
-                            inventory_json["devices"][i]["properties"][j]["value"] not in ignore_list:
-                        lab_row = inventory_json["devices"][i]["properties"][j]["value"]
-                    if inventory_json["devices"][i]["properties"][j]["name"] == "Rack Number" and \
-                            inventory_json["devices"][i]["properties"][j]["value"] not in ignore_list:
-                        rack_number = inventory_json["devices"][i]["properties"][j]["value"]
+                device = Device.from_record(inventory_json["devices"][i])
+                lab_row = device.property_value("Lab Row")
+                rack_number = device.property_value("Rack Number")
+                if lab_row in ignore_list:
+                    lab_row = ''
+                if rack_number in ignore_list:
+                    rack_number = ''
 
                 if lab_row and rack_number:
                     log_worker.debug(
                         f"{self.this_class_name} - {this_method_name} - Found combination: lab_row: {lab_row} and rack_number: {rack_number}.")
                     lab_row = lab_row.upper()
                     if lab_row not in rack_structure.keys():
-                        lab_row_id = ''
-
-                        for device_iter in inventory_json["devices"]:
-                            if device_iter["name"] == f"Row_{lab_row}":
-                                lab_row_id = device_iter["id"]
-                                log_worker.debug(f"{self.this_class_name} - {this_method_name} - Row_{lab_row} already exists with ID {lab_row_id}")
-                                break
+                        lab_row_id = device_ids_by_name.get(f"Row_{lab_row}", '')
+                        if lab_row_id != '':
+                            log_worker.debug(f"{self.this_class_name} - {this_method_name} - Row_{lab_row} already exists with ID {lab_row_id}")
 
                         if lab_row_id == '':
                             lab_row_id = self.create_device(f"Row_{lab_row}", row_template, folder_id)
@@ -437,13 +539,9 @@ class API:
                     if rack_name not in rack_structure[lab_row].keys():
                         log_worker.debug(
                             f"{self.this_class_name} - {this_method_name} - {rack_name} was not created on this run, checking the inventory to see if it already exists.")
-                        rack_id = ''
-
-                        for device_iter in inventory_json["devices"]:
-                            if device_iter["name"] == rack_name:
-                                rack_id = device_iter["id"]
-                                log_worker.debug(f"{self.this_class_name} - {this_method_name} - {rack_name} already exists with ID {rack_id}")
-                                break
+                        rack_id = device_ids_by_name.get(rack_name, '')
+                        if rack_id != '':
+                            log_worker.debug(f"{self.this_class_name} - {this_method_name} - {rack_name} already exists with ID {rack_id}")
 
                         if rack_id == '':
                             log_worker.debug(
@@ -467,15 +565,11 @@ class API:
                     device_id = inventory_json["devices"][i]["id"]
                     host_device_id = inventory_json["devices"][i]["hostId"]
                     if host_device_id is not None:
-                        host_template_id = ''
                         log_worker.debug(f"{self.this_class_name} - {this_method_name} - Lab row ({lab_row}) or rack "
                                          f"number ({rack_number}) properties are missing. Resource will be un-nested "
                                          f"if it's nested under a rack used by the automation script ("
                                          f"{rack_template}).")
-                        for k in range(0, str(inventory_json).count("'id'")):
-                            if inventory_json["devices"][k]["id"] == host_device_id:
-                                host_template_id = inventory_json["devices"][k]["templateId"]
-                                break
+                        host_template_id = template_ids_by_device_id.get(host_device_id, '')
                         if host_template_id != '' and host_template_id == rack_template:
                             log_worker.debug(
                                 f"{self.this_class_name} - {this_method_name} - Resource {device_id} will be un-nested from {host_device_id}.")
@@ -516,13 +610,14 @@ class API:
 
         return True
 
+    @Tracing.tracer.traced("Velocity.get_airtel_racks", "library")
     def get_airtel_racks(self, rack_template_name):
         """
         Method used to get the list of racks created previously by this script, using the same rack template name
         :param rack_template_name: name of the template representing the Rack resources
         :return: response_racks (
         Velocity json structure containing rack resources), response_devices (Velocity json structure containing the
-        nested devices under the racks)
+        nested devices under the racks), or False if the racks or any batch of nested devices could not be listed
         """
         this_method_name = sys._getframe().f_code.co_name
 
@@ -531,6 +626,10 @@ class API:
         log_worker.debug(
             f"{self.this_class_name} - {this_method_name} - Getting rack instances having template Id {rack_template_id}")
         response_racks = self.get_resources([f"templateId::{rack_template_id}"])
+        if not response_racks:
+            log_worker.error(f"{self.this_class_name} - {this_method_name} - Failed to get the rack instances having "
+                             f"template Id {rack_template_id}")
+            return False
         total_number = str(response_racks).count("'id'")
         log_worker.debug(f"{self.this_class_name} - {this_method_name} - Found {total_number} resources.")
 
@@ -543,21 +642,19 @@ class API:
                 filters_list.append(filter_set[:-1])
                 filter_set = ''
             i += 1
-        filters_list.append(filter_set[:-1])
+        if filter_set:
+            filters_list.append(filter_set[:-1])
 
         response_devices = {'devices': []}
 
         for filter_set in filters_list:
             nest_response = self.get_resources([filter_set])
-            response_devices = json.dumps(response_devices)
-            nest_response = json.dumps(nest_response)
-            first_part = str(response_devices)[:-2]
-            second_part = str(nest_response)[13:-2]
-            if filter_set == filters_list[0]:
-                response_devices = first_part + second_part + ']}'
-            else:
-                response_devices = first_part + ',' + second_part + ']}'
-            response_devices = json.loads(response_devices)
+            if not nest_response:
+                # A partial device list would make NetBox delete the devices of the missing racks
+                log_worker.error(f"{self.this_class_name} - {this_method_name} - Failed to get the devices nested "
+                                 f"under the racks {filter_set}")
+                return False
+            response_devices['devices'].extend(nest_response['devices'])
 
         total_number_racks = str(response_racks).count("'id'")
         total_number_devices = str(response_devices).count("'id'")
@@ -566,10 +663,11 @@ class API:
 
         return response_racks, response_devices
 
-    def get_airtel_racks_v2(self, templateId):
+    @Tracing.tracer.traced("Velocity.get_airtel_racks_v2", "library")
+    def get_airtel_racks_v2(self, templateId, properties=None):
 
         log_worker.debug(f"get_airtel_racks - Getting rack instances having template Id {templateId}")
-        responseRacks = self.get_resources([f"templateId::{templateId}"])
+        responseRacks = self.get_resources([f"templateId::{templateId}"], properties=properties)
         totalNumber = str(responseRacks).count("'id'")
         log_worker.debug(f"get_airtel_racks - Found {totalNumber} resources.")
 
@@ -582,7 +680,7 @@ class API:
         """
         Method used to get the list of automation assets based on the given filter
         :param filters: dictionary set of filters names, together with their values
-        :return: json list of the obtained automation assets
+        :return: json list of the obtained automation assets, or False if a page could not be listed
         """
         if filters is None:
             filters = {}
@@ -597,9 +695,7 @@ class API:
             url = f"{url}&"
             for flt in filters.keys():
                 if flt == "tags":
-                    for tag in filters[flt]:
-                        url = f"{url}filter=tags::{tag}|"
-                    url = url[:-1]
+                    url = f"{url}filter=tags::{'|'.join(filters[flt])}"
                 elif flt == "fullPath":
                     url = f"{url}filter={flt}::{filters[flt]}"
 
@@ -613,24 +709,191 @@ class API:
 
         while offset < total:
             url_offset = f"{url}&offset={str(offset)}"
-            response = self.api_session.send_request(request_type="get", url=url, log_worker=log_worker,
+            response = self.api_session.send_request(request_type="get", url=url_offset, log_worker=log_worker,
                                                      method_name=this_method_name,
                                                      request_description=f"list of automation assets")
+            if not response or "content" not in response:
+                log_worker.error(f"{self.this_class_name} - {this_method_name} - Failed to get automation assets "
+                                 f"with offset {offset}. Response: {response}")
+                return False
             log_worker.debug(f"{self.this_class_name} - {this_method_name} - Successful request.")
             automation_assets["content"].extend(response["content"])
             total = int(response["total"])
             count = int(response["count"])
 
             offset = offset + count
+            if count == 0 and offset < total:
+                log_worker.error(f"{self.this_class_name} - {this_method_name} - Empty page of automation assets at "
+                                 f"offset {offset}, {total} assets were announced.")
+                return False
 
             if "errorId" in str(response):
-                log_worker.eror(f"{self.this_class_name} - {this_method_name} - Response: {response}")
+                log_worker.error(f"{self.this_class_name} - {this_method_name} - Response: {response}")
             else:
                 log_worker.debug(f"{self.this_class_name} - {this_method_name} - List of automation assets was "
                                  f"successfully queried, total items: {len(automation_assets['content'])}")
 
         return automation_assets
 
+    def __load_automation_asset_index(self, cache_file, cache_ttl):
+        this_method_name = sys._getframe().f_code.co_name
+
+        if not cache_file or cache_ttl <= 0 or not os.path.isfile(cache_file):
+            return None
+        if time.time() - os.path.getmtime(cache_file) > cache_ttl:
+            log_worker.debug(f"{self.this_class_name} - {this_method_name} - Automation asset cache {cache_file} "
+                             f"expired.")
+            return None
+        try:
+            with open(cache_file) as file:
+                return json.load(file)
+        except (OSError, ValueError) as e:
+            log_worker.warning(f"{self.this_class_name} - {this_method_name} - Failed to read automation asset "
+                               f"cache {cache_file}: {e}")
+            return None
+
+    def __save_automation_asset_index(self, cache_file, automation_asset_index):
+        this_method_name = sys._getframe().f_code.co_name
+
+        temp_file = f"{cache_file}.{os.getpid()}.tmp"
+        try:
+            os.makedirs(os.path.dirname(cache_file), exist_ok=True)
+            with open(temp_file, "w") as file:
+                json.dump(automation_asset_index, file, separators=(",", ":"))
+            os.replace(temp_file, cache_file)
+        except OSError as e:
+            log_worker.warning(f"{self.this_class_name} - {this_method_name} - Failed to write automation asset "
+                               f"cache {cache_file}: {e}")
+
+    def get_automation_asset_index(self, refresh=False, cache_file=VELOCITYPARAMS["asset_cache_path"],
+                                   cache_ttl=VELOCITYPARAMS["asset_cache_ttl"]):
+        """
+        Method used to get an index of the whole automation repository, built from a single paged listing. The index
+        is kept on the API instance and, if cache_ttl is greater than 0, in a JSON file shared by all the scripts.
+        :param refresh: (set to True to ignore the in-memory and disk cache and list the repository again)
+        :param cache_file: (path of the disk cache file)
+        :param cache_ttl: (number of seconds for which the disk cache is valid, 0 disables the disk cache)
+        :return: dictionary with "by_tag" (tag -> list of assets) and "by_full_path" (fullPath -> asset) maps
+        """
+        this_method_name = sys._getframe().f_code.co_name
+
+        if self.automation_asset_index is not None and not refresh:
+            return self.automation_asset_index
+
+        automation_asset_index = None
+        if not refresh:
+            automation_asset_index = self.__load_automation_asset_index(cache_file, cache_ttl)
+
+        if automation_asset_index is None:
+            automation_assets = self.get_automation_assets()
+            if automation_assets is False:
+                # An incomplete listing is neither cached on disk nor kept on the instance, the next call lists again
+                log_worker.error(f"{self.this_class_name} - {this_method_name} - The automation repository could not "
+                                 f"be listed completely, the automation asset index is empty.")
+                return {"by_tag": {}, "by_full_path": {}}
+            automation_asset_index = {"by_tag": {}, "by_full_path": {}}
+            for asset in automation_assets["content"]:
+                asset = {field: asset[field] for field in AUTOMATION_ASSET_INDEX_FIELDS if field in asset}
+                if "fullPath" in asset:
+                    automation_asset_index["by_full_path"][asset["fullPath"]] = asset
+                for tag in asset.get("tags") or []:
+                    automation_asset_index["by_tag"].setdefault(tag, []).append(asset)
+            if cache_file and cache_ttl > 0:
+                self.__save_automation_asset_index(cache_file, automation_asset_index)
+            log_worker.debug(f"{self.this_class_name} - {this_method_name} - Indexed "
+                             f"{len(automation_asset_index['by_full_path'])} automation assets and "
+                             f"{len(automation_asset_index['by_tag'])} tags.")
+        else:
+            log_worker.debug(f"{self.this_class_name} - {this_method_name} - Automation asset index loaded from "
+                             f"{cache_file}.")
+
+        self.automation_asset_index = automation_asset_index
+        return automation_asset_index
+
+    def __batch_tags(self, tags, url_length_budget):
+        base_url_length = len(self.base_url_ito + "repository/v2/resources?limit=200&filter=driver::false&&"
+                                                  "filter=tags::&offset=000000")
+        batches = []
+        batch = []
+        batch_length = base_url_length
+        for tag in tags:
+            tag_length = len(tag) + 1
+            if batch and batch_length + tag_length > url_length_budget:
+                batches.append(batch)
+                batch = []
+                batch_length = base_url_length
+            batch.append(tag)
+            batch_length = batch_length + tag_length
+        if batch:
+            batches.append(batch)
+        return batches
+
+    def resolve_automation_assets_by_tags(self, tags, url_length_budget=VELOCITYPARAMS["url_length_budget"],
+                                          max_workers=VELOCITYPARAMS["max_parallel_requests"]):
+        """
+        Method used to resolve a list of tags to automation assets using as few requests as possible. The tags are
+        packed into OR filters (tags::a|b|c) which fit the URL length budget, the batches are queried concurrently
+        and the returned assets are mapped back to their tags.
+        :param tags: (list of tags, usually Jira keys)
+        :param url_length_budget: (maximum length of a request URL)
+        :param max_workers: (maximum number of batches queried in parallel)
+        :return: dictionary with "assets" (tag -> list of assets), "ambiguous" (tags matching more than one asset)
+        and "missing" (tags without any asset)
+        """
+        this_method_name = sys._getframe().f_code.co_name
+
+        unique_tags = list(dict.fromkeys(tags))
+        batches = self.__batch_tags(unique_tags, url_length_budget)
+        log_worker.debug(f"{self.this_class_name} - {this_method_name} - Resolving {len(unique_tags)} tags using "
+                         f"{len(batches)} requests.")
+
+        with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(batches) or 1))) as executor:
+            batch_results = list(executor.map(Tracing.tracer.propagate(
+                lambda batch: self.get_automation_assets(filters={"tags": batch})), batches))
+
+        resolved_tags = {"assets": {tag: [] for tag in unique_tags}, "ambiguous": [], "missing": []}
+        for batch, automation_assets in zip(batches, batch_results):
+            if automation_assets is False:
+                log_worker.error(f"{self.this_class_name} - {this_method_name} - Failed to list the automation "
+                                 f"assets of the tags {batch}.")
+                continue
+            batch_tags = set(batch)
+            for asset in automation_assets["content"]:
+                for tag in asset.get("tags") or []:
+                    if tag in batch_tags:
+                        resolved_tags["assets"][tag].append(asset)
+
+        for tag in unique_tags:
+            if len(resolved_tags["assets"][tag]) == 0:
+                resolved_tags["missing"].append(tag)
+            elif len(resolved_tags["assets"][tag]) > 1:
+                resolved_tags["ambiguous"].append(tag)
+
+        if resolved_tags["ambiguous"]:
+            log_worker.warning(f"{self.this_class_name} - {this_method_name} - Tags matching more than one automation "
+                               f"asset: {resolved_tags['ambiguous']}")
+        if resolved_tags["missing"]:
+            log_worker.warning(f"{self.this_class_name} - {this_method_name} - Tags without automation assets: "
+                               f"{resolved_tags['missing']}")
+        return resolved_tags
+
+    def find_automation_assets_by_tag(self, tag):
+        """
+        Method used to get the automation assets having a tag, using the automation asset index
+        :param tag: (tag of the automation assets, usually a Jira key)
+        :return: json list of the matching automation assets, in the same format as get_automation_assets
+        """
+        return {"content": list(self.get_automation_asset_index()["by_tag"].get(tag, []))}
+
+    def find_automation_asset_by_path(self, full_path):
+        """
+        Method used to get an automation asset by its full path, using the automation asset index
+        :param full_path: (full path of the automation asset)
+        :return: json list of the matching automation assets, in the same format as get_automation_assets
+        """
+        asset = self.get_automation_asset_index()["by_full_path"].get(full_path)
+        return {"content": [asset] if asset else []}
+
     def extract_testcase_paths(self, get_testcases_response):
         """
         Method used to get a list of testcase paths from a set of JSON data containing automation asset info
@@ -648,7 +911,7 @@ class API:
 
         return paths
 
-    def post_runlist_execution(self, testcase_paths, detail_level, terminate_on_item_fail, execution_name, topology_id, runlist_parameters):
+    def post_runlist_execution(self, testcase_paths, detail_level, terminate_on_item_fail, execution_name, topology_id, runlist_parameters=None):
         """
         Method used to start a runlist execution in Velocity
         :param testcase_paths: list of testcase paths for each of the testcases included in the runlist
@@ -696,9 +959,9 @@ class API:
 
     def get_runlist_execution(self, execution_id):
         """
-        Method used to get the status of a runlist execution
-        :param execution_id: runlist execution id
-        :return: response of the request
+        Method used to get the status of one or more runlist executions
+        :param execution_id: runlist execution id or list of runlist execution ids, queried in a single request
+        :return: response of the request, a list with one summary for each runlist execution
         """
         this_method_name = sys._getframe().f_code.co_name
 
@@ -706,7 +969,10 @@ class API:
             f"{self.this_class_name} - {this_method_name} - Getting information for execution with id {execution_id}.")
 
         url = f"{self.base_url_ito}executions/v1/runlists/summary"
-        body = [execution_id]
+        if isinstance(execution_id, list):
+            body = execution_id
+        else:
+            body = [execution_id]
         response = self.api_session.send_request(request_type="post", json_data=body, url=url,
                                                  request_description="runlist execution status", log_worker=log_worker,
                                                  method_name=this_method_name)
@@ -11,12 +11,17 @@
 # ---------------------------------------------------------------------------
 import base64
 import sys
+from parameters.global_parameters import Api as APIPARAMS
 from parameters.global_parameters import Reporting as REPORTINGPARAMS
 import helpers.Logger as Local_logger
 from helpers.RequestsWrapper import APISession
 
-log_worker = Local_logger.create_logger(__name__, REPORTINGPARAMS["log_level_default"],
-                                        REPORTINGPARAMS["session_log_path"], "zephyr_core_log.txt")
+log_worker = Local_logger.create_lazy_logger(__name__, REPORTINGPARAMS["log_level_default"],
+                                             REPORTINGPARAMS["session_log_path"], "zephyr_core_log.txt")
+
+'''ZAPI status ids of the supported execution statuses, and the statuses reported as blocked'''
+EXECUTION_STATUS_IDS = {"unexecuted": "-1", "pass": "1", "fail": "2", "wip": "3", "blocked": "4"}
+BLOCKED_STATUSES = ["abort", "cancel", "error"]
 
 
 class ZephyrCore(object):
@@ -51,7 +56,10 @@ class ZephyrCore(object):
                 f"{self.this_class_name} - {this_method_name} - Could not convert credentials to base64 {err}.")
             return False
 
-        self.api_session = APISession(repeat_step=self.repeat_step)
+        self.api_session = APISession(repeat_step=self.repeat_step, service_name="zephyr",
+                                      timeout=(APIPARAMS["connect_timeout"], APIPARAMS["read_timeout"]),
+                                      breaker_settings=APIPARAMS["circuit_breaker"],
+                                      rate_limits=APIPARAMS["rate_limits"])
         self.api_session.headers = {'Content-Type': 'application/json', 'Authorization': 'Basic ' + self.user_token}
         return True
 
@@ -299,6 +307,24 @@ class ZephyrCore(object):
         return self.api_session.send_request(request_type="get", url=url, method_name=this_method_name,
                                              log_worker=log_worker, request_description="Test Execution information")
 
+    def __status_id(self, execution_status, method_name):
+        """ Method used to translate an execution status to its ZAPI status id.
+        :param execution_status: (supporting: "unexecuted", "pass", "fail", "wip", "blocked", abort/cancel/error are
+        reported as "blocked")
+        :param method_name: (name of the calling method, used in the log)
+        :return: False or the status id
+        """
+        execution_status = execution_status.lower()
+        if execution_status in BLOCKED_STATUSES:
+            execution_status = "blocked"
+
+        if execution_status not in EXECUTION_STATUS_IDS:
+            log_worker.warning(
+                f"{self.this_class_name} - {method_name} - Status {execution_status} is not supported. "
+                f"Use one of: \"unexecuted\", \"pass\", \"fail\", \"wip\", \"blocked\" .")
+            return False
+        return EXECUTION_STATUS_IDS[execution_status]
+
     def update_test_execution_status_by_id(self, execution_id, execution_status):
         """ Method used to update Test Execution status for an execution identified by id.
         :param execution_id: (obtain it using get_test_executions_by_ methods)
@@ -306,27 +332,42 @@ class ZephyrCore(object):
         :return: True or False
         """
         this_method_name = sys._getframe().f_code.co_name
-        execution_status = execution_status.lower()
-        status_mapping = {"unexecuted": "-1", "pass": "1", "fail": "2", "wip": "3", "blocked": "4"}
         log_worker.debug(
             f"{self.this_class_name} - {this_method_name} - Trying to update execution status for execution with "
             f"id {execution_id}.")
 
-        if execution_status in ["abort", "cancel", "error"]:
-            execution_status = "blocked"
-
-        if execution_status not in ["unexecuted", "pass", "fail", "wip", "blocked"]:
-            log_worker.warning(
-                f"{self.this_class_name} - {this_method_name} - Status {execution_status} is not supported. "
-                f"Use one of: \"unexecuted\", \"pass\", \"fail\", \"wip\", \"blocked\" .")
+        status_id = self.__status_id(execution_status, this_method_name)
+        if status_id is False:
             return False
 
         url = self.base_url + f"execution/{execution_id}/execute"
-        json_message_body = {"status": status_mapping[execution_status]}
+        json_message_body = {"status": status_id}
         return self.api_session.send_request(request_type="put", url=url, json_data=json_message_body,
                                              method_name=this_method_name, log_worker=log_worker,
                                              request_description="Test Execution Update")
 
+    def update_test_executions_status_bulk(self, execution_ids, execution_status):
+        """ Method used to update the status of multiple Test Executions in a single request.
+        :param execution_ids: (list of execution ids, obtain them using get_test_executions_by_ methods)
+        :param execution_status: (supporting: "unexecuted", "pass", "fail", "wip", "blocked")
+        :return: False or Bulk update information in JSON format
+        """
+        this_method_name = sys._getframe().f_code.co_name
+        log_worker.debug(
+            f"{self.this_class_name} - {this_method_name} - Trying to update execution status to {execution_status} "
+            f"for executions with ids {execution_ids}.")
+
+        status_id = self.__status_id(execution_status, this_method_name)
+        if status_id is False:
+            return False
+
+        url = self.base_url + f"execution/updateBulkStatus"
+        json_message_body = {"executions": [str(execution_id) for execution_id in execution_ids],
+                             "status": status_id}
+        return self.api_session.send_request(request_type="put", url=url, json_data=json_message_body,
+                                             method_name=this_method_name, log_worker=log_worker,
+                                             request_description="Bulk Test Execution Update")
+
     def get_job_progress_by_token(self, job_progress_token):
         """ Method used to get all cycles information.
         :param job_progress_token: (obtain it using delete methods)
@@ -2,6 +2,14 @@ Reporting = {
     "report_path": "/mnt/AIRTELLOGSDIR/reports",
     "test_log_path": "/mnt/AIRTELLOGSDIR/logs/t_LogsTests",
     "session_log_path": "/mnt/AIRTELLOGSDIR/logs/f_LogsSessions",
+    "checkpoint_path": "/mnt/AIRTELLOGSDIR/checkpoints",
+    "template_cache_path": "/mnt/AIRTELLOGSDIR/cache/templates",
+    "metrics_path": "/mnt/AIRTELLOGSDIR/metrics",
+    "trace_path": "/mnt/AIRTELLOGSDIR/traces",
+    "profile_path": "/mnt/AIRTELLOGSDIR/profiles",
+    "diagnostics_dump": False,
+    "report_page_size": 500,
+    "artifact_compression": "gzip",
     "log_level_default": "DEBUG"
 }
 
@@ -17,7 +25,15 @@ OpenSearch = {
 Velocity = {
     "host": "vel-airtel-test.velocity-pv.lwd.int.spirent.io",
     "user": "spirent",
-    "pass": "spirent"
+    "pass": "spirent",
+    "asset_cache_path": "/mnt/AIRTELLOGSDIR/cache/automation_assets.json",
+    "asset_cache_ttl": 900,
+    "inventory_cache_path": "~/.cache/airtel/velocity_inventory.sqlite",
+    "inventory_cache_refresh_interval": 300,
+    "token_cache_path": "~/.cache/airtel/velocity_tokens.json",
+    "token_default_lifetime": 3600,
+    "url_length_budget": 2000,
+    "max_parallel_requests": 4
 }
 
 Jira = {
@@ -36,3 +52,19 @@ Mail = {
     "default_to_email": "george.popovici@dxc.com",
     "from_email": "velocity@spirent.com"
 }
+
+Api = {
+    "connect_timeout": 10,
+    "read_timeout": 300,
+    "circuit_breaker": {
+        "failure_rate_threshold": 0.5,
+        "minimum_calls": 5,
+        "window_size": 20,
+        "open_duration": 30
+    },
+    "rate_limits": {
+        "read": {"rate": 20, "burst": 40},
+        "write": {"rate": 10, "burst": 20},
+        "hosts": {}
+    }
+}
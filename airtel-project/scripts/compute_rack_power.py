@@ -14,10 +14,14 @@ import os
 import sys
 sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
 import libs.libs_velocity.Velocity as Velocity
+from libs.libs_velocity.Device import Device
 import libs.libs_opensearch.OpenSearch as OpenSearch
 import re
 import datetime
+import helpers.EntryPoint as EntryPoint
 import helpers.Logger as Local_logger
+import helpers.Metrics as Metrics
+import helpers.Tracing as Tracing
 from parameters.global_parameters import Reporting as REPORTINGPARAMS
 from parameters.global_parameters import Velocity as VELOCITYPARAMS
 from parameters.global_parameters import OpenSearch as OPENSEARCHPARAMS
@@ -25,8 +29,15 @@ from parameters.global_parameters import OpenSearch as OPENSEARCHPARAMS
 log_worker = Local_logger.create_logger(__name__, REPORTINGPARAMS["log_level_default"],
                                         REPORTINGPARAMS["test_log_path"], "s_compute_rack_power.txt")
 
+RACK_PROPERTIES = ["Max Power Consumption", "PDU Reported Power", "Max Installed Power"]
+RACK_DEVICE_PROPERTIES = ["Max Power Consumption", "PDU Reported Power"]
+
 
 def main():
+    # Spans are recorded and the diagnostics are written to the shared drive only when asked for
+    if EntryPoint.timings_enabled() or REPORTINGPARAMS["diagnostics_dump"]:
+        Metrics.registry.dump_at_exit(os.path.join(REPORTINGPARAMS["metrics_path"], "compute_rack_power_metrics.json"))
+        Tracing.tracer.dump_at_exit(os.path.join(REPORTINGPARAMS["trace_path"], "compute_rack_power_trace.json"))
 
     # Get Velocity details and open session
     velocity = VELOCITYPARAMS['host']
@@ -36,6 +47,8 @@ def main():
     rack_template_id = "2ec509fe-a50c-4328-b3d9-76a98e2ee560"
 
     velocity_session = Velocity.API(velocity, velo_user, velo_password)
+    if not velocity_session.use_inventory_cache():
+        log_worker.warning(f"Inventory snapshot is not available, the resources will be requested from Velocity.")
 
     # Get OpenSearch credentials from Velocity and open session
     open_search_velo_service_name = OPENSEARCHPARAMS['service_name_velo']
@@ -48,7 +61,7 @@ def main():
 
     open_search_client = OpenSearch.API(open_search_host['ipAddress'], open_search_host['username'], open_search_host['password'])
 
-    rack_structure = velocity_session.get_airtel_racks_v2(rack_template_id)
+    rack_structure = velocity_session.get_airtel_racks_v2(rack_template_id, properties=RACK_PROPERTIES)
     if not rack_structure:
         log_worker.error(f"Finished: Could not get rack structure")
         log_worker.error(f"Finished: FAIL")
@@ -58,10 +71,13 @@ def main():
     if not open_search_client.delete_index():
         log_worker.warning(f"Could not delete open search index, continue to write new entries on it")
 
+    # The rack power properties are updated below, the next inventory snapshot sync has to download the racks again
+    velocity_session.invalidate_inventory_cache()
+
     # loop through all racks
-    for rack in rack_structure['devices']:
-        rack_id = rack['id']
-        rack_name = rack['name']
+    for rack in Device.from_resources(rack_structure):
+        rack_id = rack.id
+        rack_name = rack.name
         rack_max_power = 0
         pdu_reported_power = 0
         max_installed_power = 0
@@ -69,8 +85,8 @@ def main():
         available_power_vs_user_reported = 0
 
         # Get devices that has parent the current rack in iteration
-        filterlist = ["hostId::"+rack['id']]
-        rack_devices = velocity_session.get_resources(filterlist)
+        filterlist = ["hostId::"+rack.id]
+        rack_devices = velocity_session.get_resources(filterlist, properties=RACK_DEVICE_PROPERTIES)
         if not rack_devices:
             log_worker.error(f"Finished: Could not get rack devices")
             log_worker.error(f"Finished: FAIL")
@@ -78,23 +94,17 @@ def main():
 
         # Get Max Power Consumption from each device under the rack and do the sum
         # Do the same for PDU Reported Power
-        for rack_device in rack_devices['devices']:
-            for rack_device_property in rack_device['properties']:
-                if rack_device_property['name'] == "Max Power Consumption" and rack_device_property['value']:
-                    rack_max_power += int(rack_device_property['value'])
-                if rack_device_property['name'] == "PDU Reported Power" and rack_device_property['value']:
-                    pdu_reported_power += int(rack_device_property['value'])
+        for rack_device in Device.from_resources(rack_devices):
+            if rack_device.property_value("Max Power Consumption"):
+                rack_max_power += int(rack_device.property_value("Max Power Consumption"))
+            if rack_device.property_value("PDU Reported Power"):
+                pdu_reported_power += int(rack_device.property_value("PDU Reported Power"))
 
         # Update Max Power Consumption / PDU Reported Power at rack level
-        definition_id_max_power = 0
-        definition_id_pdu = 0
-        for property_list in rack['properties']:
-            if property_list['name'] == "Max Power Consumption":
-                definition_id_max_power = property_list['definitionId']
-            if property_list['name'] == "PDU Reported Power":
-                definition_id_pdu = property_list['definitionId']
-            if property_list['name'] == "Max Installed Power":
-                max_installed_power = int(property_list['value'])
+        definition_id_max_power = rack.property_definition_id("Max Power Consumption", 0)
+        definition_id_pdu = rack.property_definition_id("PDU Reported Power", 0)
+        if rack.has_property("Max Installed Power"):
+            max_installed_power = int(rack.property_value("Max Installed Power"))
 
         available_power_vs_user_reported = max_installed_power - rack_max_power
         available_power_vs_pdu_reported = max_installed_power - pdu_reported_power
@@ -142,4 +152,4 @@ def main():
 
 
 if __name__ == "__main__":
-    main()
+    EntryPoint.run(main, REPORTINGPARAMS["profile_path"])
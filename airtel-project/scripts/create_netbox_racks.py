@@ -14,7 +14,10 @@ import sys
 
 sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
 import libs.libs_netbox.NetBox as NetBox
+import helpers.EntryPoint as EntryPoint
 import helpers.Logger as Local_logger
+import helpers.Metrics as Metrics
+import helpers.Tracing as Tracing
 import libs.libs_velocity.Velocity as Velocity
 from parameters.global_parameters import Velocity as VELOCITYPARAMS
 from parameters.global_parameters import Reporting as REPORTINGPARAMS
@@ -25,6 +28,10 @@ log_worker = Local_logger.create_logger(__name__, REPORTINGPARAMS["log_level_def
 
 
 def main():
+    # Spans are recorded and the diagnostics are written to the shared drive only when asked for
+    if EntryPoint.timings_enabled() or REPORTINGPARAMS["diagnostics_dump"]:
+        Metrics.registry.dump_at_exit(os.path.join(REPORTINGPARAMS["metrics_path"], "create_netbox_racks_metrics.json"))
+        Tracing.tracer.dump_at_exit(os.path.join(REPORTINGPARAMS["trace_path"], "create_netbox_racks_trace.json"))
     velocity = VELOCITYPARAMS['host']
     velo_user = VELOCITYPARAMS['user']
     velo_password = VELOCITYPARAMS['pass']
@@ -39,6 +46,10 @@ def main():
         log_worker.error(f"Finished: FAILED")
         return
 
+    log_worker.info(f"Syncing the local Velocity inventory snapshot.")
+    if not velocity_session.use_inventory_cache():
+        log_worker.warning(f"Inventory snapshot is not available, the resources will be requested from Velocity.")
+
     log_worker.info(f"Getting Netbox connection details.")
 
     Netbox_Velo_service_name = NETBOXPARAMS['service_name_velo']
@@ -56,11 +67,18 @@ def main():
     netbox_token = NetBox_host['password']
 
     log_worker.info(f"Getting rack and device structures from Velocity.")
-    rack_structure, device_structure = velocity_session.get_airtel_racks(rack_template_name="Rack")
+    velocity_racks = velocity_session.get_airtel_racks(rack_template_name="Rack")
+    if not velocity_racks:
+        log_worker.error(f"Failed to get the rack and device structures from Velocity, Netbox is left unchanged.")
+        log_worker.error(f"Finished: FAILED")
+        return
+    rack_structure, device_structure = velocity_racks
 
     log_worker.info(f"Opening Velocity session to {velocity} with user {velo_user}")
     try:
-        netbox_session = NetBox.API(netbox, netbox_token)
+        # The token is read again from the Velocity service device if NetBox rejects it during the run
+        netbox_session = NetBox.API(netbox, netbox_token, token_provider=lambda: (
+            velocity_session.get_resource_property_value(Netbox_Velo_service_name, ['password']) or {}).get('password'))
         log_worker.info(f"Successfully opened the Netbox session.")
     except Exception as e:
         log_worker.error(f"Failed to open the Netbox session.")
@@ -80,4 +98,4 @@ def main():
 
 
 if __name__ == "__main__":
-    main()
+    EntryPoint.run(main, REPORTINGPARAMS["profile_path"])
@@ -13,7 +13,10 @@ import os
 import sys
 
 sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+import helpers.EntryPoint as EntryPoint
 import helpers.Logger as Local_logger
+import helpers.Metrics as Metrics
+import helpers.Tracing as Tracing
 import libs.libs_velocity.Velocity as Velocity
 from parameters.global_parameters import Velocity as VELOCITYPARAMS
 from parameters.global_parameters import Reporting as REPORTINGPARAMS
@@ -23,6 +26,11 @@ log_worker = Local_logger.create_logger(__name__, REPORTINGPARAMS["log_level_def
 
 
 def main():
+    # Spans are recorded and the diagnostics are written to the shared drive only when asked for
+    if EntryPoint.timings_enabled() or REPORTINGPARAMS["diagnostics_dump"]:
+        Metrics.registry.dump_at_exit(os.path.join(REPORTINGPARAMS["metrics_path"],
+                                                   "create_rack_structures_metrics.json"))
+        Tracing.tracer.dump_at_exit(os.path.join(REPORTINGPARAMS["trace_path"], "create_rack_structures_trace.json"))
     velocity = VELOCITYPARAMS['host']
     velo_user = VELOCITYPARAMS['user']
     velo_password = VELOCITYPARAMS['pass']
@@ -37,12 +45,16 @@ def main():
         log_worker.error(f"Finished: FAILED")
         return
 
+    log_worker.info(f"Syncing the local Velocity inventory snapshot.")
+    if not velocity_session.use_inventory_cache():
+        log_worker.warning(f"Inventory snapshot is not available, the resources will be requested from Velocity.")
+
     log_worker.info(f"Getting all resources from Velocity.")
     folder_filter_list = ["folderId:!:a6b78358-5e37-453e-9632-4bc6045ed116",
                           "folderId:!:7fa332cc-9f85-4369-b3a9-c3c9ecaadc13"]
     log_worker.info(f"The resources from the following folders will be ignored: {folder_filter_list}")
 
-    inventory_json = velocity_session.get_resources(folder_filter_list)
+    inventory_json = velocity_session.get_resources(folder_filter_list, properties=["Lab Row", "Rack Number"])
     if not inventory_json:
         log_worker.error(f"Failed to get the requested resources.")
         log_worker.error(f"Finished: FAILED")
@@ -52,6 +64,7 @@ def main():
 
     final_result = velocity_session.create_rack_structure(inventory_json, lab_row_template_name="Lab Row",
                                                           rack_template_name="Rack")
+    velocity_session.invalidate_inventory_cache()
     if not final_result:
         log_worker.error(f"Failed to create the rack structures in Velocity.")
         log_worker.error(f"Finished: FAILED")
@@ -62,4 +75,4 @@ def main():
 
 
 if __name__ == "__main__":
-    main()
+    EntryPoint.run(main, REPORTINGPARAMS["profile_path"])
@@ -17,6 +17,7 @@ from datetime import datetime
 
 # sys.path.append(os.path.join(os.path.dirname(__file__), '../../../..'))
 sys.path.append(os.path.join(os.path.dirname(__file__), '../'))
+import helpers.EntryPoint as EntryPoint
 import helpers.Logger as Local_logger
 import libs.libs_velocity.Velocity as Velocity
 from parameters.global_parameters import Reporting as REPORTINGPARAMS
@@ -207,7 +208,7 @@ def deploy_runlist_execution(cycle_id, keys_list, runlist_name, jira_project_ver
     tag_monitor_script = "airtel_monitor"
     filter_set = {"tags": [tag_monitor_script]}
     print('filter set: ', filter_set)
-    automation_assets = velocity_session.get_automation_assets(filters=filter_set)
+    automation_assets = velocity_session.find_automation_assets_by_tag(tag_monitor_script)
     print('automation_assets: ', automation_assets)
     if len(automation_assets["content"]) != 0:
         monitor_test_path = automation_assets["content"][0]["fullPath"]
@@ -215,8 +216,7 @@ def deploy_runlist_execution(cycle_id, keys_list, runlist_name, jira_project_ver
     # TODO - Identify full path for HTML GENERATOR script using Filter and velocity_session.get_automation_assets(filters ={"tags": ["REPORTER"]})
     # save full path for monitor script in a variable named html_test_path
     tag_reporter_script = "airtel_reporter"
-    filter_set = {"tags": [tag_reporter_script]}
-    automation_assets = velocity_session.get_automation_assets(filters=filter_set)
+    automation_assets = velocity_session.find_automation_assets_by_tag(tag_reporter_script)
     if len(automation_assets["content"]) != 0:
         reporter_test_path = automation_assets["content"][0]["fullPath"]
 
@@ -226,9 +226,9 @@ def deploy_runlist_execution(cycle_id, keys_list, runlist_name, jira_project_ver
         zephyr_create_cycle_flag = 0
         to_exclude = []
         execution_name = cycle_id
+        resolved_tags = velocity_session.resolve_automation_assets_by_tags(keys_list)
         for tag in keys_list:
-            filter_set = {"tags": [tag]}
-            automation_assets = velocity_session.get_automation_assets(filters=filter_set)
+            automation_assets = {"content": resolved_tags["assets"][tag]}
             if len(automation_assets["content"]) != 0:
 
                 log_worker.debug(f"Found {len(automation_assets['content'])} automation assets mathing tag {tag}")
@@ -266,7 +266,7 @@ def deploy_runlist_execution(cycle_id, keys_list, runlist_name, jira_project_ver
             full_path = runlist_info["main"]["items"][i]["path"]
             log_worker.info(f"Testcase full path: {full_path}")
             filter_set = {"fullPath": full_path}
-            automation_asset_info = velocity_session.get_automation_assets(filters=filter_set)
+            automation_asset_info = velocity_session.find_automation_asset_by_path(full_path)
 
             if len(automation_asset_info["content"]) == 1:
                 log_worker.debug(f"Following testcases were found while using filter: {filter_set}: "
@@ -532,4 +532,4 @@ def main():
 
 
 if __name__ == "__main__":
-    main()
+    EntryPoint.run(main, REPORTINGPARAMS["profile_path"])
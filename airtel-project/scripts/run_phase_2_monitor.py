@@ -6,6 +6,7 @@ import time
 
 # sys.path.append(os.path.join(os.path.dirname(__file__), '../../../..'))
 sys.path.append(os.path.join(os.path.dirname(__file__), '../'))
+import helpers.EntryPoint as EntryPoint
 import helpers.Logger as Local_logger
 import libs.libs_velocity.Velocity as Velocity
 from parameters.global_parameters import Reporting as REPORTINGPARAMS
@@ -142,4 +143,4 @@ def main():
 
 
 if __name__ == "__main__":
-    main()
+    EntryPoint.run(main, REPORTINGPARAMS["profile_path"])
@@ -11,11 +11,16 @@
 # ---------------------------------------------------------------------------
 import json
 import os
+import shutil
 import sys
+import tempfile
 import time
 
 sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+import helpers.EntryPoint as EntryPoint
 import helpers.Logger as Local_logger
+import helpers.Metrics as Metrics
+import helpers.Tracing as Tracing
 import libs.libs_velocity.Velocity as Velocity
 from parameters.global_parameters import Reporting as REPORTINGPARAMS
 from parameters.global_parameters import Jira as JIRAPARAMS
@@ -23,8 +28,10 @@ from parameters.global_parameters import Velocity as VELOCITYPARAMS
 
 
 from datetime import datetime
-from libs.libs_html_reporting.HTMLReportCore import HTMLGenerator
+from libs.libs_html_reporting.HTMLReportCore import HTMLGenerator, archive_paged_report
+from libs.libs_jira.DefectIndex import DefectIndex
 from libs.libs_jira.JiraCore import JiraCore
+from libs.libs_velocity.RunlistMonitor import RunlistMonitor, PollScheduler, RunlistCheckpoint
 from libs.libs_zephyr.ZephyrCore import ZephyrCore
 
 log_worker = Local_logger.create_logger(__name__, REPORTINGPARAMS["log_level_default"],
@@ -237,6 +244,29 @@ def __zephyr_update_test_executions(session: ZephyrCore, update_data):
     return {"update_pass": update_pass, "update_fail": update_fail}
 
 
+def __zephyr_bulk_update_test_executions(session: ZephyrCore, update_data):
+    update_pass = []
+    update_fail = []
+
+    status_groups = {}
+    for test_key, test_data in update_data.items():
+        if test_data["result"] is not None and test_data["execution_id"] is not None:
+            status_groups.setdefault(test_data["result"], []).append(test_key)
+
+    for result, test_keys in status_groups.items():
+        execution_ids = [update_data[test_key]["execution_id"] for test_key in test_keys]
+        z_execution_update_information = session.update_test_executions_status_bulk(execution_ids=execution_ids,
+                                                                                     execution_status=result)
+        if z_execution_update_information:
+            log_worker.info(f"Updated Zephyr Executions with IDs {execution_ids} and result {result}")
+            update_pass.extend(test_keys)
+        else:
+            log_worker.warning(f"Failed to Update Zephyr Executions with IDs {execution_ids} and result {result}")
+            update_fail.extend(test_keys)
+
+    return {"update_pass": update_pass, "update_fail": update_fail}
+
+
 def __build_update_data(automation_results_data, execution_key_id_data):
     update_data_structure = {}
     for test_key in set(list(automation_results_data.keys()) + list(execution_key_id_data.keys())):
@@ -274,14 +304,26 @@ def __build_pass_fail_summary(update_data):
             "total": pass_count + fail_count + indeterminate_count}
 
 
+@Tracing.tracer.traced("build_html_report")
 def __build_html_report(session: HTMLGenerator, output_file, test_cycle, build, runlist_link, time_date,
-                        pass_fail_summary, results_data, not_run_list):
-    html_generation_result = session.airtel_report_generator(output_file=output_file,
-                                                             test_cycle=test_cycle, build=build,
-                                                             runlist_link=runlist_link,
-                                                             time_date=time_date, pass_fail_summary=pass_fail_summary,
-                                                             results_data=results_data,
-                                                             not_run_list=not_run_list)
+                        pass_fail_summary, results_data, not_run_list, paged=False):
+    if paged:
+        html_generation_result = session.airtel_paged_report_generator(output_file=output_file,
+                                                                       test_cycle=test_cycle, build=build,
+                                                                       runlist_link=runlist_link,
+                                                                       time_date=time_date,
+                                                                       pass_fail_summary=pass_fail_summary,
+                                                                       results_data=results_data,
+                                                                       not_run_list=not_run_list,
+                                                                       page_size=REPORTINGPARAMS["report_page_size"])
+    else:
+        html_generation_result = session.airtel_report_generator(output_file=output_file,
+                                                                 test_cycle=test_cycle, build=build,
+                                                                 runlist_link=runlist_link,
+                                                                 time_date=time_date,
+                                                                 pass_fail_summary=pass_fail_summary,
+                                                                 results_data=results_data,
+                                                                 not_run_list=not_run_list, stream=True)
     if html_generation_result:
         log_worker.info(f"Generated HTML Automation report under {output_file}")
         return True
@@ -290,9 +332,10 @@ def __build_html_report(session: HTMLGenerator, output_file, test_cycle, build,
         return False
 
 
+@Tracing.tracer.traced("jira_add_comment")
 def __jira_add_comment(session: JiraCore, story_key, project_key, project_version_name, cycle_name, runlist_link,
                        pass_fail_summary, update_pass_list=[], update_fail_list=[], update_not_run_list=[],
-                       attachment_location=None):
+                       attachment_location=None, attachment_compression=REPORTINGPARAMS["artifact_compression"]):
     test_count_pass = pass_fail_summary["pass"]
     test_count_fail = pass_fail_summary["fail"]
     test_count_indeterminate = pass_fail_summary["indeterminate"]
@@ -300,15 +343,19 @@ def __jira_add_comment(session: JiraCore, story_key, project_key, project_versio
     test_count_not_run = pass_fail_summary["not_run"]
 
     comment = f"Test Execution results were added to Jira project: {project_key}, version: {project_version_name} in Zephyr Test Cycle: {cycle_name}\n"
+    if isinstance(runlist_link, list):
+        runlist_link = ", ".join(runlist_link)
     comment += f"RunList details available here: {runlist_link}\n"
     comment += f"PASS PERCENTAGE: {str(round(float(100 * test_count_pass / (test_count_total - test_count_not_run)), 2))}% ({test_count_pass} pass, {test_count_fail} fail, {test_count_indeterminate} indeterminate)\n"
 
     if attachment_location:
-        if not session.attach_file(item_key=story_key, file_path=attachment_location):
+        attachment_name = session.attach_file(item_key=story_key, file_path=attachment_location,
+                                              compression=attachment_compression)
+        if not attachment_name:
             log_worker.error(f"Failed to attach {attachment_location} file to Jira story {story_key}")
         else:
             log_worker.info(f"Attached {attachment_location} file to Jira story {story_key}")
-            comment += f"Automation Report: [^{os.path.split(attachment_location)[1]}]\n"
+            comment += f"Automation Report: [^{attachment_name}]\n"
 
     comment += "\n"
     comment += "Zephyr executions update status:\n"
@@ -319,6 +366,7 @@ def __jira_add_comment(session: JiraCore, story_key, project_key, project_versio
     return session.add_comment(item_key=story_key, content=comment)
 
 
+@Tracing.tracer.traced("zephyr_get_test_keys_from_cycle")
 def zephyr_get_test_keys_from_cycle(jira_project_key, jira_project_version_name, zephyr_test_cycle_name,
                                     velocity_session):
     ''' Initialize variables'''
@@ -370,16 +418,7 @@ def zephyr_get_test_keys_from_cycle(jira_project_key, jira_project_version_name,
     return return_data
 
 
-def zephyr_init_session_automation_results(automation_test_keys_list, jira_project_key, jira_project_version_name,
-                                           zephyr_create_cycle_flag, zephyr_test_cycle_name, zephyr_build, zephyr_host):
-    ''' Initialize variables '''
-
-    jira_project_id = 0
-    jira_project_version_id = 0
-    zephyr_cycle_id = 0
-    execution_key_id_data = {}
-
-    ''' Open Sessions '''
+def __open_jira_zephyr_sessions(zephyr_host):
     try:
         log_worker.info(
             f'Opening Jira session on {zephyr_host["ipAddress"]} with user {zephyr_host["username"]}')
@@ -395,6 +434,26 @@ def zephyr_init_session_automation_results(automation_test_keys_list, jira_proje
         log_worker.error("Failed to open Zephyr sessions")
         return {"ok": False}
 
+    return {"ok": True, "zephyr_session": zephyr, "jira_session": jira}
+
+
+@Tracing.tracer.traced("zephyr_init_session_automation_results")
+def zephyr_init_session_automation_results(automation_test_keys_list, jira_project_key, jira_project_version_name,
+                                           zephyr_create_cycle_flag, zephyr_test_cycle_name, zephyr_build, zephyr_host):
+    ''' Initialize variables '''
+
+    jira_project_id = 0
+    jira_project_version_id = 0
+    zephyr_cycle_id = 0
+    execution_key_id_data = {}
+
+    ''' Open Sessions '''
+    sessions = __open_jira_zephyr_sessions(zephyr_host=zephyr_host)
+    if not sessions["ok"]:
+        return {"ok": False}
+    jira = sessions["jira_session"]
+    zephyr = sessions["zephyr_session"]
+
     ''' Get Jira Project ID and Version - needed for Zephyr actions '''
     jira_project_id = __jira_get_project_id(session=jira, project_key=jira_project_key)
     jira_project_version_id = __jira_get_project_version_id(session=jira, project_key=jira_project_key,
@@ -430,14 +489,18 @@ def zephyr_init_session_automation_results(automation_test_keys_list, jira_proje
     return {"ok": True, "zephyr_session": zephyr, "jira_session": jira, "execution_key_id_data": execution_key_id_data}
 
 
-def zephyr_update_test_executions(zephyr, automation_results_data, execution_key_id_data):
+@Tracing.tracer.traced("zephyr_update_test_executions")
+def zephyr_update_test_executions(zephyr, automation_results_data, execution_key_id_data, bulk=False):
     ''' Build Update data by joining automation results to the execution keys, as known by Zephyr'''
     update_data = __build_update_data(automation_results_data=automation_results_data,
                                       execution_key_id_data=execution_key_id_data)
     pass_fail_summary = __build_pass_fail_summary(update_data=update_data)
 
     ''' Upload execution details for each test to Zephyr Test Cycle '''
-    update_result_information = __zephyr_update_test_executions(session=zephyr, update_data=update_data)
+    if bulk:
+        update_result_information = __zephyr_bulk_update_test_executions(session=zephyr, update_data=update_data)
+    else:
+        update_result_information = __zephyr_update_test_executions(session=zephyr, update_data=update_data)
     update_pass_list = update_result_information["update_pass"]
     update_fail_list = update_result_information["update_fail"]
     if not update_pass_list and not update_fail_list:
@@ -448,11 +511,17 @@ def zephyr_update_test_executions(zephyr, automation_results_data, execution_key
             "update_data": update_data, "pass_fail_summary": pass_fail_summary}
 
 
+@Tracing.tracer.traced("generate_html_report")
 def generate_html_report(zephyr_test_cycle_name, zephyr_build, pass_fail_summary, update_data, runlist_link,
                          jira, jira_project_key, jira_project_version_name, story_key_for_comment, update_pass_list,
                          update_fail_list, update_not_run_list):
+    ''' Large cycles get a summary page with the results loaded on demand from shard files '''
+    paged_report = len(update_data) > REPORTINGPARAMS["report_page_size"]
     try:
-        html_generator = HTMLGenerator("airtel_automation_report.html")
+        if paged_report:
+            html_generator = HTMLGenerator("airtel_automation_report_paged.html")
+        else:
+            html_generator = HTMLGenerator("airtel_automation_report.html")
     except Exception as e:
         log_worker.error(f"Failed to open HTML Generator sessions\n {e}")
         return {"ok": False}
@@ -465,19 +534,38 @@ def generate_html_report(zephyr_test_cycle_name, zephyr_build, pass_fail_summary
     if not __build_html_report(session=html_generator, output_file=html_report_file,
                                test_cycle=zephyr_test_cycle_name, build=zephyr_build, runlist_link=runlist_link,
                                time_date=current_time, pass_fail_summary=pass_fail_summary, results_data=update_data,
-                               not_run_list=update_not_run_list):
+                               not_run_list=update_not_run_list, paged=paged_report):
         log_worker.error(f"Failed to Generate HTML report in file {html_report_file}")
         html_report_file = None
 
     ''' Add comment in Jira '''
     if story_key_for_comment:
-        comment_result = __jira_add_comment(session=jira, story_key=story_key_for_comment, project_key=jira_project_key,
-                                            project_version_name=jira_project_version_name,
-                                            cycle_name=zephyr_test_cycle_name,
-                                            runlist_link=runlist_link, pass_fail_summary=pass_fail_summary,
-                                            update_pass_list=update_pass_list, update_fail_list=update_fail_list,
-                                            update_not_run_list=update_not_run_list,
-                                            attachment_location=html_report_file)
+        attachment_location = html_report_file
+        attachment_compression = REPORTINGPARAMS["artifact_compression"]
+        archive_directory = None
+        if html_report_file and paged_report:
+            ''' The summary page loads its results from the shard files, they are attached together in a zip '''
+            archive_directory = tempfile.mkdtemp(prefix="airtel_report_")
+            attachment_location = archive_paged_report(
+                html_report_file, os.path.join(archive_directory,
+                                               os.path.splitext(os.path.basename(html_report_file))[0] + ".zip"))
+            attachment_compression = None
+            if not attachment_location:
+                log_worker.error(f"Failed to archive HTML report {html_report_file}, it is not attached")
+                attachment_location = None
+        try:
+            comment_result = __jira_add_comment(session=jira, story_key=story_key_for_comment,
+                                                project_key=jira_project_key,
+                                                project_version_name=jira_project_version_name,
+                                                cycle_name=zephyr_test_cycle_name,
+                                                runlist_link=runlist_link, pass_fail_summary=pass_fail_summary,
+                                                update_pass_list=update_pass_list, update_fail_list=update_fail_list,
+                                                update_not_run_list=update_not_run_list,
+                                                attachment_location=attachment_location,
+                                                attachment_compression=attachment_compression)
+        finally:
+            if archive_directory:
+                shutil.rmtree(archive_directory, ignore_errors=True)
         if not comment_result:
             log_worker.error(f"Failed to add comment in Jira story {story_key_for_comment}")
             return {"ok": False}
@@ -485,6 +573,303 @@ def generate_html_report(zephyr_test_cycle_name, zephyr_build, pass_fail_summary
     return {"ok": True}
 
 
+def __collect_execution_result(velocity_session, velocity, test_name, testcase_execution_id, testcase_result):
+    result_data = {"test_name": test_name, "result": testcase_result,
+                   "execution_link": f"https://{velocity}/velocity/reports/executions/{testcase_execution_id}"}
+    log_worker.info(f"Execution of {test_name} is completed with execution ID {testcase_execution_id} and result "
+                    f"{testcase_result}")
+
+    execution_id_response = velocity_session.get_execution_id(testcase_execution_id)
+    failure_reason = execution_id_response["failureReason"]
+    if failure_reason is None:
+        failure_reason = velocity_session.get_execution_failure_reason(testcase_execution_id)
+    result_data["failure_reason"] = failure_reason
+
+    return result_data
+
+
+@Tracing.tracer.traced("jira_open_defects")
+def __jira_open_defects(session: JiraCore, project_key, story_key, results_data, defect_index: DefectIndex):
+    opened_defects = {}
+
+    '''Known failures are commented on the open defect instead of filing a new one'''
+    tags = []
+    duplicate_tags = {}
+    new_failures = {}
+    known_defects = {tag: defect_index.find(results_data[tag]["test_name"], results_data[tag]["failure_reason"])
+                     for tag in results_data.keys()}
+    # The index is built when the monitoring starts, the defects closed since then are filed again
+    closed_defects = defect_index.discard_closed(
+        [defect_key for defect_key in known_defects.values() if defect_key is not None])
+    for tag in results_data.keys():
+        known_defect = known_defects[tag]
+        if known_defect is None or known_defect in closed_defects:
+            failure = (results_data[tag]["test_name"], defect_index.fingerprint(results_data[tag]["failure_reason"]))
+            if failure in new_failures:
+                duplicate_tags[tag] = new_failures[failure]
+            else:
+                new_failures[failure] = tag
+                tags.append(tag)
+            continue
+        log_worker.info(f"Execution of {results_data[tag]['test_name']} failed with a known failure, updating Jira "
+                        f"issue {known_defect}.")
+        comment = session.add_comment(known_defect, "Failure reproduced, link to the Velocity execution report: " +
+                                      results_data[tag]["execution_link"])
+        if comment is not False:
+            opened_defects[tag] = known_defect
+
+    if tags:
+        log_worker.info(f"Executions of {tags} failed, opening Jira issues.")
+        issues_fields = [session.defect_fields(project_key, summary=f"{results_data[tag]['test_name']} has failed.",
+                                               description="Link to the Velocity execution report: " +
+                                                           results_data[tag]["execution_link"],
+                                               labels_list=defect_index.labels(results_data[tag]["failure_reason"]))
+                         for tag in tags]
+        issue_keys = session.create_issues_bulk(issues_fields)
+        if issue_keys is False:
+            log_worker.error(f"Failed to open Jira issues.")
+            issue_keys = []
+
+        for tag, issue_key in zip(tags, issue_keys):
+            if issue_key:
+                log_worker.info(f"Jira issue {issue_key} has been opened.")
+                defect_index.add(results_data[tag]["test_name"], results_data[tag]["failure_reason"], issue_key)
+                opened_defects[tag] = issue_key
+        for tag, original_tag in duplicate_tags.items():
+            if original_tag in opened_defects:
+                opened_defects[tag] = opened_defects[original_tag]
+
+    links = [(issue_key, story_key) for issue_key in set(opened_defects.values())]
+    for link, link_result in zip(links, session.link_items(links, "relates")):
+        if link_result:
+            log_worker.info(f"Jira issue {link[0]} has been linked to {story_key}.")
+        else:
+            log_worker.error(f"Failed to link Jira issue {link[0]} to {story_key}.")
+
+    return opened_defects
+
+
+@Tracing.tracer.traced("resolve_runlist_testcases")
+def __resolve_runlist_testcases(velocity_session, runlist_name):
+    runlist_data = {"topology_id": "", "testcases_list": [], "keys_list": [], "automation_results_data": {},
+                    "path_to_tag": {}}
+
+    runlist_info = velocity_session.get_runlist(runlist_name=runlist_name)
+    log_worker.debug(f"Runlist info: {runlist_info}")
+
+    runlist_data["topology_id"] = runlist_info["general"]["topologyId"]
+    for i in range(0, len(runlist_info["main"]["items"])):
+        full_path = runlist_info["main"]["items"][i]["path"]
+        log_worker.info(f"Testcase full path: {full_path}")
+        filter_set = {"fullPath": full_path}
+        automation_asset_info = velocity_session.find_automation_asset_by_path(full_path)
+
+        if len(automation_asset_info["content"]) == 1:
+            log_worker.debug(f"Following testcases were found while using filter: {filter_set}: "
+                             f"{automation_asset_info}")
+            tag = automation_asset_info["content"][0]["tags"][0]
+            runlist_data["automation_results_data"][tag] = {}
+            runlist_data["automation_results_data"][tag]["test_name"] = automation_asset_info["content"][0]["name"]
+            runlist_data["testcases_list"].append(full_path)
+            runlist_data["path_to_tag"][full_path] = tag
+            log_worker.debug(f"Current list of testcases: {runlist_data['testcases_list']}")
+            runlist_data["keys_list"].append(tag)
+            log_worker.debug(f"Current list of keys: {runlist_data['keys_list']}")
+
+        else:
+            log_worker.error(f"No testcases were found while using filter: {filter_set}. Request response: "
+                             f"{automation_asset_info}")
+
+    return runlist_data
+
+
+@Tracing.tracer.traced("monitor_runlist_executions")
+def __monitor_runlist_executions(velocity_session, monitor: RunlistMonitor, automation_results_data, jira,
+                                 jira_project_key, story_key_for_comment, zephyr, execution_key_id_data,
+                                 bulk_update=False, checkpoint: RunlistCheckpoint = None, progress=None, rechecks=None):
+    velocity = VELOCITYPARAMS['host']
+    if progress is None:
+        progress = {"update_data": {}, "update_pass_list": [], "update_fail_list": [], "opened_defects": {}}
+    temp_update_pass_list = progress["update_pass_list"]
+    temp_update_fail_list = progress["update_fail_list"]
+    temp_update_data = progress["update_data"]
+    opened_defects = progress["opened_defects"]
+
+    defect_index = DefectIndex(jira_session=jira, project_key=jira_project_key)
+    defect_index.build()
+
+    scheduler = PollScheduler()
+    for tag, attempt, testcase_execution_id in rechecks or []:
+        scheduler.schedule_recheck(key=tag, payload=testcase_execution_id, attempt=attempt)
+    while not monitor.is_finished() or scheduler.has_pending_rechecks():
+        temp_results = {}
+        completed_results = []
+        state_changed = False
+
+        if not monitor.is_finished() and scheduler.poll_due() and scheduler.acquire_call():
+            log_worker.info(f"Entering runlist monitoring cycle for: {monitor.runlist_guids()}")
+            finished_executions = monitor.poll()
+            if finished_executions is False:
+                finished_executions = []
+            state_changed = len(finished_executions) > 0
+            log_worker.debug(f"Executions not processed: {monitor.not_processed()}")
+            scheduler.record_durations([execution["duration"] for execution in finished_executions])
+            scheduler.schedule_next_poll(in_flight_count=monitor.in_flight_count(),
+                                         finished_count=len(finished_executions))
+
+            for finished_execution in finished_executions:
+                tag = finished_execution["tag"]
+                if tag is None:
+                    log_worker.warning(f"No tag is mapped to testcase {finished_execution['path']}, result is ignored.")
+                    continue
+                testcase_execution_id = finished_execution["execution"]["executionID"]
+                testcase_result = finished_execution["execution"]["result"]
+
+                '''INDETERMINATE results are re-checked later, without blocking the detection of other executions'''
+                if testcase_result == "INDETERMINATE":
+                    log_worker.warning(f"Testcase {testcase_execution_id} has executionState COMPLETED but "
+                                       f"results INDETERMINATE. Scheduling a re-check.")
+                    scheduler.schedule_recheck(key=tag, payload=testcase_execution_id)
+                    continue
+                completed_results.append((tag, testcase_execution_id, testcase_result))
+
+        for tag, attempt, testcase_execution_id in scheduler.due_rechecks():
+            state_changed = True
+            if not scheduler.acquire_call():
+                scheduler.schedule_recheck(key=tag, payload=testcase_execution_id, attempt=attempt)
+                continue
+            log_worker.warning(f"Testcase {testcase_execution_id} has executionState COMPLETED but "
+                               f"results INDETERMINATE. Retry: {attempt}.")
+            testcase_execution_status = velocity_session.get_execution_id(execution_id=testcase_execution_id)
+            testcase_result = "INDETERMINATE"
+            if testcase_execution_status:
+                if type(testcase_execution_status) is not dict:
+                    testcase_execution_status = json.loads(testcase_execution_status)
+                testcase_result = testcase_execution_status["result"]
+            if testcase_result == "INDETERMINATE" and \
+                    scheduler.schedule_recheck(key=tag, payload=testcase_execution_id, attempt=attempt + 1):
+                continue
+            completed_results.append((tag, testcase_execution_id, testcase_result))
+
+        failed_results = {}
+        for tag, testcase_execution_id, testcase_result in completed_results:
+            # Only the Velocity calls are counted, Jira and Zephyr do not share the polling budget
+            scheduler.record_call(2)
+            temp_results[tag] = __collect_execution_result(velocity_session=velocity_session, velocity=velocity,
+                                                           test_name=automation_results_data[tag]["test_name"],
+                                                           testcase_execution_id=testcase_execution_id,
+                                                           testcase_result=testcase_result)
+            if temp_results[tag]["failure_reason"]:
+                if tag in opened_defects:
+                    log_worker.info(f"Jira issue {opened_defects[tag]} was already opened for {tag}, skipping.")
+                    continue
+                failed_results[tag] = temp_results[tag]
+
+        if failed_results != {}:
+            opened_defects.update(__jira_open_defects(session=jira, project_key=jira_project_key,
+                                                      story_key=story_key_for_comment, results_data=failed_results,
+                                                      defect_index=defect_index))
+
+        if temp_results != {}:
+            log_worker.debug(f"Current temp results: {temp_results}")
+
+            upload_partial_results = zephyr_update_test_executions(zephyr=zephyr,
+                                                                   automation_results_data=temp_results,
+                                                                   execution_key_id_data=execution_key_id_data,
+                                                                   bulk=bulk_update)
+            log_worker.debug(f"Partial results from latest scan: {upload_partial_results}")
+            if upload_partial_results["ok"]:
+                temp_update_pass_list.extend(upload_partial_results["update_pass_list"])
+                log_worker.debug(f"Complete results until now -- temp_update_pass_list -- {temp_update_pass_list}")
+                temp_update_fail_list.extend(upload_partial_results["update_fail_list"])
+                log_worker.debug(f"Complete results until now -- temp_update_fail_list -- {temp_update_fail_list}")
+                if temp_update_data == {}:
+                    temp_update_data.update(upload_partial_results)
+                else:
+                    for tag in upload_partial_results["update_data"].keys():
+                        if upload_partial_results["update_data"][tag]["test_name"] is not None:
+                            temp_update_data["update_pass_list"].extend(upload_partial_results["update_pass_list"])
+                            temp_update_data["update_fail_list"].extend(upload_partial_results["update_fail_list"])
+                            temp_update_data["update_data"][tag]["test_name"] = \
+                                upload_partial_results["update_data"][tag]["test_name"]
+                            temp_update_data["update_data"][tag]["result"] = upload_partial_results["update_data"][tag][
+                                "result"]
+                            temp_update_data["update_data"][tag]["execution_link"] = \
+                                upload_partial_results["update_data"][tag][
+                                    "execution_link"]
+                            temp_update_data["update_data"][tag]["failure_reason"] = \
+                                upload_partial_results["update_data"][tag][
+                                    "failure_reason"]
+                            temp_update_data["update_data"][tag]["execution_id"] = \
+                                upload_partial_results["update_data"][tag][
+                                    "execution_id"]
+                log_worker.debug(f"Complete results until now -- temp_update_data -- {temp_update_data}")
+
+            else:
+                return {"ok": False}
+
+        # The checkpoint is written only once the polled results are uploaded and added to the progress, a resume
+        # after a crash or a failed upload polls them again
+        if state_changed and checkpoint:
+            checkpoint.save(monitor=monitor, scheduler=scheduler, progress=progress)
+
+        interval = scheduler.seconds_until_next_event(include_poll=not monitor.is_finished())
+        if interval > 0:
+            log_worker.info(f"Runlist monitoring cycle info: waiting for {round(interval, 2)} seconds.")
+            time.sleep(interval)
+
+    return {"ok": True, "update_data": temp_update_data, "update_pass_list": temp_update_pass_list,
+            "update_fail_list": temp_update_fail_list}
+
+
+def __build_checkpoint_context(jira_project_key, jira_project_version_name, zephyr_test_cycle_name, zephyr_build,
+                               story_key_for_comment, automation_results_data, execution_key_id_data, runlist_link,
+                               bulk_update):
+    return {"jira_project_key": jira_project_key, "jira_project_version_name": jira_project_version_name,
+            "zephyr_test_cycle_name": zephyr_test_cycle_name, "zephyr_build": zephyr_build,
+            "story_key_for_comment": story_key_for_comment, "automation_results_data": automation_results_data,
+            "execution_key_id_data": execution_key_id_data, "runlist_link": runlist_link, "bulk_update": bulk_update}
+
+
+def __build_final_execution_results(monitor_result, runlist_link, jira):
+    temp_update_data = monitor_result["update_data"]
+    temp_update_pass_list = monitor_result["update_pass_list"]
+    temp_update_fail_list = monitor_result["update_fail_list"]
+
+    temp_update_data["pass_fail_summary"]["pass"] = len(
+        [i for i in temp_update_data["update_data"].keys() if temp_update_data["update_data"][i]["result"] == "PASS"])
+    temp_update_data["pass_fail_summary"]["fail"] = len(
+        [i for i in temp_update_data["update_data"].keys() if temp_update_data["update_data"][i]["result"] == "FAIL"])
+    temp_update_data["pass_fail_summary"]["total"] = len(temp_update_data["update_data"].keys())
+    # temp_update_data["pass_fail_summary"]["indeterminate"] = temp_update_data["pass_fail_summary"]["total"] - (
+    #         temp_update_data["pass_fail_summary"]["pass"] + temp_update_data["pass_fail_summary"]["fail"])
+    temp_update_data["pass_fail_summary"]["indeterminate"] = len(
+        [i for i in temp_update_data["update_data"].keys() if temp_update_data["update_data"][i]["result"] == "INDETERMINATE"])
+
+    did_not_run = [tag for tag in temp_update_data["update_data"].keys() if
+                   temp_update_data["update_data"][tag]["result"] is None]
+
+    for tag in did_not_run:
+        temp_update_data["update_data"].pop(tag)
+
+    pass_fail_summary = {"pass": temp_update_data["pass_fail_summary"]["pass"],
+                         "fail": temp_update_data["pass_fail_summary"]["fail"],
+                         "indeterminate": temp_update_data["pass_fail_summary"]["indeterminate"],
+                         "not_run": len(did_not_run),
+                         "total": temp_update_data["pass_fail_summary"]["total"]}
+
+    log_worker.debug(f"Final update_data -- {temp_update_data}")
+    log_worker.debug(f"Final pass_fail_summary -- {pass_fail_summary}")
+    log_worker.debug(f"Final update_pass_list -- {temp_update_pass_list}")
+    log_worker.debug(f"Final update_fail_list -- {temp_update_fail_list}")
+    log_worker.debug(f"SUCCESS")
+    # jira = "test"
+    return {"ok": True, "pass_fail_summary": pass_fail_summary, "update_pass_list": temp_update_pass_list,
+            "update_fail_list": temp_update_fail_list, "update_data": temp_update_data["update_data"],
+            "runlist_link": runlist_link, "jira_session": jira, "not_run": did_not_run}
+
+
+@Tracing.tracer.traced("deploy_runlist_execution")
 def deploy_runlist_execution(cycle_id, keys_list, runlist_name, jira_project_version_name, jira_project_key,
                              zephyr_test_cycle_name, zephyr_build, velocity_session, topology_id, story_key_for_comment):
     velocity = VELOCITYPARAMS['host']
@@ -494,6 +879,7 @@ def deploy_runlist_execution(cycle_id, keys_list, runlist_name, jira_project_ver
 
     automation_results_data = {}
     testcases_list = []
+    path_to_tag = {}
 
     if runlist_name == "N/A":
 
@@ -501,10 +887,10 @@ def deploy_runlist_execution(cycle_id, keys_list, runlist_name, jira_project_ver
         zephyr_create_cycle_flag = 0
         to_exclude = []
         execution_name = cycle_id
+        resolved_tags = velocity_session.resolve_automation_assets_by_tags(keys_list)
         for tag in keys_list:
 
-            filter_set = {"tags": [tag]}
-            automation_assets = velocity_session.get_automation_assets(filters=filter_set)
+            automation_assets = {"content": resolved_tags["assets"][tag]}
             if len(automation_assets["content"]) != 0:
 
                 log_worker.debug(f"Found {len(automation_assets['content'])} automation assets mathing tag {tag}")
@@ -513,6 +899,7 @@ def deploy_runlist_execution(cycle_id, keys_list, runlist_name, jira_project_ver
                 automation_results_data[tag]["test_name"] = automation_assets["content"][0]["name"]
                 log_worker.info(f"Testcase {automation_assets['content'][0]['name']} was found for tag: {tag}")
                 testcases_list.append(automation_assets["content"][0]["fullPath"])
+                path_to_tag[automation_assets["content"][0]["fullPath"]] = tag
 
             else:
                 log_worker.warning(f"No testcases were found for tag: {tag}")
@@ -530,33 +917,14 @@ def deploy_runlist_execution(cycle_id, keys_list, runlist_name, jira_project_ver
         log_worker.info(f"Getting the list of runlist test cases for {runlist_name}")
         zephyr_create_cycle_flag = 1
         zephyr_test_cycle_name = runlist_name + "_" + datetime.now().strftime("%d-%m-%Y_%Hh%Mm%Ss")
-        keys_list = []
         execution_name = runlist_name
 
-        runlist_info = velocity_session.get_runlist(runlist_name=runlist_name)
-        log_worker.debug(f"Runlist info: {runlist_info}")
-
-        topology_id = runlist_info["general"]["topologyId"]
-        for i in range(0, len(runlist_info["main"]["items"])):
-            full_path = runlist_info["main"]["items"][i]["path"]
-            log_worker.info(f"Testcase full path: {full_path}")
-            filter_set = {"fullPath": full_path}
-            automation_asset_info = velocity_session.get_automation_assets(filters=filter_set)
-
-            if len(automation_asset_info["content"]) == 1:
-                log_worker.debug(f"Following testcases were found while using filter: {filter_set}: "
-                                 f"{automation_asset_info}")
-                tag = automation_asset_info["content"][0]["tags"][0]
-                automation_results_data[tag] = {}
-                automation_results_data[tag]["test_name"] = automation_asset_info["content"][0]["name"]
-                testcases_list.append(full_path)
-                log_worker.debug(f"Current list of testcases: {testcases_list}")
-                keys_list.append(tag)
-                log_worker.debug(f"Current list of keys: {keys_list}")
-
-            else:
-                log_worker.error(f"No testcases were found while using filter: {filter_set}. Request response: "
-                                 f"{automation_asset_info}")
+        runlist_data = __resolve_runlist_testcases(velocity_session=velocity_session, runlist_name=runlist_name)
+        topology_id = runlist_data["topology_id"]
+        keys_list = runlist_data["keys_list"]
+        testcases_list = runlist_data["testcases_list"]
+        automation_results_data = runlist_data["automation_results_data"]
+        path_to_tag = runlist_data["path_to_tag"]
 
     '''Start Jira - Zephyr execution update sessions and get existing execution key ID data'''
 
@@ -592,173 +960,202 @@ def deploy_runlist_execution(cycle_id, keys_list, runlist_name, jira_project_ver
         sys.exit(0)
 
     '''Monitor runlist execution'''
+    runlist_link = f"https://{velocity}/velocity/reports/runlists/{runlist_execution_id}"
+    monitor = RunlistMonitor(velocity_session=velocity_session, runlist_guid=runlist_execution_id,
+                             testcase_paths=testcases_list, path_to_tag=path_to_tag)
+    checkpoint = RunlistCheckpoint(runlist_guid=runlist_execution_id)
+    checkpoint.context = __build_checkpoint_context(jira_project_key=jira_project_key,
+                                                    jira_project_version_name=jira_project_version_name,
+                                                    zephyr_test_cycle_name=zephyr_test_cycle_name,
+                                                    zephyr_build=zephyr_build,
+                                                    story_key_for_comment=story_key_for_comment,
+                                                    automation_results_data=automation_results_data,
+                                                    execution_key_id_data=execution_key_id_data,
+                                                    runlist_link=runlist_link, bulk_update=False)
+    monitor_result = __monitor_runlist_executions(velocity_session=velocity_session, monitor=monitor,
+                                                  automation_results_data=automation_results_data, jira=jira,
+                                                  jira_project_key=jira_project_key,
+                                                  story_key_for_comment=story_key_for_comment, zephyr=zephyr,
+                                                  execution_key_id_data=execution_key_id_data, checkpoint=checkpoint)
+    if not monitor_result["ok"]:
+        return {"ok": False}
 
-    execution_status = {}
-    temp_update_pass_list = []
-    temp_update_fail_list = []
-    temp_update_data = {}
+    log_worker.info(f"Runlist execution is finished.")
 
-    not_processed = testcases_list
-    while not_processed:
-        log_worker.info(f"Entering runlist monitoring cycle for: {runlist_execution_id}")
-        processed = []
-        temp_results = {}
-        execution_status = velocity_session.get_runlist_execution(runlist_execution_id)[0]
-        log_worker.debug(f"Current execution status: {execution_status}")
-        log_worker.debug(f"Executions not processed: {not_processed}")
-
-        if len(execution_status["executions"]) > 0:
-            for testcase in not_processed:
-                test_index = -1
-                try:
-                    test_index = [i for i in range(0, len(execution_status["executions"])) if
-                                  testcase == execution_status["executions"][i]["testPath"]][0]
-                except Exception as e:
-                    if e == "list index out of range":
-                        pass
-                if test_index != '':
-                    if execution_status["executions"][test_index]["executionState"] in ["COMPLETED", "START_FAILED",
-                                                                                        "ABORTED",
-                                                                                        "AGENT_NOT_RESPONDING"]:
-
-                        for tag in automation_results_data.keys():
-                            if automation_results_data[tag]["test_name"] in testcase:
-                                break
-                        temp_results[tag] = {}
-                        temp_results[tag]["test_name"] = automation_results_data[tag]["test_name"]
-                        temp_testcase_result = execution_status["executions"][test_index]["result"]
-                        testcase_execution_id = execution_status['executions'][test_index]['executionID']
-
-                        '''Added logic to retry 3 times in case execution state returns INDETERMINATE value'''
-
-                        retries = 1
-                        while temp_testcase_result == "INDETERMINATE" and retries < 11:
-                            log_worker.warning(f"Testcase {testcase_execution_id} has executionState COMPLETED but "
-                                               f"results INDETERMINATE. Retry: {retries}.")
-                            time.sleep(10)
-                            testcase_execution_status = velocity_session.get_execution_id(execution_id=testcase_execution_id)
-                            if type(testcase_execution_status) is not dict:
-                                testcase_execution_status = json.loads(testcase_execution_status)
-                            temp_testcase_result = testcase_execution_status["result"]
-                            retries += 1
-                        temp_results[tag]["result"] = temp_testcase_result
-                        log_worker.info(f"Execution of {automation_results_data[tag]['test_name']} is completed."
-                                        f"with execution ID {testcase_execution_id} and result "
-                                        f"{temp_results[tag]['result']}")
-
-                        temp_results[tag][
-                            "execution_link"] = f"https://{velocity}/velocity/reports/executions/{testcase_execution_id}"
-                        execution_id_response = velocity_session.get_execution_id(testcase_execution_id)
-                        failure_reason = execution_id_response["failureReason"]
-                        if failure_reason is None:
-                            failure_reason = velocity_session.get_execution_failure_reason(testcase_execution_id)
-                            temp_results[tag]["failure_reason"] = failure_reason
-                        else:
-                            temp_results[tag]["failure_reason"] = failure_reason
-                        processed.append(testcase)
-                        if failure_reason:
-                            log_worker.info(f"Execution of {automation_results_data[tag]['test_name']} failed, opening "
-                                            f"Jira issue.")
-                            failure_reason = failure_reason.replace('"', '')
-                            open_defect = jira.open_defect(jira_project_key, summary=f"{temp_results[tag]['test_name']}"
-                                                                                     f" has failed.",
-                                                           description="Link to the Velocity execution report: " + temp_results[tag]["execution_link"])
-                            if open_defect is not False:
-                                log_worker.info(f"Jira issue {open_defect} has been opened.")
-                                link_result = jira.link_item(open_defect, story_key_for_comment, "relates")
-                                if link_result is not False:
-                                    log_worker.info(
-                                        f"Jira issue {open_defect} has been linked to {story_key_for_comment}.")
-                                else:
-                                    log_worker.error(
-                                        f"Failed to link Jira issue {open_defect} to {story_key_for_comment}.")
-                            else:
-                                log_worker.error(f"Failed to open Jira issue.")
-
-                        not_processed.remove(testcase)
+    final_execution_results = __build_final_execution_results(monitor_result=monitor_result,
+                                                              runlist_link=runlist_link, jira=jira)
+    final_execution_results["checkpoint"] = checkpoint
+    return final_execution_results
 
-        if temp_results != {}:
-            log_worker.debug(f"Current temp results: {temp_results}")
 
-            upload_partial_results = zephyr_update_test_executions(zephyr=zephyr,
-                                                                   automation_results_data=temp_results,
-                                                                   execution_key_id_data=execution_key_id_data)
-            log_worker.debug(f"Partial results from latest scan: {upload_partial_results}")
-            if upload_partial_results["ok"]:
-                temp_update_pass_list.extend(upload_partial_results["update_pass_list"])
-                log_worker.debug(f"Complete results until now -- temp_update_pass_list -- {temp_update_pass_list}")
-                temp_update_fail_list.extend(upload_partial_results["update_fail_list"])
-                log_worker.debug(f"Complete results until now -- temp_update_fail_list -- {temp_update_fail_list}")
-                if temp_update_data == {}:
-                    temp_update_data = upload_partial_results
-                else:
-                    for tag in upload_partial_results["update_data"].keys():
-                        if upload_partial_results["update_data"][tag]["test_name"] is not None:
-                            temp_update_data["update_pass_list"].extend(upload_partial_results["update_pass_list"])
-                            temp_update_data["update_fail_list"].extend(upload_partial_results["update_fail_list"])
-                            temp_update_data["update_data"][tag]["test_name"] = \
-                                upload_partial_results["update_data"][tag]["test_name"]
-                            temp_update_data["update_data"][tag]["result"] = upload_partial_results["update_data"][tag][
-                                "result"]
-                            temp_update_data["update_data"][tag]["execution_link"] = \
-                                upload_partial_results["update_data"][tag][
-                                    "execution_link"]
-                            temp_update_data["update_data"][tag]["failure_reason"] = \
-                                upload_partial_results["update_data"][tag][
-                                    "failure_reason"]
-                            temp_update_data["update_data"][tag]["execution_id"] = \
-                                upload_partial_results["update_data"][tag][
-                                    "execution_id"]
-                log_worker.debug(f"Complete results until now -- temp_update_data -- {temp_update_data}")
+@Tracing.tracer.traced("deploy_multi_runlist_execution")
+def deploy_multi_runlist_execution(runlist_topology_pairs, jira_project_version_name, jira_project_key, zephyr_build,
+                                   velocity_session, story_key_for_comment):
+    velocity = VELOCITYPARAMS['host']
+    jira_service_name = JIRAPARAMS['service_name_velo']
+    properties_list = ['ipAddress', 'username', 'password']
+    jira_host = velocity_session.get_resource_property_value(jira_service_name, properties_list)
 
+    automation_results_data = {}
+    path_to_tag = {}
+    keys_list = []
+    runlist_shards = []
 
-            else:
+    '''Get the test cases and the topology of every runlist'''
+    for runlist_name, topology_name in runlist_topology_pairs:
+        log_worker.info(f"Getting the list of runlist test cases for {runlist_name}")
+        runlist_data = __resolve_runlist_testcases(velocity_session=velocity_session, runlist_name=runlist_name)
+        if topology_name != "N/A":
+            runlist_data["topology_id"] = velocity_session.get_topology_id_by_name(topology_name)
+            if not runlist_data["topology_id"]:
+                log_worker.error(f"Failed to identify topology {topology_name} for runlist {runlist_name}")
                 return {"ok": False}
 
-        else:
-            interval = 20
-            log_worker.info(f"Runlist monitoring cycle info: no executions are finished yet, waiting for {interval} seconds.")
-            time.sleep(interval)
+        automation_results_data.update(runlist_data["automation_results_data"])
+        path_to_tag.update(runlist_data["path_to_tag"])
+        keys_list.extend([tag for tag in runlist_data["keys_list"] if tag not in keys_list])
+        runlist_shards.append({"runlist_name": runlist_name, "topology_id": runlist_data["topology_id"],
+                               "testcases_list": runlist_data["testcases_list"]})
 
-    runlist_link = f"https://{velocity}/velocity/reports/runlists/{execution_status['guid']}"
-    log_worker.info(f"Runlist execution is finished.")
+    '''Start Jira - Zephyr execution update sessions using one Test Cycle for all runlists'''
+    zephyr_test_cycle_name = "_".join([runlist_name for runlist_name, topology_name in runlist_topology_pairs]) + \
+                             "_" + datetime.now().strftime("%d-%m-%Y_%Hh%Mm%Ss")
+    init_session_result = zephyr_init_session_automation_results(automation_test_keys_list=keys_list,
+                                                                 jira_project_key=jira_project_key,
+                                                                 jira_project_version_name=jira_project_version_name,
+                                                                 zephyr_create_cycle_flag=1,
+                                                                 zephyr_test_cycle_name=zephyr_test_cycle_name,
+                                                                 zephyr_build=zephyr_build,
+                                                                 zephyr_host=jira_host)
 
-    temp_update_data["pass_fail_summary"]["pass"] = len(
-        [i for i in temp_update_data["update_data"].keys() if temp_update_data["update_data"][i]["result"] == "PASS"])
-    temp_update_data["pass_fail_summary"]["fail"] = len(
-        [i for i in temp_update_data["update_data"].keys() if temp_update_data["update_data"][i]["result"] == "FAIL"])
-    temp_update_data["pass_fail_summary"]["total"] = len(temp_update_data["update_data"].keys())
-    # temp_update_data["pass_fail_summary"]["indeterminate"] = temp_update_data["pass_fail_summary"]["total"] - (
-    #         temp_update_data["pass_fail_summary"]["pass"] + temp_update_data["pass_fail_summary"]["fail"])
-    temp_update_data["pass_fail_summary"]["indeterminate"] = len(
-        [i for i in temp_update_data["update_data"].keys() if temp_update_data["update_data"][i]["result"] == "INDETERMINATE"])
+    if init_session_result["ok"]:
+        zephyr = init_session_result["zephyr_session"]
+        jira = init_session_result["jira_session"]
+        execution_key_id_data = init_session_result["execution_key_id_data"]
+    else:
+        return {"ok": False}
 
-    did_not_run = [tag for tag in temp_update_data["update_data"].keys() if
-                   temp_update_data["update_data"][tag]["result"] is None]
+    '''Post all runlist executions and monitor them using a single polling engine'''
+    monitor = RunlistMonitor(velocity_session=velocity_session)
+    checkpoint = None
+    runlist_links = []
+    post_failed = False
+    for runlist_shard in runlist_shards:
+        log_worker.info(f"Creating runlist execution {runlist_shard['runlist_name']} using testcase list: "
+                        f"{runlist_shard['testcases_list']}")
+        runlist_execution_id = velocity_session.post_runlist_execution(testcase_paths=runlist_shard["testcases_list"],
+                                                                       detail_level="ALL_ISSUES_ALL_STEPS",
+                                                                       terminate_on_item_fail=False,
+                                                                       execution_name=runlist_shard["runlist_name"],
+                                                                       topology_id=runlist_shard["topology_id"])
+        if not runlist_execution_id:
+            log_worker.error(f"Failed to create runlist execution {runlist_shard['runlist_name']}.")
+            post_failed = True
+            break
+
+        log_worker.info(f"Runlist execution ID for {runlist_shard['runlist_name']} is: {runlist_execution_id}")
+        monitor.add_runlist(runlist_guid=runlist_execution_id, testcase_paths=runlist_shard["testcases_list"],
+                            path_to_tag=path_to_tag)
+        runlist_links.append(f"https://{velocity}/velocity/reports/runlists/{runlist_execution_id}")
+        if checkpoint is None:
+            checkpoint = RunlistCheckpoint(runlist_guid=runlist_execution_id)
+    if checkpoint is None:
+        return {"ok": False}
 
-    for tag in did_not_run:
-        temp_update_data["update_data"].pop(tag)
+    checkpoint.context = __build_checkpoint_context(jira_project_key=jira_project_key,
+                                                    jira_project_version_name=jira_project_version_name,
+                                                    zephyr_test_cycle_name=zephyr_test_cycle_name,
+                                                    zephyr_build=zephyr_build,
+                                                    story_key_for_comment=story_key_for_comment,
+                                                    automation_results_data=automation_results_data,
+                                                    execution_key_id_data=execution_key_id_data,
+                                                    runlist_link=runlist_links, bulk_update=True)
+    if post_failed:
+        # The runlists already posted keep running, they are checkpointed so that --resume can monitor them
+        if checkpoint.save(monitor=monitor, scheduler=PollScheduler(), progress=None):
+            log_worker.error(f"Runlist executions {monitor.runlist_guids()} were already started, run the script "
+                             f"with --resume {checkpoint.runlist_guid} to monitor them.")
+        return {"ok": False}
 
-    pass_fail_summary = {"pass": temp_update_data["pass_fail_summary"]["pass"],
-                         "fail": temp_update_data["pass_fail_summary"]["fail"],
-                         "indeterminate": temp_update_data["pass_fail_summary"]["indeterminate"],
-                         "not_run": len(did_not_run),
-                         "total": temp_update_data["pass_fail_summary"]["total"]}
+    monitor_result = __monitor_runlist_executions(velocity_session=velocity_session, monitor=monitor,
+                                                  automation_results_data=automation_results_data, jira=jira,
+                                                  jira_project_key=jira_project_key,
+                                                  story_key_for_comment=story_key_for_comment, zephyr=zephyr,
+                                                  execution_key_id_data=execution_key_id_data, bulk_update=True,
+                                                  checkpoint=checkpoint)
+    if not monitor_result["ok"]:
+        return {"ok": False}
 
-    log_worker.debug(f"Final update_data -- {temp_update_data}")
-    log_worker.debug(f"Final pass_fail_summary -- {pass_fail_summary}")
-    log_worker.debug(f"Final update_pass_list -- {temp_update_pass_list}")
-    log_worker.debug(f"Final update_fail_list -- {temp_update_fail_list}")
-    log_worker.debug(f"SUCCESS")
-    # jira = "test"
-    return {"ok": True, "pass_fail_summary": pass_fail_summary, "update_pass_list": temp_update_pass_list,
-            "update_fail_list": temp_update_fail_list, "update_data": temp_update_data["update_data"],
-            "runlist_link": runlist_link, "jira_session": jira, "not_run": did_not_run}
+    log_worker.info(f"All runlist executions are finished.")
+
+    final_execution_results = __build_final_execution_results(monitor_result=monitor_result,
+                                                              runlist_link=runlist_links, jira=jira)
+    final_execution_results["zephyr_test_cycle_name"] = zephyr_test_cycle_name
+    final_execution_results["checkpoint"] = checkpoint
+    return final_execution_results
+
+
+@Tracing.tracer.traced("resume_runlist_execution")
+def resume_runlist_execution(runlist_guid, velocity_session):
+    jira_service_name = JIRAPARAMS['service_name_velo']
+    properties_list = ['ipAddress', 'username', 'password']
+
+    '''Load the monitoring state saved by the interrupted session'''
+    checkpoint = RunlistCheckpoint(runlist_guid=runlist_guid)
+    checkpoint_state = checkpoint.load()
+    if not checkpoint_state:
+        return {"ok": False}
+    context = checkpoint_state["context"]
+
+    '''Re-open Jira - Zephyr sessions, the Test Cycle and its executions are reused from the checkpoint'''
+    jira_host = velocity_session.get_resource_property_value(jira_service_name, properties_list)
+    sessions = __open_jira_zephyr_sessions(zephyr_host=jira_host)
+    if not sessions["ok"]:
+        return {"ok": False}
+
+    '''Re-attach to the runlist executions'''
+    monitor = RunlistMonitor(velocity_session=velocity_session)
+    monitor.load_state(checkpoint_state["monitor"])
+    log_worker.info(f"Resuming monitoring of runlists {monitor.runlist_guids()}, "
+                    f"{len(monitor.not_processed())} executions still pending.")
+
+    monitor_result = __monitor_runlist_executions(velocity_session=velocity_session, monitor=monitor,
+                                                  automation_results_data=context["automation_results_data"],
+                                                  jira=sessions["jira_session"],
+                                                  jira_project_key=context["jira_project_key"],
+                                                  story_key_for_comment=context["story_key_for_comment"],
+                                                  zephyr=sessions["zephyr_session"],
+                                                  execution_key_id_data=context["execution_key_id_data"],
+                                                  bulk_update=context["bulk_update"], checkpoint=checkpoint,
+                                                  progress=checkpoint_state["progress"],
+                                                  rechecks=checkpoint_state["rechecks"])
+    if not monitor_result["ok"]:
+        return {"ok": False}
+
+    if monitor_result["update_data"] == {}:
+        log_worker.error(f"No execution results were reported for runlists {monitor.runlist_guids()}.")
+        return {"ok": False}
+
+    log_worker.info(f"Runlist execution is finished.")
+
+    final_execution_results = __build_final_execution_results(monitor_result=monitor_result,
+                                                              runlist_link=context["runlist_link"],
+                                                              jira=sessions["jira_session"])
+    final_execution_results["checkpoint"] = checkpoint
+    final_execution_results["context"] = context
+    return final_execution_results
 
 
 def main():
     """Main procedure"""
 
+    # Spans are recorded and the diagnostics are written to the shared drive only when asked for
+    if EntryPoint.timings_enabled() or REPORTINGPARAMS["diagnostics_dump"]:
+        Metrics.registry.dump_at_exit(os.path.join(REPORTINGPARAMS["metrics_path"],
+                                                   "run_zephyr_automation_cycle_metrics.json"))
+        Tracing.tracer.dump_at_exit(os.path.join(REPORTINGPARAMS["trace_path"],
+                                                 "run_zephyr_automation_cycle_trace.json"))
+
     '''Initializing arguments'''
     jira_project_key = ""
     jira_project_release_name = ""
@@ -767,6 +1164,8 @@ def main():
     zephyr_build = ""
     runlist_name = ""
     topology_name = ""
+    runlists = ""
+    resume_runlist_guid = ""
 
     for i in range(1, len(sys.argv[1:]), 2):
         log_worker.info(f"Argument: {sys.argv[i]}")
@@ -795,35 +1194,44 @@ def main():
         elif sys.argv[i] == "--topology_name":
             log_worker.info(f"Value for {sys.argv[i]} is {sys.argv[i + 1]}.")
             topology_name = sys.argv[i + 1]
+        elif sys.argv[i] == "--runlists":
+            log_worker.info(f"Value for {sys.argv[i]} is {sys.argv[i + 1]}.")
+            runlists = sys.argv[i + 1]
+        elif sys.argv[i] == "--resume":
+            log_worker.info(f"Value for {sys.argv[i]} is {sys.argv[i + 1]}.")
+            resume_runlist_guid = sys.argv[i + 1]
         else:
             log_worker.warning(f"Argument {sys.argv[i]} is not recognized and will not be used.")
 
-    if jira_project_key == "":
+    if resume_runlist_guid != "":
+        log_worker.info(f"Resuming the monitoring session of runlist {resume_runlist_guid}, the other arguments "
+                        f"are loaded from its checkpoint.")
+    elif jira_project_key == "":
         log_worker.error(f"Argument jira_project_key is empty, exiting execution.")
         log_worker.error(f"Finished: FAILED")
         sys.exit(0)
-    if jira_project_release_name == "":
+    elif jira_project_release_name == "":
         log_worker.error(f"Argument jira_project_release_name is empty, exiting execution.")
         log_worker.error(f"Finished: FAILED")
         sys.exit(0)
-    if zephyr_test_cycle_name == "":
+    elif zephyr_test_cycle_name == "" and runlists == "":
         log_worker.error(f"Argument zephyr_test_cycle_name is empty, exiting execution. Set as N/A if runlist_name is "
                          f"provided.")
         log_worker.error(f"Finished: FAILED")
         sys.exit(0)
-    if story_key_for_comment == "":
+    elif story_key_for_comment == "":
         log_worker.error(f"Argument story_key_for_comment is empty, exiting execution.")
         log_worker.error(f"Finished: FAILED")
         sys.exit(0)
-    if zephyr_build == "":
+    elif zephyr_build == "":
         log_worker.error(f"Argument zephyr_build is empty, exiting execution.")
         log_worker.error(f"Finished: FAILED")
         sys.exit(0)
-    if runlist_name == "":
+    elif runlist_name == "" and runlists == "":
         log_worker.error(f"Argument runlist_name is empty, exiting execution.")
         log_worker.error(f"Finished: FAILED")
         sys.exit(0)
-    if topology_name == "":
+    elif topology_name == "" and runlists == "":
         log_worker.error(f"Argument topology_name is empty, exiting execution.")
         log_worker.error(f"Finished: FAILED")
         sys.exit(0)
@@ -834,40 +1242,70 @@ def main():
     '''Open Velocity Session'''
     velocity_session = Velocity.API(velocity, velo_user, velo_password)
 
-    '''Retrieve the topology ID'''
-    if topology_name != "N/A":
-        topology_id = velocity_session.get_topology_id_by_name(topology_name)
+    if resume_runlist_guid != "":
+        final_execution_results = resume_runlist_execution(runlist_guid=resume_runlist_guid,
+                                                           velocity_session=velocity_session)
+        if final_execution_results["ok"]:
+            context = final_execution_results["context"]
+            jira_project_key = context["jira_project_key"]
+            jira_project_release_name = context["jira_project_version_name"]
+            zephyr_test_cycle_name = context["zephyr_test_cycle_name"]
+            zephyr_build = context["zephyr_build"]
+            story_key_for_comment = context["story_key_for_comment"]
+
+    elif runlists != "":
+        '''Runlists are provided as runlist_a:topology_a,runlist_b:topology_b, topology defaults to N/A'''
+        runlist_topology_pairs = []
+        for runlist_topology in runlists.split(","):
+            runlist_topology_pair = runlist_topology.split(":", 1)
+            if len(runlist_topology_pair) == 1:
+                runlist_topology_pair.append("N/A")
+            runlist_topology_pairs.append((runlist_topology_pair[0].strip(), runlist_topology_pair[1].strip()))
+
+        final_execution_results = deploy_multi_runlist_execution(runlist_topology_pairs=runlist_topology_pairs,
+                                                                 jira_project_key=jira_project_key,
+                                                                 jira_project_version_name=jira_project_release_name,
+                                                                 zephyr_build=zephyr_build,
+                                                                 velocity_session=velocity_session,
+                                                                 story_key_for_comment=story_key_for_comment)
+        if final_execution_results["ok"]:
+            zephyr_test_cycle_name = final_execution_results["zephyr_test_cycle_name"]
+
     else:
-        topology_id = ""
+        '''Retrieve the topology ID'''
+        if topology_name != "N/A":
+            topology_id = velocity_session.get_topology_id_by_name(topology_name)
+        else:
+            topology_id = ""
 
-    '''Retrieve the keys for the specified cycle name'''
+        '''Retrieve the keys for the specified cycle name'''
 
-    if runlist_name == "N/A":
-        test_keys = zephyr_get_test_keys_from_cycle(jira_project_key=jira_project_key,
-                                                    jira_project_version_name=jira_project_release_name,
-                                                    zephyr_test_cycle_name=zephyr_test_cycle_name,
-                                                    velocity_session=velocity_session)
+        if runlist_name == "N/A":
+            test_keys = zephyr_get_test_keys_from_cycle(jira_project_key=jira_project_key,
+                                                        jira_project_version_name=jira_project_release_name,
+                                                        zephyr_test_cycle_name=zephyr_test_cycle_name,
+                                                        velocity_session=velocity_session)
 
-    else:
-        test_keys = {"ok": runlist_name, "test_cycle_id": None, "test_keys_list": None}
-
-    if test_keys["ok"]:
-        final_execution_results = deploy_runlist_execution(cycle_id=test_keys["test_cycle_id"],
-                                                           keys_list=test_keys["test_keys_list"],
-                                                           jira_project_key=jira_project_key,
-                                                           jira_project_version_name=jira_project_release_name,
-                                                           zephyr_test_cycle_name=zephyr_test_cycle_name,
-                                                           zephyr_build=zephyr_build,
-                                                           runlist_name=runlist_name,
-                                                           velocity_session=velocity_session,
-                                                           topology_id=topology_id,
-                                                           story_key_for_comment=story_key_for_comment)
+        else:
+            test_keys = {"ok": runlist_name, "test_cycle_id": None, "test_keys_list": None}
+
+        if test_keys["ok"]:
+            final_execution_results = deploy_runlist_execution(cycle_id=test_keys["test_cycle_id"],
+                                                               keys_list=test_keys["test_keys_list"],
+                                                               jira_project_key=jira_project_key,
+                                                               jira_project_version_name=jira_project_release_name,
+                                                               zephyr_test_cycle_name=zephyr_test_cycle_name,
+                                                               zephyr_build=zephyr_build,
+                                                               runlist_name=runlist_name,
+                                                               velocity_session=velocity_session,
+                                                               topology_id=topology_id,
+                                                               story_key_for_comment=story_key_for_comment)
 
-    else:
-        log_worker.error(f"Test keys could not be obtained. Response: {test_keys}."
-                         f" Exiting execution.")
-        log_worker.error(f"Finished: FAILED")
-        sys.exit(0)
+        else:
+            log_worker.error(f"Test keys could not be obtained. Response: {test_keys}."
+                             f" Exiting execution.")
+            log_worker.error(f"Finished: FAILED")
+            sys.exit(0)
 
     if final_execution_results["ok"]:
 
@@ -885,6 +1323,7 @@ def main():
                                                 runlist_link=final_execution_results["runlist_link"])
 
         if generated_report["ok"]:
+            final_execution_results["checkpoint"].remove()
             log_worker.info(
                 f"Final execution results do not have an expected result. Response: {final_execution_results}."
                 f" Exiting execution.")
@@ -901,4 +1340,4 @@ def main():
 
 
 if __name__ == "__main__":
-    main()
+    EntryPoint.run(main, REPORTINGPARAMS["profile_path"])
@@ -16,6 +16,7 @@ import time
 from datetime import datetime
 
 sys.path.append(os.path.join(os.path.dirname(__file__), '../../../..'))
+import helpers.EntryPoint as EntryPoint
 import helpers.Logger as Local_logger
 import libs.libs_velocity.Velocity as Velocity
 from parameters.global_parameters import Reporting as REPORTINGPARAMS
@@ -203,15 +204,13 @@ def deploy_runlist_execution(cycle_id, keys_list, runlist_name, jira_project_ver
 
     '''Extract paths for monitor script'''
     tag_monitor_script = "airtel_monitor"
-    filter_set = {"tags": [tag_monitor_script]}
-    automation_assets = velocity_session.get_automation_assets(filters=filter_set)
+    automation_assets = velocity_session.find_automation_assets_by_tag(tag_monitor_script)
     if len(automation_assets["content"]) != 0:
         monitor_test_path = automation_assets["content"][0]["fullPath"]
 
     '''Extract paths for reporter script'''
     tag_reporter_script = "airtel_reporter"
-    filter_set = {"tags": [tag_reporter_script]}
-    automation_assets = velocity_session.get_automation_assets(filters=filter_set)
+    automation_assets = velocity_session.find_automation_assets_by_tag(tag_reporter_script)
     if len(automation_assets["content"]) != 0:
         reporter_test_path = automation_assets["content"][0]["fullPath"]
 
@@ -221,9 +220,9 @@ def deploy_runlist_execution(cycle_id, keys_list, runlist_name, jira_project_ver
         zephyr_create_cycle_flag = 0
         to_exclude = []
         execution_name = cycle_id
+        resolved_tags = velocity_session.resolve_automation_assets_by_tags(keys_list)
         for tag in keys_list:
-            filter_set = {"tags": [tag]}
-            automation_assets = velocity_session.get_automation_assets(filters=filter_set)
+            automation_assets = {"content": resolved_tags["assets"][tag]}
             if len(automation_assets["content"]) != 0:
 
                 log_worker.debug(f"Found {len(automation_assets['content'])} automation assets mathing tag {tag}")
@@ -260,7 +259,7 @@ def deploy_runlist_execution(cycle_id, keys_list, runlist_name, jira_project_ver
             full_path = runlist_info["main"]["items"][i]["path"]
             log_worker.info(f"Testcase full path: {full_path}")
             filter_set = {"fullPath": full_path}
-            automation_asset_info = velocity_session.get_automation_assets(filters=filter_set)
+            automation_asset_info = velocity_session.find_automation_asset_by_path(full_path)
 
             if len(automation_asset_info["content"]) == 1:
                 log_worker.debug(f"Following testcases were found while using filter: {filter_set}: "
@@ -463,4 +462,4 @@ def main():
 
 
 if __name__ == "__main__":
-    main()
+    EntryPoint.run(main, REPORTINGPARAMS["profile_path"])
@@ -26,6 +26,7 @@ from parameters.global_parameters import Reporting as REPORTINGPARAMS
 from parameters.global_parameters import Velocity as VELOCITYPARAMS
 from parameters.global_parameters import Mail as MAILPARAMS
 
+import helpers.EntryPoint as EntryPoint
 import helpers.Logger as Local_logger
 log_worker = Local_logger.create_logger(__name__, REPORTINGPARAMS["log_level_default"],
                                         REPORTINGPARAMS["test_log_path"], "s_send_reservation_email.txt")
@@ -130,4 +131,4 @@ def calculate_minutes(timestamp):
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    EntryPoint.run(main, REPORTINGPARAMS["profile_path"])
\ No newline at end of file
@@ -0,0 +1,114 @@
+""" Fake clock and sessions shared by the unit tests """
+
+
+class FakeClock:
+    """
+    Replacement of the time module in the tested modules: time() and monotonic() return the same value, which only
+    changes when sleep() or advance() is called.
+    """
+
+    def __init__(self, now=1000.0):
+        self.now = now
+
+    def time(self):
+        return self.now
+
+    def monotonic(self):
+        return self.now
+
+    def perf_counter(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.advance(seconds)
+
+    def advance(self, seconds):
+        self.now += max(0.0, seconds)
+
+
+class FakeRunlistSession:
+    """
+    Velocity session answering get_runlist_execution with the executions set by the test, in the format of the
+    runlist summary: {"guid": ..., "executions": [{"testPath", "runlistItemId", "executionState"}, ...]}
+    """
+
+    def __init__(self):
+        self.executions = {}
+        self.fail = False
+        self.calls = 0
+
+    def set_state(self, runlist_guid, item_id, test_path, state):
+        self.executions.setdefault(runlist_guid, {})[item_id] = {"testPath": test_path, "runlistItemId": item_id,
+                                                                 "executionState": state}
+
+    def get_runlist_execution(self, runlist_guids):
+        self.calls += 1
+        if self.fail:
+            return False
+        return [{"guid": runlist_guid, "executions": list(self.executions.get(runlist_guid, {}).values())}
+                for runlist_guid in runlist_guids]
+
+
+class FakeJiraSession:
+    """
+    JiraCore session holding the raw items in memory, keyed by item key, with the fields used by DefectIndex:
+    summary, labels and status
+    """
+
+    def __init__(self):
+        self.items = {}
+        self.searches = []
+        self.fail = False
+
+    def add_item(self, item_key, summary, labels=None, status_category="new"):
+        self.items[item_key] = {"key": item_key, "fields": {"summary": summary, "labels": labels,
+                                                            "status": {"statusCategory": {"key": status_category}}}}
+
+    def search_items(self, jql, fields=None):
+        self.searches.append(jql)
+        if self.fail:
+            return False
+        return {item_key: item for item_key, item in self.items.items()
+                if item["fields"]["status"]["statusCategory"]["key"] != "done"}
+
+    def get_items_details(self, item_keys, fields=None):
+        self.searches.append(f"key in ({', '.join(item_keys)})")
+        if self.fail:
+            return False
+        return {item_key: self.items[item_key] for item_key in item_keys if item_key in self.items}
+
+    def add_labels(self, item_key, labels_list):
+        if self.fail:
+            return False
+        labels = self.items[item_key]["fields"]["labels"] or []
+        self.items[item_key]["fields"]["labels"] = labels + [label for label in labels_list if label not in labels]
+        return True
+
+
+class FakeInventorySession:
+    """
+    Velocity session answering get_resources from the devices set by the test. The listing without properties
+    strips the properties, the id::a|b filter selects devices and every call is recorded.
+    """
+
+    def __init__(self):
+        self.devices = {}
+        self.calls = []
+        self.fail = False
+
+    def set_device(self, device_id, name, host_id=None, template_id="T", last_modified=1, properties=None):
+        self.devices[device_id] = {"id": device_id, "name": name, "hostId": host_id, "templateId": template_id,
+                                   "folderId": "F", "lastModified": last_modified, "properties": properties or []}
+
+    def get_resources(self, filters=None, properties=None, use_cache=True):
+        self.calls.append((filters, properties))
+        if self.fail:
+            return False
+        devices = [dict(device) for device in self.devices.values()]
+        if filters:
+            device_ids = filters[0][len("id::"):].split("|")
+            devices = [device for device in devices if device["id"] in device_ids]
+        if properties == []:
+            for device in devices:
+                device["properties"] = []
+        return {"devices": devices}
@@ -0,0 +1,161 @@
+import logging
+import unittest
+from unittest import mock
+
+import helpers.CircuitBreaker as CircuitBreakerModule
+from helpers.CircuitBreaker import CircuitBreaker, CircuitBreakerRegistry, CLOSED, OPEN, HALF_OPEN
+from helpers.RequestsWrapper import APISession
+from fakes import FakeClock
+
+
+class CircuitBreakerTest(unittest.TestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+        patcher = mock.patch.object(CircuitBreakerModule, "time", self.clock)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.breaker = CircuitBreaker("velocity", failure_rate_threshold=0.5, minimum_calls=4, window_size=10,
+                                      open_duration=30)
+
+    def open_breaker(self):
+        tickets = [self.breaker.allow_request() for _ in range(4)]
+        for ticket in tickets:
+            self.breaker.record_failure(ticket)
+        self.assertEqual(self.breaker.state, OPEN)
+
+    def test_opens_at_the_failure_rate_after_the_minimum_calls(self):
+        self.breaker.record_failure(self.breaker.allow_request())
+        self.breaker.record_failure(self.breaker.allow_request())
+        self.breaker.record_failure(self.breaker.allow_request())
+        self.assertEqual(self.breaker.state, CLOSED)
+
+        self.assertFalse(self.breaker.record_success(self.breaker.allow_request()))
+        self.assertTrue(self.breaker.record_failure(self.breaker.allow_request()))
+        self.assertEqual(self.breaker.state, OPEN)
+
+    def test_successes_keep_the_rate_under_the_threshold(self):
+        for _ in range(6):
+            self.breaker.record_success(self.breaker.allow_request())
+        for _ in range(4):
+            self.assertFalse(self.breaker.record_failure(self.breaker.allow_request()))
+
+        self.assertEqual(self.breaker.state, CLOSED)
+        self.assertEqual(self.breaker.to_dict()["failures"], 4)
+
+    def test_open_circuit_fails_fast_until_the_probe(self):
+        self.open_breaker()
+
+        self.assertIsNone(self.breaker.allow_request())
+        self.clock.advance(10)
+        self.assertEqual(self.breaker.retry_after(), 20)
+        self.clock.advance(20)
+
+        probe = self.breaker.allow_request()
+        self.assertIsNotNone(probe)
+        self.assertEqual(self.breaker.state, HALF_OPEN)
+        self.assertIsNone(self.breaker.allow_request())
+
+    def test_probe_success_closes_the_circuit(self):
+        self.open_breaker()
+        self.clock.advance(30)
+        probe = self.breaker.allow_request()
+
+        self.assertTrue(self.breaker.record_success(probe))
+        self.assertEqual(self.breaker.state, CLOSED)
+        self.assertEqual(self.breaker.to_dict()["calls"], 0)
+        self.assertIsNotNone(self.breaker.allow_request())
+
+    def test_probe_failure_opens_the_circuit_again(self):
+        self.open_breaker()
+        self.clock.advance(30)
+        probe = self.breaker.allow_request()
+
+        self.assertTrue(self.breaker.record_failure(probe))
+        self.assertEqual(self.breaker.state, OPEN)
+        self.assertIsNone(self.breaker.allow_request())
+        self.assertEqual(self.breaker.retry_after(), 30)
+
+    def test_only_the_probe_decides_the_transition(self):
+        slow_call = self.breaker.allow_request()
+        self.open_breaker()
+
+        self.assertFalse(self.breaker.record_success(slow_call))
+        self.assertEqual(self.breaker.state, OPEN)
+
+        self.clock.advance(30)
+        probe = self.breaker.allow_request()
+        self.assertFalse(self.breaker.record_success(slow_call))
+        self.assertFalse(self.breaker.record_failure(slow_call))
+        self.assertEqual(self.breaker.state, HALF_OPEN)
+
+        self.assertTrue(self.breaker.record_success(probe))
+        self.assertFalse(self.breaker.record_failure(probe))
+        self.assertEqual(self.breaker.state, CLOSED)
+
+    def test_calls_admitted_before_closing_do_not_count_in_the_new_window(self):
+        calls_before_open = [self.breaker.allow_request() for _ in range(4)]
+        self.open_breaker()
+        self.clock.advance(30)
+        self.breaker.record_success(self.breaker.allow_request())
+
+        for ticket in calls_before_open:
+            self.assertFalse(self.breaker.record_failure(ticket))
+
+        self.assertEqual(self.breaker.state, CLOSED)
+        self.assertEqual(self.breaker.to_dict()["calls"], 0)
+
+    def test_lost_probe_is_replaced_after_the_open_duration(self):
+        self.open_breaker()
+        self.clock.advance(30)
+        lost_probe = self.breaker.allow_request()
+
+        self.clock.advance(29)
+        self.assertIsNone(self.breaker.allow_request())
+        self.clock.advance(1)
+        probe = self.breaker.allow_request()
+
+        self.assertNotEqual(probe, lost_probe)
+        self.assertFalse(self.breaker.record_success(lost_probe))
+        self.assertTrue(self.breaker.record_success(probe))
+
+    def test_registry_shares_one_breaker_per_host(self):
+        registry = CircuitBreakerRegistry()
+
+        breaker = registry.get("velocity:443", {"minimum_calls": 2})
+
+        self.assertIs(registry.get("velocity:443", {"minimum_calls": 9}), breaker)
+        self.assertEqual(breaker.minimum_calls, 2)
+        self.assertIsNot(registry.get("jira:443"), breaker)
+        self.assertEqual(sorted(registry.to_dict()), ["jira:443", "velocity:443"])
+
+
+class APISessionBreakerTest(unittest.TestCase):
+    def setUp(self):
+        patcher = mock.patch.object(CircuitBreakerModule, "breakers", CircuitBreakerRegistry())
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.session = APISession(repeat_step=3)
+        self.log_worker = logging.getLogger(__name__)
+
+    def test_unsupported_request_type_does_not_take_the_probe(self):
+        breaker = CircuitBreakerModule.breakers.get("velocity")
+        breaker.state = HALF_OPEN
+
+        self.assertFalse(self.session.send_request("patch", "https://velocity/api", "test", self.log_worker))
+
+        self.assertIsNone(breaker.probe_ticket)
+        self.assertIsNotNone(breaker.allow_request())
+
+    def test_open_circuit_does_not_send_the_request(self):
+        breaker = CircuitBreakerModule.breakers.get("velocity")
+        breaker.state = OPEN
+        breaker.opened_at = CircuitBreakerModule.time.monotonic()
+
+        with mock.patch.object(self.session, "get") as get:
+            self.assertFalse(self.session.send_request("get", "https://velocity/api", "test", self.log_worker))
+
+        get.assert_not_called()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,81 @@
+import unittest
+
+from libs.libs_jira.DefectIndex import DefectIndex
+from fakes import FakeJiraSession
+
+
+class DefectIndexTest(unittest.TestCase):
+    def setUp(self):
+        self.jira = FakeJiraSession()
+        self.index = DefectIndex(self.jira, "VELO")
+
+    def test_fingerprint_ignores_volatile_parts(self):
+        fingerprint = DefectIndex.fingerprint("Timeout after 30s on 10.0.0.1, session 0x1f2e, "
+                                              "id 123e4567-e89b-12d3-a456-426614174000")
+
+        self.assertEqual(fingerprint, DefectIndex.fingerprint("timeout after 45s on  10.0.0.17, session 0xabc, "
+                                                              "id 00000000-0000-0000-0000-000000000000"))
+        self.assertNotEqual(fingerprint, DefectIndex.fingerprint("Connection refused on 10.0.0.1"))
+        self.assertEqual(DefectIndex.fingerprint(None), DefectIndex.fingerprint(""))
+
+    def test_find_matches_test_name_and_failure_reason(self):
+        self.jira.add_item("VELO-1", "test_a has failed.", self.index.labels("Timeout after 30s"))
+        self.jira.add_item("VELO-2", "test_b has failed.", self.index.labels("Timeout after 30s"))
+        self.assertTrue(self.index.build())
+
+        self.assertEqual(self.index.find("test_a", "Timeout after 90s"), "VELO-1")
+        self.assertEqual(self.index.find("test_b", "Timeout after 1s"), "VELO-2")
+        self.assertIsNone(self.index.find("test_a", "Connection refused"))
+        self.assertIsNone(self.index.find("test_c", "Timeout after 30s"))
+        self.assertEqual(len(self.jira.searches), 1)
+
+    def test_added_defect_is_found(self):
+        self.index.build()
+
+        self.index.add("test_a", "Connection refused", "VELO-9")
+
+        self.assertEqual(self.index.find("test_a", "Connection refused"), "VELO-9")
+
+    def test_defect_without_fingerprint_is_adopted_by_the_first_failure(self):
+        self.jira.add_item("VELO-1", "test_a has failed.")
+        self.jira.add_item("VELO-2", "Unrelated defect")
+        self.index.build()
+
+        self.assertEqual(self.index.find("test_a", "Timeout after 30s"), "VELO-1")
+        self.assertEqual(self.jira.items["VELO-1"]["fields"]["labels"], self.index.labels("Timeout after 30s"))
+        self.assertEqual(self.index.find("test_a", "Timeout after 60s"), "VELO-1")
+        self.assertIsNone(self.index.find("test_a", "Connection refused"))
+
+        rebuilt = DefectIndex(self.jira, "VELO")
+        rebuilt.build()
+        self.assertEqual(rebuilt.unlabeled_defects, {})
+        self.assertEqual(rebuilt.find("test_a", "Timeout after 5s"), "VELO-1")
+
+    def test_failed_build_keeps_the_index_empty(self):
+        self.jira.add_item("VELO-1", "test_a has failed.", self.index.labels("Timeout"))
+        self.jira.fail = True
+
+        self.assertFalse(self.index.build())
+        self.assertIsNone(self.index.find("test_a", "Timeout"))
+
+    def test_closed_defects_are_discarded(self):
+        self.jira.add_item("VELO-1", "test_a has failed.", self.index.labels("Timeout"))
+        self.jira.add_item("VELO-2", "test_b has failed.", self.index.labels("Timeout"))
+        self.index.build()
+        self.jira.items["VELO-1"]["fields"]["status"]["statusCategory"]["key"] = "done"
+
+        self.assertEqual(self.index.discard_closed(["VELO-1", "VELO-2"]), {"VELO-1"})
+        self.assertIsNone(self.index.find("test_a", "Timeout"))
+        self.assertEqual(self.index.find("test_b", "Timeout"), "VELO-2")
+
+    def test_defects_are_considered_open_when_the_check_fails(self):
+        self.jira.add_item("VELO-1", "test_a has failed.", self.index.labels("Timeout"))
+        self.index.build()
+        self.jira.fail = True
+
+        self.assertEqual(self.index.discard_closed(["VELO-1"]), set())
+        self.assertEqual(self.index.find("test_a", "Timeout"), "VELO-1")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,116 @@
+import os
+import stat
+import tempfile
+import unittest
+from unittest import mock
+
+import libs.libs_velocity.InventoryCache as InventoryCacheModule
+from libs.libs_velocity.InventoryCache import InventoryCache
+from fakes import FakeClock, FakeInventorySession
+
+
+class InventoryCacheTest(unittest.TestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+        patcher = mock.patch.object(InventoryCacheModule, "time", self.clock)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(temp_dir.cleanup)
+        self.session = FakeInventorySession()
+        self.session.set_device("rack-1", "Row_A_1", template_id="RACK")
+        self.session.set_device("rack-2", "Row_A_2", template_id="RACK")
+        self.session.set_device("device-1", "server-1", host_id="rack-1",
+                                properties=[{"name": "Rack Number", "value": "1"},
+                                            {"name": "password", "value": "secret"}])
+        self.session.set_device("device-2", "server-2")
+        self.cache = InventoryCache(self.session, os.path.join(temp_dir.name, "cache", "inventory.sqlite"),
+                                    refresh_interval=300)
+
+    def device_ids(self, filters=None):
+        return sorted(device["id"] for device in self.cache.get_resources(filters)["devices"])
+
+    def downloaded_ids(self):
+        return sorted(device_id for filters, properties in self.session.calls if filters
+                      for device_id in filters[0][len("id::"):].split("|"))
+
+    def test_snapshot_is_created_for_its_owner_only(self):
+        self.assertTrue(self.cache.sync())
+
+        self.assertEqual(stat.S_IMODE(os.stat(self.cache.cache_file).st_mode), 0o600)
+        self.assertEqual(self.device_ids(), ["device-1", "device-2", "rack-1", "rack-2"])
+
+    def test_password_properties_are_not_stored(self):
+        self.cache.sync()
+
+        device = self.cache.get_resources(["id::device-1"])["devices"][0]
+
+        self.assertEqual(device["properties"], [{"name": "Rack Number", "value": "1"}])
+
+    def test_sync_downloads_only_the_modified_devices(self):
+        self.cache.sync()
+        self.session.calls = []
+        self.session.set_device("device-2", "server-2", last_modified=2)
+        self.session.set_device("device-3", "server-3")
+        del self.session.devices["rack-2"]
+
+        self.assertTrue(self.cache.sync(force=True))
+
+        self.assertEqual(self.downloaded_ids(), ["device-2", "device-3"])
+        self.assertEqual(self.device_ids(), ["device-1", "device-2", "device-3", "rack-1"])
+
+    def test_nesting_change_without_last_modified_is_downloaded(self):
+        self.cache.sync()
+        self.session.calls = []
+        self.session.set_device("device-1", "server-1", host_id="rack-2")
+
+        self.cache.sync(force=True)
+
+        self.assertEqual(self.downloaded_ids(), ["device-1"])
+        self.assertEqual(self.device_ids(["hostId::rack-2"]), ["device-1"])
+        self.assertEqual(self.device_ids(["hostId::rack-1"]), [])
+
+    def test_sync_is_skipped_during_the_refresh_interval(self):
+        self.cache.sync()
+        self.session.calls = []
+
+        self.clock.advance(299)
+        self.assertTrue(self.cache.sync())
+        self.assertEqual(self.session.calls, [])
+
+        self.cache.invalidate()
+        self.assertTrue(self.cache.sync())
+        self.assertEqual(len(self.session.calls), 1)
+
+    def test_failed_listing_keeps_the_previous_snapshot(self):
+        self.cache.sync()
+        self.session.fail = True
+
+        self.assertFalse(self.cache.sync(force=True))
+        self.assertEqual(self.device_ids(), ["device-1", "device-2", "rack-1", "rack-2"])
+
+    def test_filters_are_translated_to_the_indexed_columns(self):
+        self.cache.sync()
+
+        self.assertEqual(self.device_ids(["templateId::RACK"]), ["rack-1", "rack-2"])
+        self.assertEqual(self.device_ids(["name::Row_A_1|server-2"]), ["device-2", "rack-1"])
+        self.assertEqual(self.device_ids(["hostId::rack-1|hostId::rack-2"]), ["device-1"])
+        self.assertEqual(self.device_ids(["hostId:!:rack-1"]), ["device-2", "rack-1", "rack-2"])
+        self.assertEqual(self.device_ids(["templateId::RACK", "name:!:Row_A_2"]), ["rack-1"])
+
+    def test_filters_on_other_fields_are_not_answered(self):
+        self.cache.sync()
+
+        self.assertIsNone(self.cache.get_resources(["Rack Number::1"]))
+        self.assertIsNone(self.cache.get_resources(["name::"]))
+
+    def test_properties_are_filtered(self):
+        self.cache.sync()
+
+        device = self.cache.get_resources(["id::device-1"], properties=[])["devices"][0]
+
+        self.assertEqual(device["properties"], [])
+
+
+if __name__ == "__main__":
+    unittest.main()
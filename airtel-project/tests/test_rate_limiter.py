@@ -0,0 +1,154 @@
+import logging
+import unittest
+from email.utils import format_datetime
+from datetime import datetime, timedelta, timezone
+from unittest import mock
+
+import helpers.RateLimiter as RateLimiterModule
+import helpers.RequestsWrapper as RequestsWrapper
+from helpers.RateLimiter import TokenBucket, RateLimiterRegistry, endpoint_class, retry_after_seconds
+from fakes import FakeClock
+
+
+class TokenBucketTest(unittest.TestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+        patcher = mock.patch.object(RateLimiterModule, "time", self.clock)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_burst_is_free_then_requests_are_paced(self):
+        bucket = TokenBucket(rate=2, burst=3)
+
+        self.assertEqual([bucket.reserve() for _ in range(3)], [0, 0, 0])
+        self.assertEqual([bucket.reserve() for _ in range(3)], [0.5, 1.0, 1.5])
+
+    def test_tokens_refill_up_to_the_burst(self):
+        bucket = TokenBucket(rate=2, burst=3)
+        for _ in range(3):
+            bucket.reserve()
+
+        self.clock.advance(1)
+        self.assertEqual(bucket.current_wait(), 0)
+        self.assertEqual([bucket.reserve() for _ in range(3)], [0, 0, 0.5])
+
+        self.clock.advance(60)
+        self.assertEqual(bucket.tokens, -1)
+        self.assertEqual([bucket.reserve() for _ in range(4)], [0, 0, 0, 0.5])
+
+    def test_acquire_sleeps_for_the_reserved_wait(self):
+        bucket = TokenBucket(rate=4, burst=1)
+        bucket.acquire()
+
+        self.assertEqual(bucket.acquire(), 0.25)
+        self.assertEqual(self.clock.now, 1000.25)
+
+    def test_pause_stops_the_tokens_and_releases_one_request(self):
+        bucket = TokenBucket(rate=10, burst=5)
+
+        bucket.pause(30)
+
+        self.assertEqual(bucket.current_wait(), 30)
+        self.assertEqual(bucket.reserve(), 30)
+        self.assertEqual(bucket.reserve(), 30.1)
+        self.clock.advance(30)
+        self.assertAlmostEqual(bucket.current_wait(), 0.2)
+
+    def test_shorter_pause_does_not_shorten_a_longer_one(self):
+        bucket = TokenBucket(rate=10, burst=5)
+
+        bucket.pause(30)
+        bucket.pause(5)
+
+        self.assertEqual(bucket.current_wait(), 30)
+
+
+class RateLimiterRegistryTest(unittest.TestCase):
+    SETTINGS = {"read": {"rate": 20, "burst": 40}, "write": {"rate": 5},
+                "hosts": {"jira": {"write": {"rate": 1, "burst": 2}}}}
+
+    def test_buckets_per_host_and_endpoint_class(self):
+        registry = RateLimiterRegistry()
+
+        read_bucket = registry.get("velocity", "read", self.SETTINGS)
+
+        self.assertEqual((read_bucket.rate, read_bucket.burst), (20, 40))
+        self.assertIs(registry.get("velocity", "read"), read_bucket)
+        self.assertEqual(registry.get("velocity", "write", self.SETTINGS).burst, 5)
+        self.assertEqual(registry.get("jira", "write", self.SETTINGS).rate, 1)
+        self.assertIsNone(registry.get("jira", "read", self.SETTINGS))
+        self.assertIsNone(registry.get("zephyr", "read", None))
+
+    def test_pause_applies_to_all_the_buckets_of_the_host(self):
+        registry = RateLimiterRegistry()
+        for host in ["velocity", "jira"]:
+            for request_class in ["read", "write"]:
+                registry.get(host, request_class, self.SETTINGS)
+
+        registry.pause("velocity", 10)
+
+        wait_times = registry.wait_times()
+        self.assertGreater(wait_times[(("host", "velocity"), ("endpoint_class", "read"))], 9)
+        self.assertGreater(wait_times[(("host", "velocity"), ("endpoint_class", "write"))], 9)
+        self.assertNotIn((("host", "jira"), ("endpoint_class", "read")), wait_times)
+        self.assertEqual(wait_times[(("host", "jira"), ("endpoint_class", "write"))], 0)
+
+    def test_endpoint_class_and_retry_after(self):
+        self.assertEqual(endpoint_class("get"), "read")
+        self.assertEqual(endpoint_class("POST"), "write")
+        self.assertEqual(retry_after_seconds("7", 1.0), 7)
+        self.assertEqual(retry_after_seconds(None, 1.0), 1.0)
+        self.assertEqual(retry_after_seconds("soon", 1.0), 1.0)
+        self.assertEqual(retry_after_seconds("-3", 1.0), 0)
+        http_date = format_datetime(datetime.now(timezone.utc) + timedelta(seconds=60), usegmt=True)
+        self.assertAlmostEqual(retry_after_seconds(http_date, 1.0), 60, delta=2)
+
+
+class RateLimitedResponse:
+    def __init__(self, status_code, retry_after=None):
+        self.status_code = status_code
+        self.headers = {"Retry-After": retry_after} if retry_after is not None else {}
+        self.content = b"{}"
+        self.text = "{}"
+
+
+class APISession429Test(unittest.TestCase):
+    def setUp(self):
+        for module, name, value in [(RateLimiterModule, "limiters", RateLimiterRegistry()),
+                                    (RequestsWrapper.time, "sleep", mock.Mock())]:
+            patcher = mock.patch.object(module, name, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.session = RequestsWrapper.APISession(repeat_step=3)
+        self.log_worker = logging.getLogger(__name__)
+
+    def send(self, responses):
+        with mock.patch.object(self.session, "get", side_effect=responses) as get:
+            result = self.session.send_request("get", "https://velocity/api", "test", self.log_worker)
+        return result, get.call_count
+
+    def test_429_is_replayed_after_retry_after_without_using_an_attempt(self):
+        result, calls = self.send([RateLimitedResponse(429, "2"), RateLimitedResponse(429, "2"),
+                                   RateLimitedResponse(200)])
+
+        self.assertEqual(result, {})
+        self.assertEqual(calls, 3)
+        self.assertEqual(RequestsWrapper.time.sleep.call_args_list, [mock.call(2.0), mock.call(2.0)])
+
+    def test_long_retry_after_fails_the_request_at_once(self):
+        result, calls = self.send([RateLimitedResponse(429, str(RequestsWrapper.RETRY_AFTER_MAX + 1))] * 3)
+
+        self.assertIs(result, False)
+        self.assertEqual(calls, 1)
+        RequestsWrapper.time.sleep.assert_not_called()
+
+    def test_429_after_the_last_replay_fails_the_request(self):
+        replays = RequestsWrapper.MAX_RATE_LIMITED_REPLAYS
+        result, calls = self.send([RateLimitedResponse(429, "0")] * (replays + 3))
+
+        self.assertIs(result, False)
+        self.assertEqual(calls, replays + 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,245 @@
+import json
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+import libs.libs_velocity.RunlistMonitor as RunlistMonitorModule
+from libs.libs_velocity.RunlistMonitor import RunlistMonitor, PollScheduler, RunlistCheckpoint
+from fakes import FakeClock, FakeRunlistSession
+
+
+class RunlistMonitorTest(unittest.TestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+        patcher = mock.patch.object(RunlistMonitorModule, "time", self.clock)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.session = FakeRunlistSession()
+
+    def test_duplicate_paths_are_counted_until_each_execution_finishes(self):
+        monitor = RunlistMonitor(self.session, "r1", ["a", "a", "b"], {"a": "VELO-1", "b": "VELO-2"})
+        self.session.set_state("r1", "1", "a", "RUNNING")
+        self.session.set_state("r1", "2", "a", "COMPLETED")
+        self.session.set_state("r1", "3", "b", "QUEUED")
+
+        finished = monitor.poll()
+
+        self.assertEqual([(execution["item_id"], execution["tag"]) for execution in finished], [("2", "VELO-1")])
+        self.assertEqual(sorted(monitor.not_processed()), ["a", "b"])
+        self.assertEqual(monitor.in_flight_count(), 2)
+        self.assertFalse(monitor.is_finished())
+
+        self.session.set_state("r1", "1", "a", "COMPLETED")
+        self.session.set_state("r1", "3", "b", "ABORTED")
+        finished = monitor.poll()
+
+        self.assertEqual(sorted(execution["item_id"] for execution in finished), ["1", "3"])
+        self.assertTrue(monitor.is_finished())
+
+    def test_finished_item_is_reported_once(self):
+        monitor = RunlistMonitor(self.session, "r1", ["a"])
+        self.session.set_state("r1", "1", "a", "COMPLETED")
+
+        self.assertEqual(len(monitor.poll()), 1)
+        self.assertEqual(monitor.poll(), [])
+
+    def test_items_beyond_the_expected_count_are_ignored(self):
+        monitor = RunlistMonitor(self.session, "r1", ["a"])
+        self.session.set_state("r1", "1", "a", "COMPLETED")
+        self.session.set_state("r1", "2", "a", "COMPLETED")
+        self.session.set_state("r1", "3", "other", "COMPLETED")
+
+        self.assertEqual(len(monitor.poll()), 1)
+        self.assertEqual(monitor.pending["r1"]["a"], 0)
+        self.assertTrue(monitor.is_finished())
+
+    def test_same_path_in_two_runlists_is_pending_in_each(self):
+        monitor = RunlistMonitor(self.session, "r1", ["a"])
+        monitor.add_runlist("r2", ["a"])
+        self.session.set_state("r1", "1", "a", "COMPLETED")
+
+        finished = monitor.poll()
+
+        self.assertEqual([execution["runlist_guid"] for execution in finished], ["r1"])
+        self.assertEqual(monitor.not_processed(), ["a"])
+        self.assertEqual(self.session.calls, 1)
+
+    def test_duration_is_measured_from_the_first_running_poll(self):
+        monitor = RunlistMonitor(self.session, "r1", ["a", "b"])
+        self.session.set_state("r1", "1", "a", "RUNNING")
+        monitor.poll()
+
+        self.clock.advance(30)
+        self.session.set_state("r1", "1", "a", "COMPLETED")
+        self.session.set_state("r1", "2", "b", "COMPLETED")
+        durations = {execution["path"]: execution["duration"] for execution in monitor.poll()}
+
+        self.assertEqual(durations, {"a": 30, "b": None})
+
+    def test_failed_poll_keeps_the_pending_executions(self):
+        monitor = RunlistMonitor(self.session, "r1", ["a"])
+        self.session.set_state("r1", "1", "a", "COMPLETED")
+        self.session.fail = True
+
+        self.assertIs(monitor.poll(), False)
+        self.assertEqual(monitor.not_processed(), ["a"])
+
+        self.session.fail = False
+        self.assertEqual(len(monitor.poll()), 1)
+
+    def test_state_survives_a_json_round_trip(self):
+        monitor = RunlistMonitor(self.session, "r1", ["a", "a"], {"a": "VELO-1"})
+        self.session.set_state("r1", "1", "a", "COMPLETED")
+        self.session.set_state("r1", "2", "a", "RUNNING")
+        monitor.poll()
+
+        restored = RunlistMonitor(self.session)
+        restored.load_state(json.loads(json.dumps(monitor.get_state())))
+        self.session.set_state("r1", "2", "a", "COMPLETED")
+        finished = restored.poll()
+
+        self.assertEqual([(execution["item_id"], execution["tag"]) for execution in finished], [("2", "VELO-1")])
+        self.assertTrue(restored.is_finished())
+
+
+class PollSchedulerTest(unittest.TestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+        patcher = mock.patch.object(RunlistMonitorModule, "time", self.clock)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_interval_follows_the_observed_durations(self):
+        scheduler = PollScheduler(default_interval=20, min_interval=5, max_interval=120, poll_fraction=0.25)
+
+        self.assertEqual(scheduler.schedule_next_poll(in_flight_count=4, finished_count=0), 20)
+        scheduler.record_durations([None, 400])
+        self.assertEqual(scheduler.schedule_next_poll(in_flight_count=4, finished_count=0), 25)
+        self.assertEqual(scheduler.schedule_next_poll(in_flight_count=0, finished_count=0), 100)
+        self.assertEqual(scheduler.schedule_next_poll(in_flight_count=4, finished_count=2), 5)
+        scheduler.record_durations([4000])
+        self.assertEqual(scheduler.schedule_next_poll(in_flight_count=1, finished_count=0), 120)
+        self.assertEqual(scheduler.schedule_next_poll(in_flight_count=1000, finished_count=0), 5)
+
+    def test_poll_is_due_after_the_interval(self):
+        scheduler = PollScheduler()
+        self.assertTrue(scheduler.poll_due())
+
+        interval = scheduler.schedule_next_poll(in_flight_count=1, finished_count=0)
+        self.assertFalse(scheduler.poll_due())
+        self.assertEqual(scheduler.seconds_until_next_event(), interval)
+
+        self.clock.advance(interval)
+        self.assertTrue(scheduler.poll_due())
+
+    def test_budget_is_a_sliding_minute(self):
+        scheduler = PollScheduler(max_calls_per_minute=3)
+        scheduler.record_call(2)
+        self.assertTrue(scheduler.acquire_call())
+        self.assertFalse(scheduler.acquire_call())
+
+        self.clock.advance(59)
+        self.assertFalse(scheduler.acquire_call())
+        self.clock.advance(1)
+        self.assertTrue(scheduler.acquire_call())
+
+    def test_exhausted_budget_delays_the_next_event(self):
+        scheduler = PollScheduler(max_calls_per_minute=1)
+        scheduler.acquire_call()
+        scheduler.schedule_next_poll(in_flight_count=1, finished_count=1)
+
+        self.assertEqual(scheduler.seconds_until_next_event(), 60)
+        self.assertEqual(scheduler.seconds_until_next_event(include_poll=False), 0)
+
+    def test_indeterminate_rechecks_are_deferred_and_bounded(self):
+        scheduler = PollScheduler(recheck_delay=10, max_rechecks=2)
+
+        self.assertTrue(scheduler.schedule_recheck("VELO-1", "execution-1"))
+        self.clock.advance(5)
+        self.assertTrue(scheduler.schedule_recheck("VELO-2", "execution-2", attempt=2))
+        self.assertFalse(scheduler.schedule_recheck("VELO-3", "execution-3", attempt=3))
+        self.assertEqual(scheduler.get_rechecks(), [["VELO-1", 1, "execution-1"], ["VELO-2", 2, "execution-2"]])
+        self.assertEqual(scheduler.seconds_until_next_event(include_poll=False), 5)
+
+        self.clock.advance(5)
+        self.assertEqual(scheduler.due_rechecks(), [("VELO-1", 1, "execution-1")])
+        self.assertTrue(scheduler.has_pending_rechecks())
+        self.clock.advance(5)
+        self.assertEqual(scheduler.due_rechecks(), [("VELO-2", 2, "execution-2")])
+        self.assertFalse(scheduler.has_pending_rechecks())
+
+
+class RunlistCheckpointTest(unittest.TestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+        patcher = mock.patch.object(RunlistMonitorModule, "time", self.clock)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(temp_dir.cleanup)
+        self.checkpoint_path = temp_dir.name
+        self.session = FakeRunlistSession()
+
+    def test_resume_polls_only_the_executions_not_reported(self):
+        monitor = RunlistMonitor(self.session, "r1", ["a", "b"], {"a": "VELO-1", "b": "VELO-2"})
+        scheduler = PollScheduler()
+        self.session.set_state("r1", "1", "a", "COMPLETED")
+        self.session.set_state("r1", "2", "b", "RUNNING")
+        monitor.poll()
+        scheduler.schedule_recheck("VELO-1", "execution-1", attempt=2)
+        checkpoint = RunlistCheckpoint("r1", checkpoint_path=self.checkpoint_path)
+        checkpoint.context = {"jira_project_key": "VELO"}
+        progress = {"update_data": {"VELO-1": {"result": "INDETERMINATE"}}}
+
+        self.assertTrue(checkpoint.save(monitor=monitor, scheduler=scheduler, progress=progress))
+        self.assertEqual(os.listdir(self.checkpoint_path), ["runlist_r1.json"])
+
+        resumed = RunlistCheckpoint("r1", checkpoint_path=self.checkpoint_path)
+        state = resumed.load()
+        self.assertEqual(resumed.context, {"jira_project_key": "VELO"})
+        self.assertEqual(state["progress"], progress)
+        self.assertEqual(state["rechecks"], [["VELO-1", 2, "execution-1"]])
+
+        resumed_monitor = RunlistMonitor(self.session)
+        resumed_monitor.load_state(state["monitor"])
+        self.session.set_state("r1", "2", "b", "COMPLETED")
+        self.assertEqual([execution["tag"] for execution in resumed_monitor.poll()], ["VELO-2"])
+
+    def test_multi_runlist_checkpoint_is_found_by_any_runlist(self):
+        monitor = RunlistMonitor(self.session, "r1", ["a"])
+        monitor.add_runlist("r2", ["b"])
+        RunlistCheckpoint("r1", checkpoint_path=self.checkpoint_path).save(monitor, PollScheduler(), None)
+
+        checkpoint = RunlistCheckpoint("r2", checkpoint_path=self.checkpoint_path)
+        state = checkpoint.load()
+
+        self.assertEqual(state["runlist_guids"], ["r1", "r2"])
+        self.assertEqual(checkpoint.checkpoint_file, os.path.join(self.checkpoint_path, "runlist_r1.json"))
+
+    def test_missing_or_corrupted_checkpoint_is_not_loaded(self):
+        with open(os.path.join(self.checkpoint_path, "runlist_r2.json"), "w") as checkpoint_file:
+            checkpoint_file.write('{"runlist_guids": ["r1"')
+
+        self.assertIs(RunlistCheckpoint("r1", checkpoint_path=self.checkpoint_path).load(), False)
+
+    def test_failed_save_keeps_the_previous_checkpoint(self):
+        monitor = RunlistMonitor(self.session, "r1", ["a"])
+        checkpoint = RunlistCheckpoint("r1", checkpoint_path=self.checkpoint_path)
+        checkpoint.save(monitor, PollScheduler(), {"step": 1})
+
+        self.assertFalse(checkpoint.save(monitor, PollScheduler(), {"step": object()}))
+        self.assertEqual(checkpoint.load()["progress"], {"step": 1})
+        self.assertEqual(os.listdir(self.checkpoint_path), ["runlist_r1.json"])
+
+    def test_remove_deletes_the_checkpoint(self):
+        checkpoint = RunlistCheckpoint("r1", checkpoint_path=self.checkpoint_path)
+        checkpoint.save(RunlistMonitor(self.session, "r1", ["a"]), PollScheduler(), None)
+
+        checkpoint.remove()
+
+        self.assertNotIn("runlist_r1.json", os.listdir(self.checkpoint_path))
+
+
+if __name__ == "__main__":
+    unittest.main()
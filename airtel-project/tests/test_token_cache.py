@@ -0,0 +1,87 @@
+import json
+import os
+import stat
+import tempfile
+import unittest
+from unittest import mock
+
+import libs.libs_velocity.TokenCache as TokenCacheModule
+from libs.libs_velocity.TokenCache import TokenCache, EXPIRY_MARGIN
+from fakes import FakeClock
+
+
+class TokenCacheTest(unittest.TestCase):
+    def setUp(self):
+        self.clock = FakeClock(now=1700000000.0)
+        patcher = mock.patch.object(TokenCacheModule, "time", self.clock)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(temp_dir.cleanup)
+        self.cache = TokenCache(os.path.join(temp_dir.name, "airtel", "tokens.json"), default_lifetime=3600)
+
+    def test_token_is_used_until_the_expiry_margin(self):
+        self.assertTrue(self.cache.store("velocity", "user", "token-1", expires=self.clock.now + 600))
+
+        self.assertEqual(self.cache.get("velocity", "user"), "token-1")
+        self.assertIsNone(self.cache.get("velocity", "other_user"))
+        self.clock.advance(600 - EXPIRY_MARGIN - 1)
+        self.assertEqual(self.cache.get("velocity", "user"), "token-1")
+        self.clock.advance(1)
+        self.assertIsNone(self.cache.get("velocity", "user"))
+
+    def test_expiry_in_milliseconds_or_missing(self):
+        self.cache.store("velocity", "user_ms", "token-ms", expires=(self.clock.now + 600) * 1000)
+        self.cache.store("velocity", "user_default", "token-default")
+
+        self.clock.advance(600 - EXPIRY_MARGIN)
+        self.assertIsNone(self.cache.get("velocity", "user_ms"))
+        self.assertEqual(self.cache.get("velocity", "user_default"), "token-default")
+        self.clock.advance(3000)
+        self.assertIsNone(self.cache.get("velocity", "user_default"))
+
+    def test_file_is_readable_only_by_its_owner(self):
+        self.cache.store("velocity", "user", "token-1")
+
+        self.assertEqual(stat.S_IMODE(os.stat(self.cache.cache_file).st_mode), 0o600)
+        self.assertEqual(stat.S_IMODE(os.stat(os.path.dirname(self.cache.cache_file)).st_mode) & 0o077, 0)
+        with open(self.cache.cache_file) as cache_file:
+            self.assertNotIn("user", json.dumps(list(json.load(cache_file).keys())))
+
+    def test_widened_permissions_make_the_cache_ignored(self):
+        self.cache.store("velocity", "user", "token-1")
+
+        os.chmod(self.cache.cache_file, 0o644)
+
+        self.assertIsNone(self.cache.get("velocity", "user"))
+
+    def test_expired_tokens_are_dropped_on_store(self):
+        self.cache.store("velocity", "user_1", "token-1", expires=self.clock.now + 10)
+        self.clock.advance(20)
+
+        self.cache.store("velocity", "user_2", "token-2")
+
+        with open(self.cache.cache_file) as cache_file:
+            self.assertEqual(len(json.load(cache_file)), 1)
+
+    def test_discard_removes_only_the_rejected_token(self):
+        self.cache.store("velocity", "user_1", "token-1")
+        self.cache.store("velocity", "user_2", "token-2")
+
+        self.assertTrue(self.cache.discard("velocity", "user_1"))
+
+        self.assertIsNone(self.cache.get("velocity", "user_1"))
+        self.assertEqual(self.cache.get("velocity", "user_2"), "token-2")
+
+    def test_corrupted_file_is_ignored(self):
+        self.cache.store("velocity", "user", "token-1")
+        with open(self.cache.cache_file, "w") as cache_file:
+            cache_file.write("{")
+
+        self.assertIsNone(self.cache.get("velocity", "user"))
+        self.assertTrue(self.cache.store("velocity", "user", "token-2"))
+        self.assertEqual(self.cache.get("velocity", "user"), "token-2")
+
+
+if __name__ == "__main__":
+    unittest.main()